@@ -0,0 +1,39 @@
+"""Confirmation document records
+
+Revision ID: add_confirmation_document_table
+Revises: add_confirmation_table
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_confirmation_document_table'
+down_revision = 'add_confirmation_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    confirmation_document records the generated document of each matched
+    confirmation; its absence marks the confirmation as pending generation.
+    """
+    op.create_table(
+        'confirmation_document',
+        sa.Column('confirmation_id', sa.String(), nullable=False),
+        sa.Column('trade_id', sa.String(), nullable=True),
+        sa.Column('doc_format', sa.String(), nullable=False),
+        sa.Column('path', sa.String(), nullable=False),
+        sa.Column('checksum', sa.String(), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=True),
+        sa.Column('run_id', sa.String(), nullable=True),
+        sa.Column('generated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('confirmation_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('confirmation_document')
@@ -0,0 +1,53 @@
+"""Confirmation table for broker confirmation matching
+
+Revision ID: add_confirmation_table
+Revises: add_settlement_change_journal
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_confirmation_table'
+down_revision = 'add_settlement_change_journal'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    confirmation stores inbound broker confirmations with their matching
+    outcome (matched trade, or break candidate, price difference and reason).
+    """
+    op.create_table(
+        'confirmation',
+        sa.Column('confirmation_id', sa.String(), nullable=False),
+        sa.Column('upload_id', sa.String(), nullable=True),
+        sa.Column('broker_id', sa.String(), nullable=True),
+        sa.Column('account_id', sa.String(), nullable=True),
+        sa.Column('instrument_id', sa.String(), nullable=False),
+        sa.Column('side', sa.String(), nullable=False),
+        sa.Column('qty', sa.Integer(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('trade_date', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('matched_trade_id', sa.String(), nullable=True),
+        sa.Column('candidate_trade_id', sa.String(), nullable=True),
+        sa.Column('price_diff', sa.Float(), nullable=True),
+        sa.Column('break_reason', sa.String(), nullable=True),
+        sa.Column('received_at', sa.DateTime(), nullable=True),
+        sa.Column('matched_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('confirmation_id')
+    )
+    op.create_index('ix_confirmation_upload_id', 'confirmation', ['upload_id'])
+    op.create_index('ix_confirmation_matched_trade_id', 'confirmation', ['matched_trade_id'])
+    op.create_index('ix_confirmation_status_trade_date', 'confirmation', ['status', 'trade_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_confirmation_status_trade_date', table_name='confirmation')
+    op.drop_index('ix_confirmation_matched_trade_id', table_name='confirmation')
+    op.drop_index('ix_confirmation_upload_id', table_name='confirmation')
+    op.drop_table('confirmation')
@@ -0,0 +1,60 @@
+"""Net settlement instructions and trade links
+
+Revision ID: add_net_settlement_instructions
+Revises: add_settlement_calendars
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_net_settlement_instructions'
+down_revision = 'add_settlement_calendars'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    net_settlement_instruction holds one netted movement per (account,
+    instrument, value date, clearer); net_settlement_trade links each trade
+    to the instruction it settles through.
+    """
+    op.create_table(
+        'net_settlement_instruction',
+        sa.Column('instruction_id', sa.String(), nullable=False),
+        sa.Column('account_id', sa.String(), nullable=True),
+        sa.Column('instrument_id', sa.String(), nullable=True),
+        sa.Column('value_date', sa.Date(), nullable=False),
+        sa.Column('clearer', sa.String(), nullable=True),
+        sa.Column('clearer_leid', sa.String(), nullable=True),
+        sa.Column('net_qty', sa.Integer(), nullable=True),
+        sa.Column('net_cash', sa.Float(), nullable=True),
+        sa.Column('gross_qty', sa.Integer(), nullable=True),
+        sa.Column('trade_count', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['account_id'], ['account.account_id']),
+        sa.ForeignKeyConstraint(['instrument_id'], ['instrument.instrument_id']),
+        sa.PrimaryKeyConstraint('instruction_id')
+    )
+    op.create_index('ix_net_settlement_instruction_value_date', 'net_settlement_instruction', ['value_date', 'status'])
+
+    op.create_table(
+        'net_settlement_trade',
+        sa.Column('trade_id', sa.String(), nullable=False),
+        sa.Column('instruction_id', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['trade_id'], ['trade.trade_id']),
+        sa.ForeignKeyConstraint(['instruction_id'], ['net_settlement_instruction.instruction_id']),
+        sa.PrimaryKeyConstraint('trade_id')
+    )
+    op.create_index('ix_net_settlement_trade_instruction_id', 'net_settlement_trade', ['instruction_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_net_settlement_trade_instruction_id', table_name='net_settlement_trade')
+    op.drop_table('net_settlement_trade')
+    op.drop_index('ix_net_settlement_instruction_value_date', table_name='net_settlement_instruction')
+    op.drop_table('net_settlement_instruction')
@@ -0,0 +1,38 @@
+"""Settlement calendars and trade settlement date
+
+Revision ID: add_settlement_calendars
+Revises: add_trade_position_time_index
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_settlement_calendars'
+down_revision = 'add_trade_position_time_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Add calendar_holiday, trade.settlement_date and a (status, settlement_date)
+    index so the settlement run finds due trades with an index range scan.
+    """
+    op.create_table(
+        'calendar_holiday',
+        sa.Column('calendar_code', sa.String(), nullable=False),
+        sa.Column('holiday_date', sa.Date(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('calendar_code', 'holiday_date')
+    )
+    op.add_column('trade', sa.Column('settlement_date', sa.Date(), nullable=True))
+    op.create_index('ix_trade_status_settlement_date', 'trade', ['status', 'settlement_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trade_status_settlement_date', table_name='trade')
+    op.drop_column('trade', 'settlement_date')
+    op.drop_table('calendar_holiday')
@@ -0,0 +1,36 @@
+"""Settlement change journal for versioned settlement deltas
+
+Revision ID: add_settlement_change_journal
+Revises: add_net_settlement_instructions
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_settlement_change_journal'
+down_revision = 'add_net_settlement_instructions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    settlement_change records every trade settlement state transition under
+    an increasing version, which feeds GET /settlements?since_version=N and
+    the settlements WebSocket channel.
+    """
+    op.create_table(
+        'settlement_change',
+        sa.Column('version', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('trade_id', sa.String(), nullable=False),
+        sa.Column('event_type', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('version')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('settlement_change')
@@ -0,0 +1,33 @@
+"""Link strategy leg orders to their parent strategy order
+
+Revision ID: add_strategy_order_parent
+Revises: add_trade_audit_trail, add_security_rbac_tables
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_strategy_order_parent'
+down_revision = ('add_trade_audit_trail', 'add_security_rbac_tables')  # Multiple heads merged
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Add strategy linkage columns to order_hdr:
+    - parent_order_id: shared id of the strategy order a leg belongs to
+    - leg_sequence: position of the leg within the strategy definition
+    """
+    op.add_column('order_hdr', sa.Column('parent_order_id', sa.String(), nullable=True))
+    op.add_column('order_hdr', sa.Column('leg_sequence', sa.Integer(), nullable=True))
+    op.create_index('ix_order_hdr_parent_order_id', 'order_hdr', ['parent_order_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_hdr_parent_order_id', table_name='order_hdr')
+    op.drop_column('order_hdr', 'leg_sequence')
+    op.drop_column('order_hdr', 'parent_order_id')
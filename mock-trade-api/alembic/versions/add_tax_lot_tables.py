@@ -0,0 +1,68 @@
+"""Tax lot ledger and lot relief tables
+
+Revision ID: add_tax_lot_tables
+Revises: add_variation_margin_position_key
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_tax_lot_tables'
+down_revision = 'add_variation_margin_position_key'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    tax_lot holds one row per opening trade with its remaining quantity;
+    tax_lot_relief holds one row per (closing trade, lot) with realized P&L.
+    """
+    op.create_table(
+        'tax_lot',
+        sa.Column('lot_id', sa.String(), nullable=False),
+        sa.Column('account_id', sa.String(), nullable=True),
+        sa.Column('instrument_id', sa.String(), nullable=True),
+        sa.Column('side', sa.String(), nullable=True),
+        sa.Column('open_trade_id', sa.String(), nullable=True),
+        sa.Column('open_time', sa.TIMESTAMP(), nullable=True),
+        sa.Column('open_price', sa.Float(), nullable=True),
+        sa.Column('original_qty', sa.Integer(), nullable=True),
+        sa.Column('remaining_qty', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['account_id'], ['account.account_id']),
+        sa.ForeignKeyConstraint(['instrument_id'], ['instrument.instrument_id']),
+        sa.PrimaryKeyConstraint('lot_id')
+    )
+    op.create_index('ix_tax_lot_position', 'tax_lot', ['account_id', 'instrument_id', 'status'])
+
+    op.create_table(
+        'tax_lot_relief',
+        sa.Column('relief_id', sa.String(), nullable=False),
+        sa.Column('lot_id', sa.String(), nullable=True),
+        sa.Column('close_trade_id', sa.String(), nullable=True),
+        sa.Column('account_id', sa.String(), nullable=True),
+        sa.Column('instrument_id', sa.String(), nullable=True),
+        sa.Column('method', sa.String(), nullable=True),
+        sa.Column('qty', sa.Integer(), nullable=True),
+        sa.Column('open_price', sa.Float(), nullable=True),
+        sa.Column('close_price', sa.Float(), nullable=True),
+        sa.Column('realized_pnl', sa.Float(), nullable=True),
+        sa.Column('close_time', sa.TIMESTAMP(), nullable=True),
+        sa.ForeignKeyConstraint(['account_id'], ['account.account_id']),
+        sa.ForeignKeyConstraint(['instrument_id'], ['instrument.instrument_id']),
+        sa.PrimaryKeyConstraint('relief_id')
+    )
+    op.create_index('ix_tax_lot_relief_close_trade', 'tax_lot_relief', ['close_trade_id'])
+    op.create_index('ix_tax_lot_relief_position', 'tax_lot_relief', ['account_id', 'instrument_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tax_lot_relief_position', table_name='tax_lot_relief')
+    op.drop_index('ix_tax_lot_relief_close_trade', table_name='tax_lot_relief')
+    op.drop_table('tax_lot_relief')
+    op.drop_index('ix_tax_lot_position', table_name='tax_lot')
+    op.drop_table('tax_lot')
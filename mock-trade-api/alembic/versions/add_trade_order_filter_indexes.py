@@ -0,0 +1,56 @@
+"""Composite and partial indexes for trade and order listing filters
+
+Revision ID: add_trade_order_filter_indexes
+Revises: add_confirmation_document_table
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_trade_order_filter_indexes'
+down_revision = 'add_confirmation_document_table'
+branch_labels = None
+depends_on = None
+
+ACTIVE_TRADES = sa.text("status = 'ACTIVE'")
+RESTING_ORDERS = sa.text("status IN ('NEW', 'PARTIALLY_FILLED')")
+
+# (name, table, columns)
+COMPOSITE_INDEXES = [
+    ('ix_trade_account_created_at', 'trade', ['account_id', 'created_at']),
+    ('ix_trade_trader_created_at', 'trade', ['trader_id', 'created_at']),
+    ('ix_trade_instrument_created_at', 'trade', ['instrument_id', 'created_at']),
+    ('ix_order_hdr_account_created_at', 'order_hdr', ['account_id', 'created_at']),
+    ('ix_order_hdr_trader_created_at', 'order_hdr', ['trader_id', 'created_at']),
+    ('ix_order_hdr_instrument_created_at', 'order_hdr', ['instrument_id', 'created_at']),
+    ('ix_order_hdr_status_created_at', 'order_hdr', ['status', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    """
+    Index the trade and order listing filters (account, trader, instrument,
+    status) together with created_at, so a filtered newest-first listing is an
+    index range scan rather than a sequential scan and sort. Open trades and
+    resting orders get partial indexes covering only those rows.
+    """
+    for name, table, columns in COMPOSITE_INDEXES:
+        op.create_index(name, table, columns)
+    op.create_index(
+        'ix_trade_active_created_at', 'trade', ['created_at'],
+        postgresql_where=ACTIVE_TRADES, sqlite_where=ACTIVE_TRADES
+    )
+    op.create_index(
+        'ix_order_hdr_resting_instrument', 'order_hdr', ['instrument_id'],
+        postgresql_where=RESTING_ORDERS, sqlite_where=RESTING_ORDERS
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_hdr_resting_instrument', table_name='order_hdr')
+    op.drop_index('ix_trade_active_created_at', table_name='trade')
+    for name, table, _ in reversed(COMPOSITE_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,32 @@
+"""Trade delta index for point-in-time position queries
+
+Revision ID: add_trade_position_time_index
+Revises: add_tax_lot_tables
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_trade_position_time_index'
+down_revision = 'add_tax_lot_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Index trades by (account_id, instrument_id, exec_time) so an as-of query
+    reads only the trades executed since the nearest position snapshot.
+    """
+    op.create_index(
+        'ix_trade_account_instrument_exec_time',
+        'trade',
+        ['account_id', 'instrument_id', 'exec_time']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trade_account_instrument_exec_time', table_name='trade')
@@ -0,0 +1,33 @@
+"""Unique position/date key on variation_margin
+
+Revision ID: add_variation_margin_position_key
+Revises: add_strategy_order_parent
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_variation_margin_position_key'
+down_revision = 'add_strategy_order_parent'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Add a unique (instrument_id, account_id, val_date) index so the daily
+    variation margin run can upsert with INSERT ... ON CONFLICT.
+    """
+    op.create_index(
+        'ix_variation_margin_position_date',
+        'variation_margin',
+        ['instrument_id', 'account_id', 'val_date'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_variation_margin_position_date', table_name='variation_margin')
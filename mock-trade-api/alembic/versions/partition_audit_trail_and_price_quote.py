@@ -0,0 +1,139 @@
+"""Monthly range partitioning of trade_audit_trail and price_quote
+
+Revision ID: partition_audit_trail_and_price_quote
+Revises: add_trade_order_filter_indexes
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'partition_audit_trail_and_price_quote'
+down_revision = 'add_trade_order_filter_indexes'
+branch_labels = None
+depends_on = None
+
+# Monthly partitions created ahead of the current month (the app's maintainer keeps this up)
+MONTHS_AHEAD = 3
+
+# table -> (id column, partition key, secondary indexes, foreign keys)
+TABLES = {
+    'trade_audit_trail': (
+        'audit_id', 'created_at',
+        {
+            'ix_trade_audit_trail_audit_id': ['audit_id'],
+            'ix_trade_audit_trail_trade_id': ['trade_id'],
+            'ix_trade_audit_trail_created_at': ['created_at'],
+        },
+        [('trade_id', 'trade', 'trade_id')],
+    ),
+    'price_quote': (
+        'quote_id', 'quote_time',
+        {
+            'ix_price_quote_quote_id': ['quote_id'],
+            'ix_price_quote_instrument_quote_time': ['instrument_id', 'quote_time'],
+        },
+        [('instrument_id', 'instrument', 'instrument_id')],
+    ),
+}
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_partitions(bind, parent: str, table: str, first: date) -> None:
+    """Monthly partitions of parent from first's month through MONTHS_AHEAD, plus a default partition"""
+    today = datetime.utcnow().date()
+    month = date(first.year, first.month, 1)
+    last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        bind.execute(sa.text(
+            f'CREATE TABLE "{table}_p{month:%Y%m}" PARTITION OF "{parent}" '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        ))
+        month = _add_months(month, 1)
+    bind.execute(sa.text(f'CREATE TABLE "{table}_default" PARTITION OF "{parent}" DEFAULT'))
+
+
+def _create_price_quote(table: str) -> None:
+    """price_quote was only ever created by create_all; create it partitioned if it is missing"""
+    op.create_table(
+        table,
+        sa.Column('quote_id', sa.String(), nullable=False),
+        sa.Column('instrument_id', sa.String(), nullable=True),
+        sa.Column('price', sa.Float(), nullable=True),
+        sa.Column('qty', sa.Float(), nullable=True),
+        sa.Column('side', sa.String(), nullable=True),
+        sa.Column('quote_time', sa.DateTime(), nullable=False),
+        sa.Column('source', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('quote_id', 'quote_time', name=f'{table}_pkey'),
+        postgresql_partition_by='RANGE (quote_time)'
+    )
+
+
+def upgrade() -> None:
+    """
+    Rebuild trade_audit_trail (by created_at) and price_quote (by quote_time)
+    as range-partitioned tables with one partition per month. Existing rows
+    are copied into the monthly partitions; the partition key joins the
+    primary key, as PostgreSQL requires. Other databases keep plain tables.
+    """
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    inspector = sa.inspect(bind)
+    for table, (id_column, key, indexes, foreign_keys) in TABLES.items():
+        new_table = f'{table}_partitioned'
+        exists = inspector.has_table(table)
+        if exists:
+            bind.execute(sa.text(f'UPDATE "{table}" SET "{key}" = now() WHERE "{key}" IS NULL'))
+            first = bind.execute(sa.text(f'SELECT min("{key}") FROM "{table}"')).scalar()
+            bind.execute(sa.text(
+                f'CREATE TABLE "{new_table}" (LIKE "{table}" INCLUDING DEFAULTS) PARTITION BY RANGE ("{key}")'
+            ))
+            bind.execute(sa.text(
+                f'ALTER TABLE "{new_table}" ADD CONSTRAINT "{new_table}_pkey" PRIMARY KEY ("{id_column}", "{key}")'
+            ))
+        else:
+            first = None
+            _create_price_quote(new_table)
+
+        _month_partitions(bind, new_table, table, first or datetime.utcnow())
+
+        if exists:
+            bind.execute(sa.text(f'INSERT INTO "{new_table}" SELECT * FROM "{table}"'))
+            op.drop_table(table)
+        op.rename_table(new_table, table)
+        bind.execute(sa.text(f'ALTER TABLE "{table}" RENAME CONSTRAINT "{new_table}_pkey" TO "{table}_pkey"'))
+
+        for name, columns in indexes.items():
+            op.create_index(name, table, columns)
+        for column, referred_table, referred_column in foreign_keys:
+            op.create_foreign_key(f'{table}_{column}_fkey', table, referred_table, [column], [referred_column])
+
+
+def downgrade() -> None:
+    """Copy the rows (detached partitions excluded) back into plain tables"""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for table, (id_column, key, indexes, foreign_keys) in TABLES.items():
+        old_table = f'{table}_unpartitioned'
+        bind.execute(sa.text(f'CREATE TABLE "{old_table}" (LIKE "{table}" INCLUDING DEFAULTS)'))
+        bind.execute(sa.text(f'INSERT INTO "{old_table}" SELECT * FROM "{table}"'))
+        bind.execute(sa.text(f'DROP TABLE "{table}" CASCADE'))
+        op.rename_table(old_table, table)
+        bind.execute(sa.text(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY ("{id_column}")'))
+        for name, columns in indexes.items():
+            op.create_index(name, table, columns)
+        for column, referred_table, referred_column in foreign_keys:
+            op.create_foreign_key(f'{table}_{column}_fkey', table, referred_table, [column], [referred_column])
@@ -11,7 +11,11 @@ This module contains:
 """
 
 from app.core.config import settings, OrderStatus, TradeStatus, OrderType, OrderSide, TimeInForce, EntityType
-from app.core.database import engine, SessionLocal, Base, get_db
+from app.core.database import (
+    engine, engines, SessionLocal, ReadSessionLocal, Base, get_db, get_read_db, pool_status,
+    get_async_db, get_async_read_db,
+    bulk_upsert, upsert_from_select, copy_rows
+)
 from app.core.events import EventType, Event, event_bus, publish_event
 from app.core.exceptions import (
     MockTradeException,
@@ -23,7 +27,8 @@ from app.core.exceptions import (
     OrderAlreadyFilledError,
     InsufficientQuantityError,
     MarketDataNotAvailableError,
-    EnrichmentError
+    EnrichmentError,
+    OrderQueueFullError
 )
 from app.core.schemas import BaseSchema, TimestampedSchema, PaginationRequest, PaginationResponse, ApiResponse, FilterRequest
 from app.core.security import SecurityUtils, get_current_user_permissions
@@ -40,9 +45,18 @@ __all__ = [
     
     # Database
     "engine",
+    "engines",
     "SessionLocal",
+    "ReadSessionLocal",
     "Base",
     "get_db",
+    "get_read_db",
+    "get_async_db",
+    "get_async_read_db",
+    "pool_status",
+    "bulk_upsert",
+    "upsert_from_select",
+    "copy_rows",
     
     # Events
     "EventType",
@@ -61,6 +75,7 @@ __all__ = [
     "InsufficientQuantityError",
     "MarketDataNotAvailableError",
     "EnrichmentError",
+    "OrderQueueFullError",
     
     # Schemas
     "BaseSchema",
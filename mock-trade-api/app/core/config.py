@@ -17,6 +17,81 @@ class Settings(BaseSettings):
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./dev.db")
     api_version: str = "v1"
 
+    # Database pools (per engine; server databases only) and optional read replica for read-only routes
+    database_replica_url: str = os.getenv("DATABASE_REPLICA_URL", "")
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    # Async read path pool (awaiting requests queue on it without holding threads)
+    db_async_pool_size: int = int(os.getenv("DB_ASYNC_POOL_SIZE", "20"))
+    db_pool_timeout_seconds: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+    db_pool_recycle_seconds: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # PostgreSQL statement_timeout per connection (0 = none; batch jobs share these pools)
+    db_statement_timeout_ms: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+    # Monthly partitions of trade_audit_trail / price_quote on PostgreSQL (retention 0 = never detach)
+    partition_months_ahead: int = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+    partition_maintenance_interval_seconds: float = float(os.getenv("PARTITION_MAINTENANCE_INTERVAL_SECONDS", "3600"))
+    trade_audit_retention_months: int = int(os.getenv("TRADE_AUDIT_RETENTION_MONTHS", "0"))
+    price_quote_retention_months: int = int(os.getenv("PRICE_QUOTE_RETENTION_MONTHS", "6"))
+
+    # Static data cache
+    static_data_cache_ttl_seconds: float = float(os.getenv("STATIC_DATA_CACHE_TTL_SECONDS", "60"))
+
+    # Verified access token cache and revoked token list
+    auth_token_cache_size: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+    auth_token_deny_list_path: str = os.getenv("AUTH_TOKEN_DENY_LIST_PATH", "./generated/revoked_tokens.json")
+
+    # Compiled RBAC permissions (reload interval, catches security writes made by other processes)
+    permission_cache_ttl_seconds: float = float(os.getenv("PERMISSION_CACHE_TTL_SECONDS", "60"))
+
+    # Rate limiting: token buckets per user (or client address) and route group,
+    # "<path prefix>=<requests per second>:<burst>" with "default" for other paths
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    rate_limit_rules: str = os.getenv(
+        "RATE_LIMIT_RULES", "/api/v1/trade-query=5:20,/api/v1/trades=20:50,default=50:200"
+    )
+    rate_limit_exempt: str = os.getenv("RATE_LIMIT_EXEMPT", "/health,/docs,/redoc,/openapi.json")
+    # Shared buckets for multi-worker deployments (needs the redis package)
+    rate_limit_redis_url: str = os.getenv("RATE_LIMIT_REDIS_URL", "")
+
+    # Order intake group commit
+    order_batch_size: int = int(os.getenv("ORDER_BATCH_SIZE", "500"))
+    order_batch_max_wait_ms: float = float(os.getenv("ORDER_BATCH_MAX_WAIT_MS", "2"))
+    order_queue_max_size: int = int(os.getenv("ORDER_QUEUE_MAX_SIZE", "100000"))
+
+    # Position keeper
+    position_flush_interval_ms: float = float(os.getenv("POSITION_FLUSH_INTERVAL_MS", "500"))
+
+    # Tax lot ledger (relief method: FIFO, LIFO or AVERAGE)
+    tax_lot_method: str = os.getenv("TAX_LOT_METHOD", "FIFO")
+    tax_lot_flush_interval_ms: float = float(os.getenv("TAX_LOT_FLUSH_INTERVAL_MS", "500"))
+
+    # Live P&L streaming (maximum push rate per account/portfolio channel)
+    live_pnl_publish_interval_ms: float = float(os.getenv("LIVE_PNL_PUBLISH_INTERVAL_MS", "250"))
+    # Portfolio rule reload interval (catches mapping changes made outside this process)
+    live_pnl_rules_ttl_seconds: float = float(os.getenv("LIVE_PNL_RULES_TTL_SECONDS", "60"))
+
+    # Settlement (T+N for instruments without OTC settlement conventions)
+    settlement_default_offset: int = int(os.getenv("SETTLEMENT_DEFAULT_OFFSET", "2"))
+    # Settlement stream (journal flush / push latency, and the largest delta pushed before asking clients to resync)
+    settlement_stream_interval_ms: float = float(os.getenv("SETTLEMENT_STREAM_INTERVAL_MS", "50"))
+    settlement_stream_max_push: int = int(os.getenv("SETTLEMENT_STREAM_MAX_PUSH", "1000"))
+
+    # Confirmation matching (price tolerance in basis points of the confirmed price)
+    confirmation_price_tolerance_bps: float = float(os.getenv("CONFIRMATION_PRICE_TOLERANCE_BPS", "1.0"))
+    # Confirmation documents (worker processes: 0 = one per CPU)
+    confirmation_document_dir: str = os.getenv("CONFIRMATION_DOCUMENT_DIR", "./generated/confirmations")
+    confirmation_document_format: str = os.getenv("CONFIRMATION_DOCUMENT_FORMAT", "html")
+    confirmation_document_workers: int = int(os.getenv("CONFIRMATION_DOCUMENT_WORKERS", "0"))
+    confirmation_document_chunk_size: int = int(os.getenv("CONFIRMATION_DOCUMENT_CHUNK_SIZE", "1000"))
+
+    # FIX 4.4 acceptor
+    fix_acceptor_enabled: bool = os.getenv("FIX_ACCEPTOR_ENABLED", "false").lower() == "true"
+    fix_host: str = os.getenv("FIX_HOST", "127.0.0.1")
+    fix_port: int = int(os.getenv("FIX_PORT", "9878"))
+    fix_sender_comp_id: str = os.getenv("FIX_SENDER_COMP_ID", "MOCKTRADE")
+    fix_heartbeat_interval: int = int(os.getenv("FIX_HEARTBEAT_INTERVAL", "30"))
+
     class Config:
         env_file = None
 
@@ -7,9 +7,13 @@ for production use.
 """
 
 from typing import Callable, List, Dict, Any
+from collections import deque
 from enum import Enum
 from datetime import datetime
 
+# Number of recent events retained for get_event_history
+EVENT_HISTORY_SIZE = 10000
+
 class EventType(str, Enum):
     """Events that can be published across modules"""
     # Order Events
@@ -24,6 +28,9 @@ class EventType(str, Enum):
     TRADE_EXPIRED = "trade.expired"
     TRADE_UPDATED = "trade.updated"
 
+    # Settlement Events
+    SETTLEMENT_COMPLETED = "settlement.completed"
+
     # Market Data Events
     MARKET_DATA_UPDATED = "market_data.updated"
     PRICE_QUOTE_RECEIVED = "price_quote.received"
@@ -31,10 +38,12 @@ class EventType(str, Enum):
     # Enrichment Events
     ENRICHMENT_COMPLETED = "enrichment.completed"
     ENRICHMENT_FAILED = "enrichment.failed"
+    PORTFOLIO_MAPPING_UPDATED = "portfolio_mapping.updated"
 
     # Static Data Events
     INSTRUMENT_CREATED = "instrument.created"
     ACCOUNT_CREATED = "account.created"
+    STRATEGY_UPDATED = "strategy.updated"
 
 class Event:
     """Base event class"""
@@ -61,7 +70,7 @@ class EventBus:
     """
     def __init__(self):
         self.subscribers: Dict[EventType, List[Callable]] = {}
-        self.event_history: List[Event] = []
+        self.event_history = deque(maxlen=EVENT_HISTORY_SIZE)
 
     def subscribe(self, event_type: EventType, handler: Callable):
         """Subscribe to an event"""
@@ -83,7 +92,7 @@ class EventBus:
 
     def get_event_history(self, event_type: EventType = None, limit: int = 100):
         """Get event history"""
-        history = self.event_history
+        history = list(self.event_history)
         if event_type:
             history = [e for e in history if e.event_type == event_type]
         return history[-limit:]
@@ -40,3 +40,12 @@ class EnrichmentError(MockTradeException):
     """Error during enrichment process"""
     pass
 
+
+class OrderQueueFullError(MockTradeException):
+    """Order intake queue is at capacity"""
+    pass
+
+
+class ConfirmationNotFoundError(MockTradeException):
+    """Confirmation not found"""
+    pass
@@ -0,0 +1,208 @@
+"""
+Monthly table partitions.
+
+On PostgreSQL, trade_audit_trail (by created_at) and price_quote (by
+quote_time) are range partitioned with one partition per month plus a
+default partition. The maintainer creates partitions some months ahead so
+inserts always land in a monthly partition, and detaches months older than
+a table's retention so vacuum and index maintenance only work on recent
+data. Detached partitions stay as plain tables for archiving or dropping.
+Queries that bound the partition key (or read newest first with a limit)
+only touch the matching months.
+
+Other databases keep plain tables and maintenance is a no-op.
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+import re
+import threading
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> (partition key column, retention in months; 0 = keep every month attached)
+PARTITIONED_TABLES: Dict[str, Tuple[str, int]] = {
+    "trade_audit_trail": ("created_at", settings.trade_audit_retention_months),
+    "price_quote": ("quote_time", settings.price_quote_retention_months),
+}
+
+MONTH_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after (or before) month's month"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    """Month a monthly partition covers, or None for the default or foreign partitions"""
+    match = MONTH_SUFFIX.search(name)
+    if not name.startswith(f"{table}_p") or match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+class PartitionMaintainer:
+    """
+    Creates upcoming monthly partitions and detaches expired ones.
+
+    maintain() is idempotent and runs once at startup and then every
+    interval on a background thread. Each DDL statement is its own
+    transaction, so one failure (e.g. rows for a new month already sitting
+    in the default partition) is logged and retried next run without
+    blocking the rest.
+    """
+
+    def __init__(
+        self,
+        tables: Dict[str, Tuple[str, int]],
+        months_ahead: int,
+        interval_seconds: float,
+        db_engine: Engine = engine
+    ):
+        self.tables = tables
+        self.months_ahead = months_ahead
+        self.interval = interval_seconds
+        self.engine = db_engine
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.partitions: Dict[str, List[str]] = {}
+        self.stats: Dict[str, Any] = {"runs": 0, "created": 0, "detached": 0, "errors": 0, "last_run": None}
+
+    @property
+    def enabled(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    def maintain(self, today: Optional[date] = None) -> Dict[str, Dict[str, List[str]]]:
+        """Create missing partitions and detach expired ones; returns what changed per table"""
+        if not self.enabled:
+            return {}
+        today = today or datetime.utcnow().date()
+        current = date(today.year, today.month, 1)
+        changes = {}
+        with self._lock:
+            for table, (_, retention_months) in self.tables.items():
+                if not self._is_partitioned(table):
+                    logger.warning(f"PARTITIONS: {table} is not partitioned (run the migrations); skipping")
+                    continue
+                existing = set(self._list_partitions(table))
+                created, detached = [], []
+
+                wanted = {f"{table}_default": "DEFAULT"}
+                for offset in range(self.months_ahead + 1):
+                    month = add_months(current, offset)
+                    wanted[partition_name(table, month)] = (
+                        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+                    )
+                for name, bounds in wanted.items():
+                    if name not in existing and self._execute(
+                        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" {bounds}'
+                    ):
+                        created.append(name)
+
+                if retention_months > 0:
+                    cutoff = add_months(current, -retention_months)
+                    for name in sorted(existing):
+                        month = partition_month(table, name)
+                        if month is not None and month < cutoff and self._execute(
+                            f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'
+                        ):
+                            detached.append(name)
+
+                self.partitions[table] = sorted(self._list_partitions(table))
+                self.stats["created"] += len(created)
+                self.stats["detached"] += len(detached)
+                if created or detached:
+                    logger.info(f"PARTITIONS: {table} created {created} detached {detached}")
+                changes[table] = {"created": created, "detached": detached}
+            self.stats["runs"] += 1
+            self.stats["last_run"] = datetime.utcnow().isoformat()
+        return changes
+
+    def _is_partitioned(self, table: str) -> bool:
+        with self.engine.connect() as conn:
+            return conn.execute(
+                text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+                {"table": table}
+            ).first() is not None
+
+    def _list_partitions(self, table: str) -> List[str]:
+        with self.engine.connect() as conn:
+            return list(conn.execute(
+                text(
+                    "SELECT child.relname FROM pg_inherits "
+                    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                    "WHERE pg_inherits.inhparent = to_regclass(:table)"
+                ),
+                {"table": table}
+            ).scalars())
+
+    def _execute(self, statement: str) -> bool:
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text(statement))
+            return True
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"PARTITIONS: {statement} failed: {e}")
+            return False
+
+    # ============= LIFECYCLE =============
+
+    def start(self) -> None:
+        """Start periodic maintenance (idempotent; no-op off PostgreSQL)"""
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="partition-maintainer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(5)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.maintain()
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {e}", exc_info=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "months_ahead": self.months_ahead,
+            "tables": {
+                table: {
+                    "partition_key": column,
+                    "retention_months": retention_months,
+                    "partitions": self.partitions.get(table, []),
+                }
+                for table, (column, retention_months) in self.tables.items()
+            },
+        }
+
+
+# Global partition maintainer
+partition_maintainer = PartitionMaintainer(
+    tables=PARTITIONED_TABLES,
+    months_ahead=settings.partition_months_ahead,
+    interval_seconds=settings.partition_maintenance_interval_seconds
+)
@@ -0,0 +1,178 @@
+"""
+Request rate limiting.
+
+Token buckets per (client, route group). Route groups are path prefixes with
+their own refill rate and burst; a client is the authenticated user, or the
+remote address for anonymous requests. Buckets live in process memory by
+default; with a Redis URL configured they are shared by all workers.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import time
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds between sweeps of idle (refilled) in-process buckets
+SWEEP_INTERVAL_SECONDS = 60.0
+
+# Atomic refill-and-take on a Redis hash; returns {allowed, seconds until a token is available}
+REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(wait)}
+"""
+
+
+def parse_rules(spec: str) -> List[Tuple[str, float, float]]:
+    """
+    Parse "<path prefix>=<requests per second>:<burst>,..." into rules,
+    longest prefix first ("default" applies to every other path)
+    """
+    rules = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        prefix, _, limit = item.partition("=")
+        rate, _, burst = limit.partition(":")
+        rate = float(rate)
+        rules.append((prefix.strip(), rate, float(burst) if burst else rate))
+    return sorted(rules, key=lambda rule: len(rule[0]) if rule[0] != "default" else -1, reverse=True)
+
+
+class LocalBuckets:
+    """In-process token buckets (single worker; the event loop serializes access)"""
+
+    def __init__(self):
+        # key -> [tokens, last refill, rate, burst]
+        self._buckets: Dict[str, list] = {}
+        self._next_sweep = time.monotonic() + SWEEP_INTERVAL_SECONDS
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def acquire(self, key: str, rate: float, burst: float) -> float:
+        """Take a token; returns 0 when allowed, else seconds until one is available"""
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [burst, now, rate, burst]
+        else:
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rate
+
+    def _sweep(self, now: float) -> None:
+        """Drop buckets that have refilled completely (they hold no state a new bucket would not)"""
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items()
+            if bucket[0] + (now - bucket[1]) * bucket[2] < bucket[3]
+        }
+        self._next_sweep = now + SWEEP_INTERVAL_SECONDS
+
+
+class RedisBuckets:
+    """Token buckets in Redis, consistent across workers (needs the optional redis package)"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis_asyncio
+
+        self._client = redis_asyncio.from_url(url)
+        self._script = self._client.register_script(REDIS_TOKEN_BUCKET)
+
+    def __len__(self) -> int:
+        return 0
+
+    async def acquire(self, key: str, rate: float, burst: float) -> float:
+        allowed, wait = await self._script(keys=[f"ratelimit:{key}"], args=[rate, burst])
+        return 0.0 if int(allowed) else float(wait)
+
+
+class RateLimiter:
+    """
+    Per-client, per-route-group token bucket limiter.
+
+    check() returns None when the request may proceed, or the number of
+    seconds the client should wait (the Retry-After value) when throttled.
+    A shared backend that cannot be reached fails open, so a Redis outage
+    does not take the API down with it.
+    """
+
+    def __init__(self, enabled: bool, rules: str, exempt: str, redis_url: str = ""):
+        self.enabled = enabled
+        self.rules = parse_rules(rules)
+        self.exempt = tuple(filter(None, (path.strip() for path in exempt.split(","))))
+        self.backend = LocalBuckets()
+        if redis_url:
+            try:
+                self.backend = RedisBuckets(redis_url)
+            except ImportError:
+                logger.error("RATE_LIMIT_REDIS_URL is set but the redis package is not installed; limiting per worker")
+        self.stats = {"allowed": 0, "throttled": 0, "backend_errors": 0}
+
+    def rule_for(self, path: str) -> Optional[Tuple[str, float, float]]:
+        """(group, rate, burst) for a path, or None if it is not limited"""
+        if path.startswith(self.exempt):
+            return None
+        for rule in self.rules:
+            if rule[0] == "default" or path.startswith(rule[0]):
+                return rule
+        return None
+
+    async def check(self, path: str, client: str) -> Optional[float]:
+        if not self.enabled:
+            return None
+        rule = self.rule_for(path)
+        if rule is None:
+            return None
+        group, rate, burst = rule
+        try:
+            wait = await self.backend.acquire(f"{client}|{group}", rate, burst)
+        except Exception as e:
+            self.stats["backend_errors"] += 1
+            logger.error(f"Rate limit backend error: {e}")
+            return None
+        if wait:
+            self.stats["throttled"] += 1
+            return wait
+        self.stats["allowed"] += 1
+        return None
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "buckets": len(self.backend),
+            "rules": [{"group": group, "rate": rate, "burst": burst} for group, rate, burst in self.rules],
+        }
+
+
+# Global rate limiter
+rate_limiter = RateLimiter(
+    enabled=settings.rate_limit_enabled,
+    rules=settings.rate_limit_rules,
+    exempt=settings.rate_limit_exempt,
+    redis_url=settings.rate_limit_redis_url
+)
@@ -4,6 +4,7 @@ Handles real-time communication for trade updates
 """
 from typing import List, Dict
 from fastapi import WebSocket, WebSocketDisconnect
+import asyncio
 import json
 import logging
 
@@ -16,10 +17,13 @@ class ConnectionManager:
     def __init__(self):
         # Store active connections by channel
         self.active_connections: Dict[str, List[WebSocket]] = {}
+        # Event loop serving the connections (captured on first connect)
+        self._loop = None
     
     async def connect(self, websocket: WebSocket, channel: str = "trades"):
         """Accept and register a new WebSocket connection"""
         await websocket.accept()
+        self._loop = asyncio.get_running_loop()
         
         if channel not in self.active_connections:
             self.active_connections[channel] = []
@@ -58,6 +62,34 @@ class ConnectionManager:
         for connection in disconnected:
             self.disconnect(connection, channel)
     
+    def has_subscribers(self, channel: str) -> bool:
+        """Check whether a channel has any active connections"""
+        return bool(self.active_connections.get(channel))
+    
+    def publish(self, message: dict, channel: str):
+        """
+        Schedule a broadcast from synchronous code (route threadpool, event handlers).
+        
+        Silently skips channels without subscribers so high-frequency publishers
+        do not pay for serialization when nobody is listening.
+        """
+        if not self.has_subscribers(channel):
+            return
+        
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        
+        if running_loop is loop:
+            loop.create_task(self.broadcast(message, channel))
+        else:
+            asyncio.run_coroutine_threadsafe(self.broadcast(message, channel), loop)
+    
     async def broadcast_trade_update(self, trade_data: dict, event_type: str = "trade_created"):
         """
         Broadcast trade update to all connected clients
@@ -1,135 +1,97 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.models import OrderHdr, Trader, Account, Instrument
 from app import schemas
-from datetime import datetime
+from app.core import publish_event, EventType
+from app.core.exceptions import InvalidOrderError
+from app.modules.order_intake import validate_order, format_order, publish_order_created
+from app.modules.static_data.cache import static_data_cache
 import uuid
 
-def create_order(db: Session, order: dict):
-    order_id = str(uuid.uuid4())
-    db_order = OrderHdr(
-        order_id=order_id,
-        instrument_id=order['instrument'],
-        side=order['side'].upper(),
-        qty=order['qty'],
-        limit_price=order['price'],
-        type=order['type'].upper(),
-        tif=order['tif'].upper(),
-        trader_id=order['trader'],
-        account_id=order['account'],
-        status="NEW",
-        created_at=datetime.utcnow()
-    )
-    db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
-
-    # Lookup instrument symbol
-    instrument_symbol = db_order.instrument_id
-    if db_order.instrument_id:
-        instrument = db.query(Instrument).filter(Instrument.instrument_id == db_order.instrument_id).first()
-        if instrument:
-            instrument_symbol = instrument.symbol
-    
-    # Lookup trader user_id
-    trader_user_id = db_order.trader_id
-    if db_order.trader_id:
-        trader = db.query(Trader).filter(Trader.trader_id == db_order.trader_id).first()
-        if trader:
-            trader_user_id = trader.user_id
-    
-    # Lookup account code
-    account_code = db_order.account_id
-    if db_order.account_id:
-        account = db.query(Account).filter(Account.account_id == db_order.account_id).first()
-        if account:
-            account_code = account.code
-
-    return {
-        "id": db_order.order_id,
-        "instrument": instrument_symbol,
-        "side": db_order.side,
-        "qty": db_order.qty,
-        "price": float(db_order.limit_price) if db_order.limit_price else None,
-        "type": db_order.type,
-        "tif": db_order.tif,
-        "trader": trader_user_id,
-        "account": account_code,
-        "status": db_order.status,
-        "created_at": str(db_order.created_at)
-    }
-
 def create_strategy_order(db: Session, strategy_order: dict):
     """
-    Create a strategy order consisting of multiple legs.
-    For simplicity, we'll create individual orders for each leg.
+    Book a strategy order as one atomic group of leg orders.
+
+    Legs are expanded from the cached StrategyLeg definition of the strategy
+    instrument (ratio, side and leg_sequence); strategies without a definition
+    fall back to the ad hoc legs in the payload. All legs share a
+    parent_order_id and are inserted in one multi-row statement and one commit.
+
+    Raises:
+        InvalidOrderError: If the strategy or any leg fails validation
     """
-    created_orders = []
-    
-    # Get the first trader for now (in a real app, you'd want to handle this properly)
-    trader = db.query(Trader).first()
-    if not trader:
-        raise ValueError("No traders found in the system")
-    
-    # Create orders for each leg
-    for i, leg in enumerate(strategy_order.get('legs', [])):
-        order_id = str(uuid.uuid4())
-        leg_side = leg.get('side', strategy_order.get('side', 'BUY')).upper()
-        
-        db_order = OrderHdr(
-            order_id=order_id,
-            instrument_id=strategy_order['underlying'],
-            side=leg_side,
-            qty=int(leg.get('quantity', strategy_order.get('quantity', 1))),
-            limit_price=float(leg.get('price')) if leg.get('price') else None,
-            type=leg.get('orderType', 'LIMIT').upper(),
-            tif=strategy_order.get('timeInForce', 'DAY').upper(),
-            trader_id=trader.trader_id,  # Use actual trader ID
-            account_id=strategy_order['account'],
-            status="NEW",
-            created_at=datetime.utcnow()
-        )
-        db.add(db_order)
-        db.commit()
-        db.refresh(db_order)
+    strategy_id = strategy_order.get('underlying')
+    quantity = strategy_order.get('quantity', 1)
+    strategy_side = str(strategy_order.get('side', 'BUY')).upper()
+    request_legs = strategy_order.get('legs') or []
+    definition = static_data_cache.get_strategy_legs(strategy_id) if strategy_id else []
 
-        # Lookup instrument symbol
-        instrument_symbol = db_order.instrument_id
-        if db_order.instrument_id:
-            instrument = db.query(Instrument).filter(Instrument.instrument_id == db_order.instrument_id).first()
-            if instrument:
-                instrument_symbol = instrument.symbol
-        
-        # Lookup trader user_id
-        trader_user_id = db_order.trader_id
-        if db_order.trader_id:
-            trader_obj = db.query(Trader).filter(Trader.trader_id == db_order.trader_id).first()
-            if trader_obj:
-                trader_user_id = trader_obj.user_id
-        
-        # Lookup account code
-        account_code = db_order.account_id
-        if db_order.account_id:
-            account = db.query(Account).filter(Account.account_id == db_order.account_id).first()
-            if account:
-                account_code = account.code
+    leg_specs = []
+    if definition:
+        # Per-leg prices may be supplied by leg_sequence, otherwise by position
+        by_sequence = {leg.get('leg_sequence'): leg for leg in request_legs if leg.get('leg_sequence') is not None}
+        for i, leg_def in enumerate(definition):
+            if by_sequence:
+                leg = by_sequence.get(leg_def['leg_sequence'], {})
+            else:
+                leg = request_legs[i] if i < len(request_legs) else {}
+            ratio = leg_def['ratio']
+            direction = (1 if leg_def['side'] == 'LONG' else -1) * (1 if ratio >= 0 else -1)
+            if strategy_side == 'SELL':
+                direction = -direction
+            if leg_def['quantity_type'] == 'ABSOLUTE':
+                qty = int(round(abs(ratio)))
+            else:
+                try:
+                    qty = int(round(abs(ratio) * float(quantity)))
+                except (TypeError, ValueError):
+                    raise InvalidOrderError("Strategy quantity must be numeric")
+            if qty <= 0:
+                raise InvalidOrderError(f"Leg {leg_def['leg_sequence']} of strategy '{strategy_id}' has zero quantity")
+            leg_specs.append((leg_def['component_instrument_id'], 'BUY' if direction > 0 else 'SELL', qty,
+                              leg_def['leg_sequence'], leg))
+    else:
+        for i, leg in enumerate(request_legs):
+            leg_specs.append((strategy_id, leg.get('side', strategy_side), leg.get('quantity', quantity),
+                              i + 1, leg))
 
-        created_orders.append({
-            "id": db_order.order_id,
-            "instrument": instrument_symbol,
-            "side": db_order.side,
-            "qty": db_order.qty,
-            "price": float(db_order.limit_price) if db_order.limit_price else None,
-            "type": db_order.type,
-            "tif": db_order.tif,
-            "trader": trader_user_id,
-            "account": account_code,
-            "status": db_order.status,
-            "created_at": str(db_order.created_at),
-            "strategy_leg": f"{strategy_order.get('strategyType', 'STRATEGY')}_{leg.get('type', 'LEG')}_{i+1}",
+    if not leg_specs:
+        raise InvalidOrderError(f"Strategy '{strategy_id}' has no legs")
+
+    parent_order_id = str(uuid.uuid4())
+    rows = []
+    for instrument_id, side, qty, leg_sequence, leg in leg_specs:
+        price = leg.get('price')
+        row = validate_order({
+            "instrument": instrument_id,
+            "side": side,
+            "qty": qty,
+            "price": price,
+            "type": leg.get('orderType') or ('LIMIT' if price not in (None, '') else 'MARKET'),
+            "tif": strategy_order.get('timeInForce', 'DAY'),
+            "trader": strategy_order.get('trader'),
+            "account": strategy_order.get('account')
+        })
+        row["parent_order_id"] = parent_order_id
+        row["leg_sequence"] = leg_sequence
+        rows.append(row)
+
+    db.execute(insert(OrderHdr).values(rows))
+    db.commit()
+
+    created_orders = []
+    for (instrument_id, side, qty, leg_sequence, leg), row in zip(leg_specs, rows):
+        publish_order_created(row)
+        created = format_order(row)
+        created.update({
+            "parent_order_id": parent_order_id,
+            "leg_sequence": leg_sequence,
+            "strategy_leg": f"{strategy_order.get('strategyType', 'STRATEGY')}_{leg.get('type', 'LEG')}_{leg_sequence}",
             "strike": leg.get('strike'),
             "leg_type": leg.get('type')
         })
-    
+        created_orders.append(created)
+
     return created_orders
 
 def get_orders(db: Session):
@@ -180,6 +142,13 @@ def update_order_status(db: Session, order_id: str, status: str):
     o.status = status
     db.commit()
     db.refresh(o)
+
+    if status == "CANCELLED":
+        publish_event(EventType.ORDER_CANCELLED, {
+            "order_id": o.order_id,
+            "instrument_id": o.instrument_id
+        }, "order")
+
     return {"id": o.order_id, "status": o.status}
 
 
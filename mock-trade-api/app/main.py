@@ -1,6 +1,9 @@
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import logging
+import math
 import os
 from datetime import datetime
 
@@ -32,11 +35,108 @@ from app.modules.trade_query import routes as trade_query_routes
 from app.modules.confirmations import routes as confirmations_routes
 from app.modules.settlement import routes as settlement_routes
 from app.modules.accounting import routes as accounting_routes
+from app.modules.order_book import routes as order_book_routes
+from app.modules.order_book.service import OrderBookService
+from app.modules.order_intake import order_intake
+from app.modules.order_gateway import routes as order_gateway_routes
+from app.modules.order_gateway.service import OrderGatewayService
+from app.modules.fix_gateway import routes as fix_gateway_routes
+from app.modules.fix_gateway.service import FixGatewayService, fix_acceptor
+from app.modules.static_data.cache import static_data_cache
+from app.modules.accounting.service import position_keeper
+from app.modules.accounting.lots import tax_lot_ledger
+from app.modules.accounting.live_pnl import live_pnl
+from app.modules.settlement.stream import settlement_stream
+from app.modules.confirmations.documents import document_pipeline
+from app.core import SessionLocal, settings, pool_status
+from app.core.rate_limit import rate_limiter
+from app.core.partitions import partition_maintainer
+from app.modules.auth.middleware import request_username
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start in-memory engines on startup and stop them on shutdown"""
+    static_data_cache.register_event_handlers()
+
+    if partition_maintainer.enabled:
+        logger.info("Maintaining table partitions...")
+        try:
+            partition_maintainer.maintain()
+        except Exception as e:
+            logger.error(f"Failed to maintain table partitions: {e}", exc_info=True)
+        partition_maintainer.start()
+
+    logger.info("Starting order books...")
+    OrderBookService.register_event_handlers()
+    db = SessionLocal()
+    try:
+        OrderBookService.load_open_orders(db)
+    except Exception as e:
+        logger.error(f"Failed to load open orders into order books: {e}", exc_info=True)
+    finally:
+        db.close()
+
+    logger.info("Starting position keeper...")
+    position_keeper.register_event_handlers()
+    try:
+        position_keeper.rebuild()
+    except Exception as e:
+        logger.error(f"Failed to rebuild positions: {e}", exc_info=True)
+    position_keeper.start()
+
+    logger.info("Loading tax lots...")
+    tax_lot_ledger.register_event_handlers()
+    try:
+        tax_lot_ledger.load()
+    except Exception as e:
+        logger.error(f"Failed to load tax lots: {e}", exc_info=True)
+    tax_lot_ledger.start()
+
+    logger.info("Starting live P&L...")
+    live_pnl.register_event_handlers()
+    try:
+        live_pnl.rebuild()
+    except Exception as e:
+        logger.error(f"Failed to build live P&L: {e}", exc_info=True)
+    live_pnl.start()
+
+    logger.info("Starting settlement stream...")
+    settlement_stream.register_event_handlers()
+    try:
+        settlement_stream.load()
+    except Exception as e:
+        logger.error(f"Failed to load settlement journal version: {e}", exc_info=True)
+    settlement_stream.start()
+
+    logger.info("Starting order intake writer...")
+    order_intake.start()
+    OrderGatewayService.register_event_handlers()
+
+    FixGatewayService.register_event_handlers()
+    if settings.fix_acceptor_enabled:
+        logger.info("Starting FIX acceptor...")
+        await fix_acceptor.start()
+
+    yield
+
+    await fix_acceptor.stop()
+
+    logger.info("Flushing order intake queue...")
+    order_intake.stop()
+    position_keeper.stop()
+    tax_lot_ledger.stop()
+    live_pnl.stop()
+    settlement_stream.stop()
+    document_pipeline.stop()
+    partition_maintainer.stop()
+
 
 app = FastAPI(
     title="MockTrade API",
     description="Modular Trading Platform API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add logging middleware
@@ -51,6 +151,20 @@ async def log_requests(request: Request, call_next):
         logger.error(f"REQUEST ERROR: {request.method} {request.url.path} - {str(e)}", exc_info=True)
         raise
 
+# Throttle clients per user and route group (added after logging, so it runs first)
+@app.middleware("http")
+async def rate_limit(request: Request, call_next):
+    client = request_username(request) or (request.client.host if request.client else "unknown")
+    retry_after = await rate_limiter.check(request.url.path, client)
+    if retry_after is not None:
+        logger.warning(f"RATE LIMITED: {client} {request.method} {request.url.path}")
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Rate limit exceeded"},
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+    return await call_next(request)
+
 # Enable CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -58,6 +172,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Refreshed-Token"],
 )
 
 # Register legacy routes
@@ -85,6 +200,12 @@ logger.info("Registering settlement routes...")
 app.include_router(settlement_routes.router)
 logger.info("Registering accounting routes...")
 app.include_router(accounting_routes.router)
+logger.info("Registering order book routes...")
+app.include_router(order_book_routes.router)
+logger.info("Registering order gateway routes...")
+app.include_router(order_gateway_routes.router)
+logger.info("Registering FIX gateway routes...")
+app.include_router(fix_gateway_routes.router)
 
 logger.info("All routes registered successfully")
 
@@ -101,7 +222,10 @@ def root():
             "enrichment",
             "trades",
             "trade-query",
-            "security"
+            "security",
+            "order-book",
+            "order-gateway",
+            "fix"
         ]
     }
 
@@ -111,6 +235,21 @@ def health_check():
     logger.info("Health check endpoint called - status: healthy")
     return {"status": "healthy"}
 
+@app.get("/api/v1/rate-limit")
+def rate_limit_stats():
+    """Rate limiter rules and counters"""
+    return rate_limiter.get_stats()
+
+@app.get("/api/v1/db/pools")
+def database_pools():
+    """Connection pool usage per engine"""
+    return pool_status()
+
+@app.get("/api/v1/db/partitions")
+def database_partitions():
+    """Monthly partitions per partitioned table and maintenance counters"""
+    return partition_maintainer.get_stats()
+
 @app.get("/api/v1/modules")
 def list_modules():
     """List available modules and their endpoints"""
@@ -141,6 +280,8 @@ def list_modules():
             "order": {
                 "description": "Order management (legacy)",
                 "endpoints": [
+                    "POST /api/v1/orders/",
+                    "GET /api/v1/orders/intake/stats",
                     "POST /order/",
                     "GET /order/",
                     "POST /order/{order_id}/simulate_fill",
@@ -173,6 +314,26 @@ def list_modules():
                     "GET /api/v1/trade-query/enriched-trades",
                     "GET /api/v1/trade-query/enriched-orders"
                 ]
+            },
+            "order_book": {
+                "description": "L2 market depth from resting orders",
+                "endpoints": [
+                    "GET /api/v1/order-book/{instrument_id}/depth",
+                    "WS /api/v1/order-book/ws/{instrument_id}"
+                ]
+            },
+            "order_gateway": {
+                "description": "Binary low-latency order entry",
+                "endpoints": [
+                    "WS /api/v1/order-gateway/ws",
+                    "GET /api/v1/order-gateway/stats"
+                ]
+            },
+            "fix_gateway": {
+                "description": "FIX 4.4 acceptor (TCP, enable with FIX_ACCEPTOR_ENABLED)",
+                "endpoints": [
+                    "GET /api/v1/fix/sessions"
+                ]
             }
         }
     }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, Date, ForeignKey, DECIMAL, TIMESTAMP, JSON
+from sqlalchemy import Column, String, Integer, Float, Date, ForeignKey, DECIMAL, TIMESTAMP, JSON, Index, text
 from app.core import Base
 
 # ---------------- Core Tables ---------------- #
@@ -183,6 +183,19 @@ class Trader(Base):
 
 class OrderHdr(Base):
     __tablename__ = "order_hdr"
+    __table_args__ = (
+        # Order listing filters, newest first
+        Index("ix_order_hdr_account_created_at", "account_id", "created_at"),
+        Index("ix_order_hdr_trader_created_at", "trader_id", "created_at"),
+        Index("ix_order_hdr_instrument_created_at", "instrument_id", "created_at"),
+        Index("ix_order_hdr_status_created_at", "status", "created_at"),
+        # Resting orders loaded by the order book rebuild
+        Index(
+            "ix_order_hdr_resting_instrument", "instrument_id",
+            postgresql_where=text("status IN ('NEW', 'PARTIALLY_FILLED')"),
+            sqlite_where=text("status IN ('NEW', 'PARTIALLY_FILLED')")
+        ),
+    )
     order_id = Column(String, primary_key=True, index=True)
     instrument_id = Column(String, ForeignKey("instrument.instrument_id"))
     side = Column(String)
@@ -195,6 +208,10 @@ class OrderHdr(Base):
     status = Column(String)
     created_at = Column(TIMESTAMP)
 
+    # Strategy linkage (legs of one strategy order share parent_order_id)
+    parent_order_id = Column(String, nullable=True, index=True)
+    leg_sequence = Column(Integer, nullable=True)
+
 class TradeHdr(Base):
     __tablename__ = "trade_hdr"
     trade_id = Column(String, primary_key=True, index=True)
@@ -243,6 +260,10 @@ class PositionDaily(Base):
 
 class VariationMargin(Base):
     __tablename__ = "variation_margin"
+    # One row per position and day, so the daily VM run can upsert
+    __table_args__ = (
+        Index("ix_variation_margin_position_date", "instrument_id", "account_id", "val_date", unique=True),
+    )
     vm_id = Column(String, primary_key=True, index=True)
     instrument_id = Column(String, ForeignKey("instrument.instrument_id"))
     account_id = Column(String, ForeignKey("account.account_id"))
@@ -262,6 +283,40 @@ class EodPnl(Base):
     unrealized_pnl = Column(DECIMAL)
     total_pnl = Column(DECIMAL)
 
+class TaxLot(Base):
+    __tablename__ = "tax_lot"
+    __table_args__ = (
+        Index("ix_tax_lot_position", "account_id", "instrument_id", "status"),
+    )
+    lot_id = Column(String, primary_key=True)  # opening trade_id
+    account_id = Column(String, ForeignKey("account.account_id"))
+    instrument_id = Column(String, ForeignKey("instrument.instrument_id"))
+    side = Column(String)  # LONG or SHORT
+    open_trade_id = Column(String)
+    open_time = Column(TIMESTAMP)
+    open_price = Column(Float)
+    original_qty = Column(Integer)
+    remaining_qty = Column(Integer)
+    status = Column(String)  # OPEN or CLOSED
+
+class TaxLotRelief(Base):
+    __tablename__ = "tax_lot_relief"
+    __table_args__ = (
+        Index("ix_tax_lot_relief_close_trade", "close_trade_id"),
+        Index("ix_tax_lot_relief_position", "account_id", "instrument_id"),
+    )
+    relief_id = Column(String, primary_key=True)  # close_trade_id:lot_id
+    lot_id = Column(String)
+    close_trade_id = Column(String)
+    account_id = Column(String, ForeignKey("account.account_id"))
+    instrument_id = Column(String, ForeignKey("instrument.instrument_id"))
+    method = Column(String)  # FIFO, LIFO or AVERAGE
+    qty = Column(Integer)
+    open_price = Column(Float)
+    close_price = Column(Float)
+    realized_pnl = Column(Float)
+    close_time = Column(TIMESTAMP)
+
 class AuditLog(Base):
     __tablename__ = "audit_log"
     audit_id = Column(String, primary_key=True, index=True)
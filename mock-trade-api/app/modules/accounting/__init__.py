@@ -1,8 +1,12 @@
 """
 Accounting Module
-Handles P&L, position tracking, and accounting operations.
+Handles P&L, position tracking, tax lots, and accounting operations.
 """
 
+from app.modules.accounting.service import PositionKeeper, position_keeper, PositionHistoryService, EodPnlService, VariationMarginService, compute_eod_pnl
+from app.modules.accounting.lots import TaxLotLedger, tax_lot_ledger
+from app.modules.accounting.live_pnl import LivePnlAggregator, live_pnl
 from app.modules.accounting.routes import router
 
-__all__ = ['router']
+__all__ = ['PositionKeeper', 'position_keeper', 'PositionHistoryService', 'EodPnlService', 'VariationMarginService', 'compute_eod_pnl',
+           'TaxLotLedger', 'tax_lot_ledger', 'LivePnlAggregator', 'live_pnl', 'router']
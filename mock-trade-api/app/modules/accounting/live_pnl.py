@@ -0,0 +1,434 @@
+"""
+Accounting Module - Live P&L
+Incrementally maintained P&L per account and portfolio, pushed to WebSocket
+channels at a throttled rate.
+"""
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Set, Tuple, Any, Callable
+from datetime import date, datetime
+import threading
+import time
+import logging
+
+from app.core import settings, SessionLocal, event_bus, Event, EventType
+from app.core.websocket import manager
+from app.models import PortfolioEnrichmentMapping
+from app.modules.trade.models import Trade
+from app.modules.market_data.models import MarketData
+from app.modules.static_data.cache import static_data_cache
+from app.modules.accounting.service import PositionKey, signed_qty, EodPnlService
+
+logger = logging.getLogger(__name__)
+
+ALL_CHANNEL = "pnl"
+
+
+def mark_from_quote(last_price: Optional[float], bid_price: Optional[float], ask_price: Optional[float]) -> Optional[float]:
+    """Mark price from a market data update: last trade, else mid, else either side"""
+    if last_price is not None:
+        return float(last_price)
+    if bid_price is not None and ask_price is not None:
+        return (float(bid_price) + float(ask_price)) / 2
+    if bid_price is not None or ask_price is not None:
+        return float(bid_price if bid_price is not None else ask_price)
+    return None
+
+
+class LivePnlAggregator:
+    """
+    Running P&L per position, account and portfolio.
+
+    A position's total (realized + unrealized) P&L is
+    multiplier * (qty * mark - cash), where cash is the signed traded notional,
+    so a trade only revalues its own position and a mark change only the open
+    positions in that instrument. Each revaluation adds its difference to the
+    account and portfolio totals and marks them dirty; a publisher thread
+    pushes the dirty totals once per interval, so any number of watchers cost
+    one computation per change.
+
+    Portfolio rules and instrument terms (multiplier, symbol) are reloaded by
+    the publisher thread every rules TTL, or on its next tick after a
+    portfolio mapping change, and every position is re-bucketed. Static data
+    lookups that may hit the database are made before taking the lock.
+    """
+
+    def __init__(
+        self,
+        publish_interval_ms: float,
+        rules_ttl_seconds: float,
+        session_factory: Callable = SessionLocal
+    ):
+        self.publish_interval = publish_interval_ms / 1000.0
+        self.rules_ttl_seconds = rules_ttl_seconds
+        self._session_factory = session_factory
+        # (instrument_id, account_id) -> [qty, cash, pnl]
+        self._positions: Dict[PositionKey, List[float]] = {}
+        # instrument_id -> accounts with a non-zero position
+        self._holders: Dict[str, Set[str]] = {}
+        self._marks: Dict[str, float] = {}
+        self._account_pnl: Dict[str, float] = {}
+        self._portfolio_pnl: Dict[str, float] = {}
+        # account_id -> [(instrument_code or None, portfolio)]
+        self._rules: Dict[str, List[Tuple[Optional[str], str]]] = {}
+        self._portfolio_of: Dict[PositionKey, Optional[str]] = {}
+        self._rules_loaded_at = 0.0
+        # instrument_id -> (contract multiplier, symbol)
+        self._terms: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._dirty_accounts: Set[str] = set()
+        self._dirty_portfolios: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._registered = False
+        self.stats = {
+            "trades_applied": 0, "marks_applied": 0, "revaluations": 0, "rule_reloads": 0,
+            "publishes": 0, "messages": 0
+        }
+
+    @staticmethod
+    def account_channel(account_id: str) -> str:
+        return f"pnl:account:{account_id}"
+
+    @staticmethod
+    def portfolio_channel(portfolio: str) -> str:
+        return f"pnl:portfolio:{portfolio}"
+
+    # ============= PORTFOLIO RESOLUTION =============
+
+    @staticmethod
+    def _instrument_terms(instrument_id: str) -> Tuple[float, Optional[str]]:
+        """Multiplier and symbol from the static data cache (may reload it, so never call under the lock)"""
+        return static_data_cache.contract_multiplier(instrument_id), static_data_cache.instrument_symbol(instrument_id)
+
+    def _resolve_portfolio(self, key: PositionKey) -> Optional[str]:
+        """Instrument-specific account rule first, then the account's catch-all rule"""
+        if key in self._portfolio_of:
+            return self._portfolio_of[key]
+        instrument_id, account_id = key
+        symbol = self._terms[instrument_id][1]
+        portfolio = None
+        for instrument_code, rule_portfolio in self._rules.get(account_id, ()):
+            if instrument_code in (instrument_id, symbol):
+                portfolio = rule_portfolio
+                break
+            if instrument_code is None and portfolio is None:
+                portfolio = rule_portfolio
+        self._portfolio_of[key] = portfolio
+        return portfolio
+
+    # ============= INCREMENTAL UPDATES =============
+
+    def _revalue(self, key: PositionKey) -> None:
+        """Recompute one position's P&L and push the difference into its totals (caller holds the lock)"""
+        instrument_id, account_id = key
+        position = self._positions[key]
+        mark = self._marks.get(instrument_id)
+        if mark is None:
+            return
+        pnl = self._terms[instrument_id][0] * (position[0] * mark - position[1])
+        change = pnl - position[2]
+        position[2] = pnl
+        self.stats["revaluations"] += 1
+        if not change:
+            return
+        self._account_pnl[account_id] = self._account_pnl.get(account_id, 0.0) + change
+        self._dirty_accounts.add(account_id)
+        portfolio = self._resolve_portfolio(key)
+        if portfolio:
+            self._portfolio_pnl[portfolio] = self._portfolio_pnl.get(portfolio, 0.0) + change
+            self._dirty_portfolios.add(portfolio)
+
+    def _recompute_totals(self) -> None:
+        """Revalue every position from scratch and mark old and new totals dirty (caller holds the lock)"""
+        previous_accounts, previous_portfolios = set(self._account_pnl), set(self._portfolio_pnl)
+        self._portfolio_of = {}
+        self._account_pnl, self._portfolio_pnl = {}, {}
+        for key, position in self._positions.items():
+            position[2] = 0.0
+            self._revalue(key)
+        # Totals that no longer exist are pushed as zero
+        self._dirty_accounts |= previous_accounts | set(self._account_pnl)
+        self._dirty_portfolios |= previous_portfolios | set(self._portfolio_pnl)
+
+    def apply_trade(self, instrument_id: str, account_id: str, qty_delta: int, price: Optional[float]) -> None:
+        """Apply a signed trade quantity at a price"""
+        if not instrument_id or not account_id or not qty_delta or price is None:
+            return
+        key = (instrument_id, account_id)
+        terms = self._instrument_terms(instrument_id)
+        with self._lock:
+            self._terms[instrument_id] = terms
+            # Instruments without a mark yet are marked at their first trade
+            self._marks.setdefault(instrument_id, float(price))
+            position = self._positions.get(key)
+            if position is None:
+                position = self._positions[key] = [0, 0.0, 0.0]
+            position[0] += qty_delta
+            position[1] += qty_delta * float(price)
+            holders = self._holders.setdefault(instrument_id, set())
+            if position[0]:
+                holders.add(account_id)
+            else:
+                holders.discard(account_id)
+            self._revalue(key)
+            self.stats["trades_applied"] += 1
+
+    def apply_mark(self, instrument_id: str, mark: Optional[float]) -> None:
+        """Move an instrument's mark and revalue the open positions in it"""
+        if not instrument_id or mark is None:
+            return
+        terms = self._instrument_terms(instrument_id)
+        with self._lock:
+            if self._marks.get(instrument_id) == mark:
+                return
+            self._terms[instrument_id] = terms
+            self._marks[instrument_id] = mark
+            for account_id in self._holders.get(instrument_id, ()):
+                self._revalue((instrument_id, account_id))
+            self.stats["marks_applied"] += 1
+
+    # ============= QUERIES =============
+
+    def get_snapshot(self, account_id: Optional[str] = None, portfolio: Optional[str] = None) -> Dict[str, Any]:
+        """Current totals, optionally restricted to one account or portfolio"""
+        with self._lock:
+            accounts = dict(self._account_pnl)
+            portfolios = dict(self._portfolio_pnl)
+        if account_id:
+            accounts = {account_id: accounts.get(account_id, 0.0)}
+            portfolios = {}
+        elif portfolio:
+            accounts = {}
+            portfolios = {portfolio: portfolios.get(portfolio, 0.0)}
+        return {
+            "as_of": datetime.utcnow(),
+            "accounts": [self._account_entry(acct_id, pnl) for acct_id, pnl in sorted(accounts.items())],
+            "portfolios": [{"portfolio": name, "pnl": pnl} for name, pnl in sorted(portfolios.items())]
+        }
+
+    @staticmethod
+    def _account_entry(account_id: str, pnl: float) -> Dict[str, Any]:
+        return {"account_id": account_id, "account": static_data_cache.account_code(account_id), "pnl": pnl}
+
+    # ============= REBUILD =============
+
+    def rebuild(self, db: Optional[Session] = None) -> int:
+        """
+        Reload positions, marks and portfolio rules and recompute every total
+
+        Marks are the latest market data (last or mid), else the latest
+        settlement price, else the instrument's last trade price.
+
+        Returns:
+            Number of positions loaded
+        """
+        owns_session = db is None
+        db = db or self._session_factory()
+        try:
+            signed = case((func.upper(Trade.side) == "BUY", Trade.qty), else_=-Trade.qty)
+            positions = db.execute(
+                select(Trade.instrument_id, Trade.account_id, func.sum(signed), func.sum(signed * Trade.price))
+                .where(Trade.status != "CANCELLED", Trade.instrument_id.isnot(None), Trade.account_id.isnot(None))
+                .group_by(Trade.instrument_id, Trade.account_id)
+            ).all()
+
+            marks = EodPnlService.get_settlement_prices(db, date.today())
+            latest_md = (
+                select(MarketData.instrument_id, func.max(MarketData.created_at).label("created_at"))
+                .group_by(MarketData.instrument_id).subquery()
+            )
+            for instrument_id, last_price, bid_price, ask_price in db.execute(
+                select(MarketData.instrument_id, MarketData.last_price, MarketData.bid_price, MarketData.ask_price)
+                .join(latest_md, (MarketData.instrument_id == latest_md.c.instrument_id)
+                      & (MarketData.created_at == latest_md.c.created_at))
+            ):
+                mark = mark_from_quote(last_price, bid_price, ask_price)
+                if mark is not None:
+                    marks[instrument_id] = mark
+            unmarked = {instrument_id for instrument_id, _, _, _ in positions} - set(marks)
+            if unmarked:
+                latest_trade = (
+                    select(Trade.instrument_id, func.max(Trade.exec_time).label("exec_time"))
+                    .where(Trade.instrument_id.in_(unmarked), Trade.status != "CANCELLED")
+                    .group_by(Trade.instrument_id).subquery()
+                )
+                for instrument_id, price in db.execute(
+                    select(Trade.instrument_id, Trade.price)
+                    .join(latest_trade, (Trade.instrument_id == latest_trade.c.instrument_id)
+                          & (Trade.exec_time == latest_trade.c.exec_time))
+                ):
+                    if price is not None:
+                        marks[instrument_id] = float(price)
+
+            rules = self._load_rules(db)
+        finally:
+            if owns_session:
+                db.close()
+
+        terms = {instrument_id: self._instrument_terms(instrument_id) for instrument_id, _, _, _ in positions}
+        with self._lock:
+            self._positions = {
+                (instrument_id, account_id): [int(qty or 0), float(cash or 0.0), 0.0]
+                for instrument_id, account_id, qty, cash in positions
+            }
+            self._holders = {}
+            for (instrument_id, account_id), position in self._positions.items():
+                if position[0]:
+                    self._holders.setdefault(instrument_id, set()).add(account_id)
+            self._marks = marks
+            self._rules = rules
+            self._terms = terms
+            self._rules_loaded_at = time.monotonic()
+            self._recompute_totals()
+
+        logger.info(f"Live P&L rebuilt: {len(positions)} positions, {len(marks)} marks, {len(rules)} accounts with portfolio rules")
+        return len(positions)
+
+    @staticmethod
+    def _load_rules(db: Session) -> Dict[str, List[Tuple[Optional[str], str]]]:
+        """Active account portfolio rules in rule order"""
+        rules: Dict[str, List[Tuple[Optional[str], str]]] = {}
+        for account_id, instrument_code, portfolio in db.execute(
+            select(PortfolioEnrichmentMapping.account_id, PortfolioEnrichmentMapping.instrument_code,
+                   PortfolioEnrichmentMapping.portfolio)
+            .where(PortfolioEnrichmentMapping.active == "Y", PortfolioEnrichmentMapping.account_id.isnot(None))
+            .order_by(PortfolioEnrichmentMapping.rule_id)
+        ):
+            rules.setdefault(account_id, []).append((instrument_code or None, portfolio))
+        return rules
+
+    def reload_rules(self, db: Optional[Session] = None) -> None:
+        """Reload portfolio rules and instrument terms and re-bucket every position into its portfolio"""
+        owns_session = db is None
+        db = db or self._session_factory()
+        try:
+            rules = self._load_rules(db)
+        finally:
+            if owns_session:
+                db.close()
+
+        with self._lock:
+            instrument_ids = list(self._terms)
+        terms = {instrument_id: self._instrument_terms(instrument_id) for instrument_id in instrument_ids}
+        with self._lock:
+            self._rules = rules
+            self._terms.update(terms)
+            self._rules_loaded_at = time.monotonic()
+            self._recompute_totals()
+        self.stats["rule_reloads"] += 1
+
+    def invalidate_rules(self) -> None:
+        """Reload portfolio rules on the publisher's next tick"""
+        self._rules_loaded_at = 0.0
+
+    # ============= PUBLISHING =============
+
+    def publish(self) -> int:
+        """Push dirty account and portfolio totals to their channels"""
+        with self._lock:
+            if not self._dirty_accounts and not self._dirty_portfolios:
+                return 0
+            accounts = [(acct_id, self._account_pnl.get(acct_id, 0.0)) for acct_id in self._dirty_accounts]
+            portfolios = [(name, self._portfolio_pnl.get(name, 0.0)) for name in self._dirty_portfolios]
+            self._dirty_accounts, self._dirty_portfolios = set(), set()
+
+        as_of = datetime.utcnow().isoformat()
+        messages = 0
+        for account_id, pnl in accounts:
+            if manager.has_subscribers(self.account_channel(account_id)):
+                manager.publish({"type": "pnl_update", "data": {
+                    "scope": "account", "as_of": as_of, **self._account_entry(account_id, pnl)
+                }}, self.account_channel(account_id))
+                messages += 1
+        for portfolio, pnl in portfolios:
+            if manager.has_subscribers(self.portfolio_channel(portfolio)):
+                manager.publish({"type": "pnl_update", "data": {
+                    "scope": "portfolio", "as_of": as_of, "portfolio": portfolio, "pnl": pnl
+                }}, self.portfolio_channel(portfolio))
+                messages += 1
+        if manager.has_subscribers(ALL_CHANNEL):
+            manager.publish({"type": "pnl_update", "data": {
+                "scope": "all",
+                "as_of": as_of,
+                "accounts": [self._account_entry(account_id, pnl) for account_id, pnl in accounts],
+                "portfolios": [{"portfolio": name, "pnl": pnl} for name, pnl in portfolios]
+            }}, ALL_CHANNEL)
+            messages += 1
+
+        self.stats["publishes"] += 1
+        self.stats["messages"] += messages
+        return messages
+
+    def start(self) -> None:
+        """Start the throttled publisher (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="live-pnl-publisher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(5)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.publish_interval):
+            if time.monotonic() - self._rules_loaded_at >= self.rules_ttl_seconds:
+                try:
+                    self.reload_rules()
+                except Exception as e:
+                    self._rules_loaded_at = time.monotonic()
+                    logger.error(f"Live P&L portfolio rule reload failed: {e}", exc_info=True)
+            try:
+                self.publish()
+            except Exception as e:
+                logger.error(f"Live P&L publish failed: {e}", exc_info=True)
+
+    # ============= EVENT HANDLERS =============
+
+    def on_trade_created(self, event: Event) -> None:
+        data = event.data
+        self.apply_trade(data.get("instrument_id"), data.get("account_id"),
+                         signed_qty(data.get("side"), data.get("qty")), data.get("price"))
+
+    def on_trade_cancelled(self, event: Event) -> None:
+        data = event.data
+        self.apply_trade(data.get("instrument_id"), data.get("account_id"),
+                         -signed_qty(data.get("side"), data.get("qty")), data.get("price"))
+
+    def on_trade_updated(self, event: Event) -> None:
+        data = event.data
+        if data.get("action") == "undo" and data.get("old_status") == "CANCELLED":
+            self.apply_trade(data.get("instrument_id"), data.get("account_id"),
+                             signed_qty(data.get("side"), data.get("qty")), data.get("price"))
+
+    def on_market_data_updated(self, event: Event) -> None:
+        data = event.data
+        self.apply_mark(data.get("instrument_id"),
+                        mark_from_quote(data.get("last_price"), data.get("bid_price"), data.get("ask_price")))
+
+    def on_portfolio_mapping_updated(self, event: Event) -> None:
+        self.invalidate_rules()
+
+    def register_event_handlers(self) -> None:
+        """Subscribe to trade lifecycle, market data and portfolio mapping events (idempotent)"""
+        if self._registered:
+            return
+        event_bus.subscribe(EventType.TRADE_CREATED, self.on_trade_created)
+        event_bus.subscribe(EventType.TRADE_CANCELLED, self.on_trade_cancelled)
+        event_bus.subscribe(EventType.TRADE_UPDATED, self.on_trade_updated)
+        event_bus.subscribe(EventType.MARKET_DATA_UPDATED, self.on_market_data_updated)
+        event_bus.subscribe(EventType.PORTFOLIO_MAPPING_UPDATED, self.on_portfolio_mapping_updated)
+        self._registered = True
+
+
+# Global live P&L aggregator
+live_pnl = LivePnlAggregator(
+    publish_interval_ms=settings.live_pnl_publish_interval_ms,
+    rules_ttl_seconds=settings.live_pnl_rules_ttl_seconds
+)
@@ -0,0 +1,583 @@
+"""
+Accounting Module - Tax Lot Ledger
+Open lots per (account_id, instrument_id) built from trades and relieved by
+opposing trades with FIFO, LIFO or average-cost matching.
+"""
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Set, Tuple, Any, Callable
+from array import array
+from datetime import datetime
+import threading
+import logging
+
+from app.core import settings, SessionLocal, event_bus, Event, EventType, bulk_upsert, copy_rows
+from app.models import TaxLot, TaxLotRelief
+from app.modules.trade.models import Trade
+from app.modules.static_data.cache import static_data_cache
+from app.modules.accounting.service import signed_qty
+
+logger = logging.getLogger(__name__)
+
+LOT_METHODS = ("FIFO", "LIFO", "AVERAGE")
+
+LotKey = Tuple[str, str]  # (account_id, instrument_id)
+
+# Rows per INSERT ... ON CONFLICT statement (keeps SQLite under its bind limit)
+FLUSH_CHUNK_SIZE = 500
+
+# Consumed head slots are only compacted past this size
+COMPACT_MIN_HEAD = 1024
+
+# Unlocked position replays retried after racing a new trade, before querying under the lock
+REPLAY_ATTEMPTS = 3
+
+LOT_COLUMNS = ("lot_id", "account_id", "instrument_id", "side", "open_trade_id", "open_time",
+               "open_price", "original_qty", "remaining_qty", "status")
+RELIEF_COLUMNS = ("relief_id", "lot_id", "close_trade_id", "account_id", "instrument_id", "method",
+                  "qty", "open_price", "close_price", "realized_pnl", "close_time")
+
+# (lot_id, relieved qty, cost price, lot price, original qty, open time, qty left in lot)
+Relief = Tuple[str, int, float, float, int, Optional[datetime], int]
+
+
+class LotQueue:
+    """
+    Open lots of one position held in parallel arrays with a head index.
+
+    All lots share one direction (sign). FIFO relief advances the head and LIFO
+    relief pops the tail, so consuming a lot is O(1); the consumed prefix is
+    dropped once it is more than half of the arrays, which keeps compaction
+    amortized O(1) per lot. Running quantity and cost totals give the average
+    cost without scanning the lots.
+    """
+
+    __slots__ = ("sign", "lot_ids", "qtys", "prices", "original_qtys", "open_times",
+                 "head", "total_qty", "total_cost")
+
+    def __init__(self):
+        self.sign = 0
+        self.lot_ids: List[str] = []
+        self.qtys = array("q")
+        self.prices = array("d")
+        self.original_qtys = array("q")
+        self.open_times: List[Optional[datetime]] = []
+        self.head = 0
+        self.total_qty = 0
+        self.total_cost = 0.0
+
+    def __len__(self) -> int:
+        return len(self.qtys) - self.head
+
+    def append(self, lot_id: str, qty: int, price: float, open_time: Optional[datetime]) -> None:
+        self.lot_ids.append(lot_id)
+        self.qtys.append(qty)
+        self.prices.append(price)
+        self.original_qtys.append(qty)
+        self.open_times.append(open_time)
+        self.total_qty += qty
+        self.total_cost += qty * price
+
+    def average_cost(self) -> float:
+        return self.total_cost / self.total_qty if self.total_qty else 0.0
+
+    def relieve(self, qty: int, method: str) -> List[Relief]:
+        """Consume up to qty from the open lots"""
+        reliefs: List[Relief] = []
+        average = self.average_cost() if method == "AVERAGE" else None
+        from_tail = method == "LIFO"
+        while qty > 0 and len(self):
+            i = len(self.qtys) - 1 if from_tail else self.head
+            taken = min(qty, self.qtys[i])
+            left = self.qtys[i] - taken
+            cost = average if average is not None else self.prices[i]
+            reliefs.append((self.lot_ids[i], taken, cost, self.prices[i],
+                            self.original_qtys[i], self.open_times[i], left))
+            self.qtys[i] = left
+            self.total_qty -= taken
+            self.total_cost -= taken * cost
+            qty -= taken
+            if left == 0:
+                if from_tail:
+                    self._pop_tail()
+                else:
+                    self.head += 1
+        if not len(self):
+            self._clear()
+        elif self.head >= COMPACT_MIN_HEAD and self.head * 2 >= len(self.qtys):
+            self._compact()
+        return reliefs
+
+    def open_lots(self) -> List[Tuple[str, int, float, int, Optional[datetime]]]:
+        return [
+            (self.lot_ids[i], self.qtys[i], self.prices[i], self.original_qtys[i], self.open_times[i])
+            for i in range(self.head, len(self.qtys))
+        ]
+
+    def _pop_tail(self) -> None:
+        self.lot_ids.pop()
+        self.qtys.pop()
+        self.prices.pop()
+        self.original_qtys.pop()
+        self.open_times.pop()
+
+    def _compact(self) -> None:
+        head = self.head
+        del self.lot_ids[:head]
+        del self.qtys[:head]
+        del self.prices[:head]
+        del self.original_qtys[:head]
+        del self.open_times[:head]
+        self.head = 0
+
+    def _clear(self) -> None:
+        self.__init__()
+
+
+class TaxLotLedger:
+    """
+    In-memory tax lots per (account_id, instrument_id).
+
+    Trade events open lots or relieve them with the configured method; realized
+    P&L is recorded per (closing trade, lot). Changed lots and new reliefs are
+    buffered and written by a flusher thread in batches. Cancelling or
+    reinstating a trade replays that one position from the trade table.
+
+    Contract multipliers are looked up before taking the lock, because those
+    lookups can reload the static data cache from the database. A position
+    replay also queries its trades before taking the lock and swaps the
+    rebuilt queue in under it, retrying if a trade was booked meanwhile.
+    """
+
+    def __init__(self, method: str, flush_interval_ms: float, session_factory: Callable = SessionLocal):
+        self.method = self._check_method(method)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._session_factory = session_factory
+        self._lots: Dict[LotKey, LotQueue] = {}
+        self._dirty_lots: Dict[str, Dict[str, Any]] = {}
+        self._reliefs: List[Dict[str, Any]] = []
+        self._replaced: Set[LotKey] = set()
+        # Bumped whenever a position's lots change, so an unlocked replay can detect a race
+        self._versions: Dict[LotKey, int] = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._registered = False
+        self.stats = {"trades_applied": 0, "lots_relieved": 0, "positions_replayed": 0,
+                      "flushes": 0, "lots_flushed": 0, "reliefs_flushed": 0}
+
+    @staticmethod
+    def _check_method(method: str) -> str:
+        method = (method or "FIFO").upper()
+        if method not in LOT_METHODS:
+            raise ValueError(f"Unknown tax lot method {method}; expected one of {', '.join(LOT_METHODS)}")
+        return method
+
+    # ============= LOT BOOKING =============
+
+    def _apply(self, lots: LotQueue, key: LotKey, trade_id: str, side: Optional[str], qty: Optional[int],
+               price: Optional[float], exec_time: Optional[datetime], multiplier: float,
+               lot_rows: Dict[str, Dict[str, Any]], relief_rows: List[Dict[str, Any]]) -> None:
+        """Book one trade against a position's lots, collecting changed lot and relief rows"""
+        signed = signed_qty(side, qty)
+        if not signed:
+            return
+        account_id, instrument_id = key
+        price = float(price or 0.0)
+        direction = 1 if signed > 0 else -1
+        remaining = abs(signed)
+
+        if lots.sign and lots.sign != direction:
+            lot_sign = lots.sign
+            lot_side = "LONG" if lot_sign > 0 else "SHORT"
+            reliefs = lots.relieve(remaining, self.method)
+            for lot_id, taken, cost, lot_price, original, open_time, left in reliefs:
+                remaining -= taken
+                relief_rows.append({
+                    "relief_id": f"{trade_id}:{lot_id}",
+                    "lot_id": lot_id,
+                    "close_trade_id": trade_id,
+                    "account_id": account_id,
+                    "instrument_id": instrument_id,
+                    "method": self.method,
+                    "qty": taken,
+                    "open_price": cost,
+                    "close_price": price,
+                    "realized_pnl": (price - cost) * taken * lot_sign * multiplier,
+                    "close_time": exec_time
+                })
+                lot_rows[lot_id] = self._lot_row(key, lot_id, lot_side, open_time, lot_price, original, left)
+            self.stats["lots_relieved"] += len(reliefs)
+
+        if remaining:
+            lots.append(trade_id, remaining, price, exec_time)
+            lots.sign = direction
+            lot_rows[trade_id] = self._lot_row(key, trade_id, "LONG" if direction > 0 else "SHORT",
+                                               exec_time, price, remaining, remaining)
+
+    @staticmethod
+    def _lot_row(key: LotKey, lot_id: str, side: str, open_time: Optional[datetime], price: float,
+                 original_qty: int, remaining_qty: int) -> Dict[str, Any]:
+        return {
+            "lot_id": lot_id,
+            "account_id": key[0],
+            "instrument_id": key[1],
+            "side": side,
+            "open_trade_id": lot_id,
+            "open_time": open_time,
+            "open_price": price,
+            "original_qty": original_qty,
+            "remaining_qty": remaining_qty,
+            "status": "OPEN" if remaining_qty else "CLOSED"
+        }
+
+    def apply_trade(self, data: Dict[str, Any]) -> None:
+        """Book a new trade from a TRADE_CREATED payload"""
+        account_id, instrument_id = data.get("account_id"), data.get("instrument_id")
+        if not account_id or not instrument_id or not data.get("trade_id"):
+            return
+        exec_time = data.get("exec_time")
+        if isinstance(exec_time, str):
+            exec_time = datetime.fromisoformat(exec_time)
+        key = (account_id, instrument_id)
+        multiplier = static_data_cache.contract_multiplier(instrument_id)
+        with self._lock:
+            lots = self._lots.get(key)
+            if lots is None:
+                lots = self._lots[key] = LotQueue()
+            self._apply(lots, key, data["trade_id"], data.get("side"), data.get("qty"), data.get("price"),
+                        exec_time, multiplier, self._dirty_lots, self._reliefs)
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self.stats["trades_applied"] += 1
+
+    def _trade_rows(self, db: Session, key: Optional[LotKey] = None) -> List[Any]:
+        query = select(
+            Trade.account_id, Trade.instrument_id, Trade.trade_id, Trade.side, Trade.qty, Trade.price, Trade.exec_time
+        ).where(
+            Trade.status != "CANCELLED",
+            Trade.account_id.isnot(None),
+            Trade.instrument_id.isnot(None)
+        )
+        if key is not None:
+            query = query.where(Trade.account_id == key[0], Trade.instrument_id == key[1])
+        return db.execute(query.order_by(Trade.exec_time, Trade.trade_id)).all()
+
+    @staticmethod
+    def _multipliers(rows: List[Any]) -> Dict[str, float]:
+        """Contract multiplier of every instrument in the trade rows (may reload static data)"""
+        return {
+            instrument_id: static_data_cache.contract_multiplier(instrument_id)
+            for instrument_id in {row[1] for row in rows}
+        }
+
+    def _replay(
+        self,
+        rows: List[Any],
+        multipliers: Dict[str, float]
+    ) -> Tuple[Dict[LotKey, LotQueue], Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+        """Rebuild lots from trades in execution order"""
+        positions: Dict[LotKey, LotQueue] = {}
+        lot_rows: Dict[str, Dict[str, Any]] = {}
+        relief_rows: List[Dict[str, Any]] = []
+        for account_id, instrument_id, trade_id, side, qty, price, exec_time in rows:
+            key = (account_id, instrument_id)
+            lots = positions.get(key)
+            if lots is None:
+                lots = positions[key] = LotQueue()
+            self._apply(lots, key, trade_id, side, qty, price, exec_time, multipliers[instrument_id],
+                        lot_rows, relief_rows)
+        return positions, lot_rows, relief_rows
+
+    def replay_position(self, account_id: str, instrument_id: str) -> None:
+        """Rebuild one position's lots after a trade was cancelled or reinstated"""
+        key = (account_id, instrument_id)
+        multipliers = {instrument_id: static_data_cache.contract_multiplier(instrument_id)}
+        db = self._session_factory()
+        try:
+            for _ in range(REPLAY_ATTEMPTS):
+                with self._lock:
+                    version = self._versions.get(key, 0)
+                rows = self._trade_rows(db, key)
+                # End the read transaction so a retry sees trades committed since
+                db.rollback()
+                with self._lock:
+                    if self._versions.get(key, 0) == version:
+                        self._swap_position(key, *self._replay(rows, multipliers))
+                        return
+            # Trades keep landing on this position; query under the lock so none is missed
+            logger.warning(f"Tax lot replay of {account_id}/{instrument_id} kept racing new trades; replaying under the lock")
+            with self._lock:
+                self._swap_position(key, *self._replay(self._trade_rows(db, key), multipliers))
+        finally:
+            db.close()
+
+    def _swap_position(self, key: LotKey, positions: Dict[LotKey, LotQueue],
+                       lot_rows: Dict[str, Dict[str, Any]], relief_rows: List[Dict[str, Any]]) -> None:
+        """Install a replayed position and replace its buffered rows (caller holds the lock)"""
+        self._lots[key] = positions.get(key, LotQueue())
+        self._dirty_lots = {
+            lot_id: row for lot_id, row in self._dirty_lots.items()
+            if (row["account_id"], row["instrument_id"]) != key
+        }
+        self._dirty_lots.update(lot_rows)
+        self._reliefs = [
+            row for row in self._reliefs if (row["account_id"], row["instrument_id"]) != key
+        ] + relief_rows
+        self._replaced.add(key)
+        self._versions[key] = self._versions.get(key, 0) + 1
+        self.stats["positions_replayed"] += 1
+
+    # ============= QUERIES =============
+
+    def get_open_lots(
+        self,
+        account_id: str,
+        instrument_id: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Open lots of an account in relief order (oldest first), optionally for one instrument"""
+        with self._lock:
+            items = [
+                (key, lots.sign, lots.open_lots())
+                for key, lots in self._lots.items()
+                if key[0] == account_id and (not instrument_id or key[1] == instrument_id) and len(lots)
+            ]
+
+        static_data_cache.ensure_fresh()
+        result = []
+        for (acct_id, inst_id), sign, open_lots in items:
+            for lot_id, qty, price, original, open_time in open_lots:
+                result.append({
+                    "lot_id": lot_id,
+                    "account_id": acct_id,
+                    "instrument_id": inst_id,
+                    "instrument": static_data_cache.instrument_symbol(inst_id),
+                    "side": "LONG" if sign > 0 else "SHORT",
+                    "open_time": open_time,
+                    "open_price": price,
+                    "original_qty": original,
+                    "remaining_qty": qty
+                })
+                if limit and len(result) >= limit:
+                    return result
+        return result
+
+    def get_position_summary(self, account_id: str, instrument_id: str) -> Dict[str, Any]:
+        """Lot count, signed open quantity and average cost of one position"""
+        with self._lock:
+            lots = self._lots.get((account_id, instrument_id))
+            if lots is None or not len(lots):
+                return {"lots": 0, "open_qty": 0, "average_cost": None}
+            return {"lots": len(lots), "open_qty": lots.sign * lots.total_qty, "average_cost": lots.average_cost()}
+
+    def get_realized(
+        self,
+        db: Session,
+        account_id: Optional[str] = None,
+        instrument_id: Optional[str] = None,
+        close_trade_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Realized P&L per closing trade
+
+        Args:
+            db: Database session
+            account_id: Filter by account
+            instrument_id: Filter by instrument
+            close_trade_id: Filter by closing trade
+
+        Returns:
+            One row per closing trade with relieved quantity and realized P&L
+        """
+        self.flush()
+        query = select(
+            TaxLotRelief.close_trade_id,
+            TaxLotRelief.account_id,
+            TaxLotRelief.instrument_id,
+            func.min(TaxLotRelief.method),
+            func.min(TaxLotRelief.close_time),
+            func.max(TaxLotRelief.close_price),
+            func.count(TaxLotRelief.relief_id),
+            func.sum(TaxLotRelief.qty),
+            func.sum(TaxLotRelief.realized_pnl)
+        )
+        if account_id:
+            query = query.where(TaxLotRelief.account_id == account_id)
+        if instrument_id:
+            query = query.where(TaxLotRelief.instrument_id == instrument_id)
+        if close_trade_id:
+            query = query.where(TaxLotRelief.close_trade_id == close_trade_id)
+        rows = db.execute(
+            query.group_by(TaxLotRelief.close_trade_id, TaxLotRelief.account_id, TaxLotRelief.instrument_id)
+            .order_by(func.min(TaxLotRelief.close_time), TaxLotRelief.close_trade_id)
+        ).all()
+
+        static_data_cache.ensure_fresh()
+        return [
+            {
+                "close_trade_id": trade_id,
+                "account_id": acct_id,
+                "instrument_id": inst_id,
+                "instrument": static_data_cache.instrument_symbol(inst_id),
+                "method": method,
+                "close_time": close_time,
+                "close_price": close_price,
+                "lots_relieved": lots,
+                "qty": int(qty or 0),
+                "realized_pnl": float(realized or 0.0)
+            }
+            for trade_id, acct_id, inst_id, method, close_time, close_price, lots, qty, realized in rows
+        ]
+
+    # ============= REBUILD / FLUSH =============
+
+    def rebuild(self, db: Optional[Session] = None, method: Optional[str] = None, persist: bool = True) -> int:
+        """
+        Replay every non-cancelled trade into lots and (optionally) rewrite the
+        tax_lot and tax_lot_relief tables.
+
+        Args:
+            db: Database session
+            method: Relief method to switch to (defaults to the current one)
+            persist: Replace the stored lots and reliefs with the replay
+
+        Returns:
+            Number of open lots
+        """
+        owns_session = db is None
+        db = db or self._session_factory()
+        try:
+            with self._lock:
+                if method:
+                    self.method = self._check_method(method)
+                rows = self._trade_rows(db)
+                positions, lot_rows, relief_rows = self._replay(rows, self._multipliers(rows))
+                self._lots = positions
+                self._versions = {key: version + 1 for key, version in self._versions.items()}
+                self._dirty_lots, self._reliefs, self._replaced = {}, [], set()
+                if persist:
+                    db.execute(delete(TaxLotRelief))
+                    db.execute(delete(TaxLot))
+                    copy_rows(db, TaxLot.__table__, LOT_COLUMNS,
+                              ([row[c] for c in LOT_COLUMNS] for row in lot_rows.values()))
+                    copy_rows(db, TaxLotRelief.__table__, RELIEF_COLUMNS,
+                              ([row[c] for c in RELIEF_COLUMNS] for row in relief_rows))
+                    db.commit()
+                open_lots = sum(len(lots) for lots in positions.values())
+        finally:
+            if owns_session:
+                db.close()
+
+        logger.info(f"Rebuilt {open_lots} open tax lots ({self.method}) in {len(positions)} positions")
+        return open_lots
+
+    def load(self, db: Optional[Session] = None) -> int:
+        """
+        Startup load: replay trades into memory, rewriting the tables only when
+        they are empty or were built with a different relief method
+        """
+        owns_session = db is None
+        db = db or self._session_factory()
+        try:
+            stale = db.execute(select(TaxLot.lot_id).limit(1)).first() is None or db.execute(
+                select(TaxLotRelief.relief_id).where(TaxLotRelief.method != self.method).limit(1)
+            ).first() is not None
+            return self.rebuild(db, persist=stale)
+        finally:
+            if owns_session:
+                db.close()
+
+    def flush(self, db: Optional[Session] = None) -> int:
+        """Write changed lots and new reliefs; replayed positions are replaced"""
+        with self._lock:
+            if not self._dirty_lots and not self._reliefs and not self._replaced:
+                return 0
+            lot_rows, relief_rows, replaced = list(self._dirty_lots.values()), self._reliefs, self._replaced
+            self._dirty_lots, self._reliefs, self._replaced = {}, [], set()
+
+        owns_session = db is None
+        db = db or self._session_factory()
+        try:
+            for account_id, instrument_id in replaced:
+                for model in (TaxLotRelief, TaxLot):
+                    db.execute(delete(model).where(model.account_id == account_id, model.instrument_id == instrument_id))
+            for start in range(0, len(lot_rows), FLUSH_CHUNK_SIZE):
+                bulk_upsert(db, TaxLot.__table__, lot_rows[start:start + FLUSH_CHUNK_SIZE], ("lot_id",))
+            for start in range(0, len(relief_rows), FLUSH_CHUNK_SIZE):
+                bulk_upsert(db, TaxLotRelief.__table__, relief_rows[start:start + FLUSH_CHUNK_SIZE], ("relief_id",))
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Re-queue, letting anything booked since the swap win
+            with self._lock:
+                for row in lot_rows:
+                    self._dirty_lots.setdefault(row["lot_id"], row)
+                self._reliefs = relief_rows + self._reliefs
+                self._replaced |= replaced
+            raise
+        finally:
+            if owns_session:
+                db.close()
+
+        self.stats["flushes"] += 1
+        self.stats["lots_flushed"] += len(lot_rows)
+        self.stats["reliefs_flushed"] += len(relief_rows)
+        return len(lot_rows) + len(relief_rows)
+
+    # ============= LIFECYCLE =============
+
+    def start(self) -> None:
+        """Start the background flusher (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="tax-lot-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and write anything still buffered"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(5)
+        self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Final tax lot flush failed: {e}", exc_info=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Tax lot flush failed: {e}", exc_info=True)
+
+    # ============= EVENT HANDLERS =============
+
+    def on_trade_created(self, event: Event) -> None:
+        self.apply_trade(event.data)
+
+    def on_trade_cancelled(self, event: Event) -> None:
+        data = event.data
+        if data.get("account_id") and data.get("instrument_id"):
+            self.replay_position(data["account_id"], data["instrument_id"])
+
+    def on_trade_updated(self, event: Event) -> None:
+        data = event.data
+        if data.get("action") == "undo" and data.get("old_status") == "CANCELLED" \
+                and data.get("account_id") and data.get("instrument_id"):
+            self.replay_position(data["account_id"], data["instrument_id"])
+
+    def register_event_handlers(self) -> None:
+        """Subscribe to trade lifecycle events (idempotent)"""
+        if self._registered:
+            return
+        event_bus.subscribe(EventType.TRADE_CREATED, self.on_trade_created)
+        event_bus.subscribe(EventType.TRADE_CANCELLED, self.on_trade_cancelled)
+        event_bus.subscribe(EventType.TRADE_UPDATED, self.on_trade_updated)
+        self._registered = True
+
+
+tax_lot_ledger = TaxLotLedger(method=settings.tax_lot_method, flush_interval_ms=settings.tax_lot_flush_interval_ms)
@@ -3,20 +3,214 @@ Accounting Module - API Routes
 Handles P&L and position tracking endpoints.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
+from typing import Optional, Callable, Dict, Any
+from datetime import date, datetime, timedelta, time as dt_time
+import logging
+
 from app.core import get_db
+from app.core.websocket import manager
+from app.modules.accounting.schemas import PositionListSchema, PositionAsOfListSchema, TaxLotListSchema, RealizedPnlListSchema
+from app.modules.accounting.service import position_keeper, PositionHistoryService, EodPnlService, VariationMarginService
+from app.modules.accounting.lots import tax_lot_ledger
+from app.modules.accounting.live_pnl import live_pnl, ALL_CHANNEL
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/accounting", tags=["Accounting"])
 
 
-@router.get("/positions")
-def get_positions(db: Session = Depends(get_db)):
-    """Get current positions"""
-    return {"positions": [], "message": "Accounting module - to be implemented"}
+@router.get("/positions", response_model=PositionListSchema)
+def get_positions(
+    account_id: Optional[str] = Query(None, description="Filter by account"),
+    instrument_id: Optional[str] = Query(None, description="Filter by instrument"),
+    include_flat: bool = Query(False, description="Include positions with zero net quantity")
+):
+    """Get current positions (served from the in-memory position keeper)"""
+    positions = position_keeper.get_positions(account_id, instrument_id, include_flat)
+    return {"positions": positions, "count": len(positions)}
+
+
+@router.post("/positions/rebuild")
+def rebuild_positions(db: Session = Depends(get_db)):
+    """Recompute all positions from the trade table and persist them to position_daily"""
+    try:
+        count = position_keeper.rebuild(db)
+        return {"positions": count, "stats": position_keeper.stats}
+    except Exception as e:
+        logger.error(f"Position rebuild failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/positions/as-of", response_model=PositionAsOfListSchema)
+def get_positions_as_of(
+    account_id: str = Query(..., description="Account"),
+    as_of: Optional[datetime] = Query(None, description="Point in time (exclusive)"),
+    val_date: Optional[date] = Query(None, description="End of this day (alternative to as_of)"),
+    instrument_id: Optional[str] = Query(None, description="Filter by instrument"),
+    include_flat: bool = Query(False, description="Include positions with zero net quantity"),
+    db: Session = Depends(get_db)
+):
+    """Get positions at a point in time from the nearest daily snapshot plus later trades"""
+    if as_of is None and val_date is None:
+        raise HTTPException(status_code=400, detail="as_of or val_date is required")
+    cutoff = as_of or datetime.combine(val_date + timedelta(days=1), dt_time.min)
+    positions = PositionHistoryService.get_positions_as_of(db, account_id, cutoff, instrument_id, include_flat)
+    return {"positions": positions, "count": len(positions)}
+
+
+@router.post("/positions/snapshots")
+def take_position_snapshot(
+    val_date: date = Query(..., description="Completed day to snapshot"),
+    db: Session = Depends(get_db)
+):
+    """Backfill end-of-day position_daily snapshots for a past date"""
+    try:
+        return PositionHistoryService.snapshot(db, val_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Position snapshot failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/lots", response_model=TaxLotListSchema)
+def get_open_lots(
+    account_id: str = Query(..., description="Account"),
+    instrument_id: Optional[str] = Query(None, description="Filter by instrument"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum lots returned")
+):
+    """Get open tax lots in relief order (served from the in-memory lot ledger)"""
+    lots = tax_lot_ledger.get_open_lots(account_id, instrument_id, limit)
+    return {"method": tax_lot_ledger.method, "lots": lots, "count": len(lots)}
+
+
+@router.get("/lots/realized", response_model=RealizedPnlListSchema)
+def get_realized_pnl(
+    account_id: Optional[str] = Query(None, description="Filter by account"),
+    instrument_id: Optional[str] = Query(None, description="Filter by instrument"),
+    trade_id: Optional[str] = Query(None, description="Filter by closing trade"),
+    db: Session = Depends(get_db)
+):
+    """Get realized P&L per closing trade from lot relief"""
+    try:
+        trades = tax_lot_ledger.get_realized(db, account_id, instrument_id, trade_id)
+    except Exception as e:
+        logger.error(f"Realized P&L query failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "trades": trades,
+        "count": len(trades),
+        "total_realized_pnl": sum(row["realized_pnl"] for row in trades)
+    }
+
+
+@router.post("/lots/rebuild")
+def rebuild_lots(
+    method: Optional[str] = Query(None, description="Relief method to switch to: FIFO, LIFO or AVERAGE"),
+    db: Session = Depends(get_db)
+):
+    """Replay all trades into tax lots and rewrite tax_lot and tax_lot_relief"""
+    try:
+        count = tax_lot_ledger.rebuild(db, method)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Tax lot rebuild failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"method": tax_lot_ledger.method, "open_lots": count, "stats": tax_lot_ledger.stats}
 
 
 @router.get("/pnl")
-def get_pnl(db: Session = Depends(get_db)):
-    """Get P&L summary"""
-    return {"pnl": {}, "message": "Accounting module - to be implemented"}
+def get_pnl(
+    val_date: Optional[date] = Query(None, description="Valuation date (defaults to today)"),
+    account_id: Optional[str] = Query(None, description="Filter by account"),
+    db: Session = Depends(get_db)
+):
+    """Get stored end-of-day P&L for a valuation date"""
+    return EodPnlService.get_pnl(db, val_date or date.today(), account_id)
+
+
+@router.get("/pnl/live")
+def get_live_pnl(
+    account_id: Optional[str] = Query(None, description="Only this account"),
+    portfolio: Optional[str] = Query(None, description="Only this portfolio")
+):
+    """Get current incrementally maintained P&L per account and portfolio"""
+    return live_pnl.get_snapshot(account_id, portfolio)
+
+
+async def _serve_pnl_channel(websocket: WebSocket, channel: str, snapshot: Callable[[], Dict[str, Any]]):
+    """Send a `pnl_snapshot` on connect, then throttled `pnl_update` messages"""
+    await manager.connect(websocket, channel=channel)
+    try:
+        await websocket.send_json({"type": "pnl_snapshot", "data": jsonable_encoder(snapshot())})
+        while True:
+            data = await websocket.receive_text()
+            if data == "ping":
+                await manager.send_personal_message("pong", websocket)
+            elif data == "snapshot":
+                await websocket.send_json({"type": "pnl_snapshot", "data": jsonable_encoder(snapshot())})
+    except WebSocketDisconnect:
+        manager.disconnect(websocket, channel=channel)
+    except Exception as e:
+        logger.error(f"WebSocket error: {e}")
+        manager.disconnect(websocket, channel=channel)
+
+
+@router.websocket("/ws/pnl")
+async def websocket_pnl_endpoint(websocket: WebSocket):
+    """Live P&L for every account and portfolio (changed totals only)"""
+    await _serve_pnl_channel(websocket, ALL_CHANNEL, live_pnl.get_snapshot)
+
+
+@router.websocket("/ws/pnl/account/{account_id}")
+async def websocket_account_pnl_endpoint(websocket: WebSocket, account_id: str):
+    """Live P&L for one account"""
+    await _serve_pnl_channel(websocket, live_pnl.account_channel(account_id),
+                             lambda: live_pnl.get_snapshot(account_id=account_id))
+
+
+@router.websocket("/ws/pnl/portfolio/{portfolio}")
+async def websocket_portfolio_pnl_endpoint(websocket: WebSocket, portfolio: str):
+    """Live P&L for one portfolio (resolved through the portfolio enrichment mappings)"""
+    await _serve_pnl_channel(websocket, live_pnl.portfolio_channel(portfolio),
+                             lambda: live_pnl.get_snapshot(portfolio=portfolio))
+
+
+@router.post("/pnl/eod")
+def run_eod_pnl(
+    val_date: Optional[date] = Query(None, description="Valuation date (defaults to today)"),
+    db: Session = Depends(get_db)
+):
+    """Run the end-of-day P&L batch (FIFO realized + unrealized vs settlement) and replace eod_pnl rows"""
+    try:
+        return EodPnlService.run(db, val_date or date.today())
+    except Exception as e:
+        logger.error(f"EOD P&L run failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/variation-margin")
+def get_variation_margin(
+    val_date: Optional[date] = Query(None, description="Valuation date (defaults to today)"),
+    account_id: Optional[str] = Query(None, description="Filter by account"),
+    db: Session = Depends(get_db)
+):
+    """Get variation margin totals per account"""
+    return VariationMarginService.get_totals(db, val_date or date.today(), account_id)
+
+
+@router.post("/variation-margin/run")
+def run_variation_margin(
+    val_date: Optional[date] = Query(None, description="Valuation date (defaults to today)"),
+    db: Session = Depends(get_db)
+):
+    """Compute and upsert variation margin for all positions"""
+    try:
+        return VariationMarginService.run(db, val_date or date.today())
+    except Exception as e:
+        logger.error(f"Variation margin run failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
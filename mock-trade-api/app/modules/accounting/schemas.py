@@ -0,0 +1,86 @@
+"""Accounting Module - Pydantic Schemas
+Defines response models for position and P&L endpoints.
+"""
+
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import List, Optional
+
+
+class PositionSchema(BaseModel):
+    """Net position of an account in an instrument"""
+    instrument_id: str
+    instrument: Optional[str] = None
+    account_id: str
+    account: Optional[str] = None
+    val_date: date
+    open_qty: int
+    day_qty: int
+    net_qty: int
+
+
+class PositionListSchema(BaseModel):
+    """Positions response"""
+    positions: List[PositionSchema]
+    count: int
+
+
+class PositionAsOfSchema(BaseModel):
+    """Position at a point in time: latest snapshot plus trade deltas since"""
+    instrument_id: str
+    instrument: Optional[str] = None
+    account_id: str
+    account: Optional[str] = None
+    as_of: datetime
+    snapshot_date: Optional[date] = None
+    snapshot_qty: int
+    delta_qty: int
+    delta_trades: int
+    net_qty: int
+
+
+class PositionAsOfListSchema(BaseModel):
+    """Point-in-time positions response"""
+    positions: List[PositionAsOfSchema]
+    count: int
+
+
+class TaxLotSchema(BaseModel):
+    """Open tax lot"""
+    lot_id: str
+    account_id: str
+    instrument_id: str
+    instrument: Optional[str] = None
+    side: str
+    open_time: Optional[datetime] = None
+    open_price: float
+    original_qty: int
+    remaining_qty: int
+
+
+class TaxLotListSchema(BaseModel):
+    """Open lots response"""
+    method: str
+    lots: List[TaxLotSchema]
+    count: int
+
+
+class RealizedPnlSchema(BaseModel):
+    """Realized P&L of one closing trade across the lots it relieved"""
+    close_trade_id: str
+    account_id: str
+    instrument_id: str
+    instrument: Optional[str] = None
+    method: str
+    close_time: Optional[datetime] = None
+    close_price: Optional[float] = None
+    lots_relieved: int
+    qty: int
+    realized_pnl: float
+
+
+class RealizedPnlListSchema(BaseModel):
+    """Realized P&L response"""
+    trades: List[RealizedPnlSchema]
+    count: int
+    total_realized_pnl: float
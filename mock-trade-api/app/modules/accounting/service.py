@@ -0,0 +1,763 @@
+"""
+Accounting Module - Service Layer
+Real-time position keeping from trade lifecycle events, point-in-time position
+queries and the end-of-day P&L batch.
+"""
+
+from sqlalchemy import case, func, select, delete, literal, and_, or_, cast, Integer
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Set, Tuple, Any, Callable, Sequence
+from collections import deque
+from datetime import date, datetime, timedelta, time as dt_time
+import threading
+import time
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; grouping falls back to a stable sort
+    np = None
+
+from app.core import settings, SessionLocal, event_bus, Event, EventType, bulk_upsert, upsert_from_select, copy_rows
+from app.models import PositionDaily, EodPnl, SettlementPrice, InstrumentETD, VariationMargin
+from app.modules.trade.models import Trade
+from app.modules.static_data.cache import static_data_cache
+
+logger = logging.getLogger(__name__)
+
+PositionKey = Tuple[str, str]  # (instrument_id, account_id)
+
+
+def signed_qty(side: Optional[str], qty: Optional[int]) -> int:
+    """Trade quantity signed by side (BUY positive, SELL negative)"""
+    qty = int(qty or 0)
+    return qty if (side or "").upper() == "BUY" else -qty
+
+
+class PositionKeeper:
+    """
+    In-memory net positions per (instrument_id, account_id).
+
+    Each position holds [open_qty, day_qty]: the quantity carried into the
+    current valuation date and the signed quantity traded since. Trade events
+    apply deltas under a lock and mark the key dirty; a flusher thread upserts
+    dirty positions into position_daily (net_qty = day_qty, close_qty =
+    open_qty + day_qty) in one statement per interval.
+    """
+
+    def __init__(self, flush_interval_ms: float, session_factory: Callable = SessionLocal):
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._session_factory = session_factory
+        self._positions: Dict[PositionKey, List[int]] = {}
+        self._dirty: Set[PositionKey] = set()
+        self._val_date = date.today()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._registered = False
+        self.stats = {"deltas_applied": 0, "flushes": 0, "rows_flushed": 0, "last_flush_rows": 0}
+
+    # ============= DELTAS =============
+
+    def apply_delta(self, instrument_id: str, account_id: str, qty_delta: int) -> None:
+        """Apply a signed quantity change to a position"""
+        if not instrument_id or not account_id or not qty_delta:
+            return
+        key = (instrument_id, account_id)
+        with self._lock:
+            self._roll_if_new_day()
+            position = self._positions.get(key)
+            if position is None:
+                position = self._positions[key] = [0, 0]
+            position[1] += qty_delta
+            self._dirty.add(key)
+            self.stats["deltas_applied"] += 1
+
+    def _roll_if_new_day(self) -> None:
+        """Carry positions into a new valuation date (caller holds the lock)"""
+        today = date.today()
+        if today == self._val_date:
+            return
+        for position in self._positions.values():
+            position[0] += position[1]
+            position[1] = 0
+        self._dirty.update(self._positions)
+        self._val_date = today
+
+    # ============= QUERIES =============
+
+    def get_positions(
+        self,
+        account_id: Optional[str] = None,
+        instrument_id: Optional[str] = None,
+        include_flat: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Current positions from memory, optionally filtered"""
+        with self._lock:
+            self._roll_if_new_day()
+            items = [(key, list(position)) for key, position in self._positions.items()]
+            val_date = self._val_date
+
+        static_data_cache.ensure_fresh()
+        result = []
+        for (inst_id, acct_id), (open_qty, day_qty) in items:
+            if account_id and acct_id != account_id:
+                continue
+            if instrument_id and inst_id != instrument_id:
+                continue
+            net = open_qty + day_qty
+            if not net and not include_flat:
+                continue
+            result.append({
+                "instrument_id": inst_id,
+                "instrument": static_data_cache.instrument_symbol(inst_id),
+                "account_id": acct_id,
+                "account": static_data_cache.account_code(acct_id),
+                "val_date": val_date,
+                "open_qty": open_qty,
+                "day_qty": day_qty,
+                "net_qty": net
+            })
+        return result
+
+    def get_position(self, instrument_id: str, account_id: str) -> int:
+        """Current net quantity of one position"""
+        position = self._positions.get((instrument_id, account_id))
+        return position[0] + position[1] if position else 0
+
+    # ============= REBUILD / FLUSH =============
+
+    def rebuild(self, db: Optional[Session] = None) -> int:
+        """
+        Recompute every position from the trade table with a single GROUP BY
+        and persist the result.
+
+        Returns:
+            Number of positions loaded
+        """
+        owns_session = db is None
+        db = db or self._session_factory()
+        try:
+            today = date.today()
+            signed = case((func.upper(Trade.side) == "BUY", Trade.qty), else_=-Trade.qty)
+            today_signed = case((Trade.exec_time >= datetime.combine(today, dt_time.min), signed), else_=0)
+            rows = db.query(
+                Trade.instrument_id,
+                Trade.account_id,
+                func.coalesce(func.sum(signed), 0),
+                func.coalesce(func.sum(today_signed), 0)
+            ).filter(
+                Trade.status != "CANCELLED",
+                Trade.instrument_id.isnot(None),
+                Trade.account_id.isnot(None)
+            ).group_by(Trade.instrument_id, Trade.account_id).all()
+
+            with self._lock:
+                self._positions = {
+                    (inst_id, acct_id): [int(total) - int(day), int(day)]
+                    for inst_id, acct_id, total, day in rows
+                }
+                self._dirty = set(self._positions)
+                self._val_date = today
+            self.flush(db)
+        finally:
+            if owns_session:
+                db.close()
+
+        logger.info(f"Rebuilt {len(rows)} positions from trades")
+        return len(rows)
+
+    def flush(self, db: Optional[Session] = None) -> int:
+        """Upsert dirty positions into position_daily for the current valuation date"""
+        with self._lock:
+            if not self._dirty:
+                return 0
+            val_date = self._val_date
+            rows = [
+                {
+                    "instrument_id": key[0],
+                    "account_id": key[1],
+                    "val_date": val_date,
+                    "open_qty": self._positions[key][0],
+                    "net_qty": self._positions[key][1],
+                    "close_qty": self._positions[key][0] + self._positions[key][1]
+                }
+                for key in self._dirty
+            ]
+            self._dirty = set()
+
+        owns_session = db is None
+        db = db or self._session_factory()
+        try:
+            bulk_upsert(db, PositionDaily.__table__, rows, ("instrument_id", "account_id", "val_date"))
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Keep the positions dirty so the next flush retries them
+            with self._lock:
+                self._dirty.update((row["instrument_id"], row["account_id"]) for row in rows)
+            raise
+        finally:
+            if owns_session:
+                db.close()
+
+        self.stats["flushes"] += 1
+        self.stats["rows_flushed"] += len(rows)
+        self.stats["last_flush_rows"] = len(rows)
+        return len(rows)
+
+    # ============= LIFECYCLE =============
+
+    def start(self) -> None:
+        """Start the background flusher (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="position-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and write any remaining dirty positions"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(5)
+        self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Final position flush failed: {e}", exc_info=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Position flush failed: {e}", exc_info=True)
+
+    # ============= EVENT HANDLERS =============
+
+    def on_trade_created(self, event: Event) -> None:
+        data = event.data
+        self.apply_delta(data.get("instrument_id"), data.get("account_id"), signed_qty(data.get("side"), data.get("qty")))
+
+    def on_trade_cancelled(self, event: Event) -> None:
+        data = event.data
+        self.apply_delta(data.get("instrument_id"), data.get("account_id"), -signed_qty(data.get("side"), data.get("qty")))
+
+    def on_trade_updated(self, event: Event) -> None:
+        data = event.data
+        # Only undoing a cancel changes quantity; expired trades were never removed
+        if data.get("action") == "undo" and data.get("old_status") == "CANCELLED":
+            self.apply_delta(data.get("instrument_id"), data.get("account_id"), signed_qty(data.get("side"), data.get("qty")))
+
+    def register_event_handlers(self) -> None:
+        """Subscribe to trade lifecycle events (idempotent)"""
+        if self._registered:
+            return
+        event_bus.subscribe(EventType.TRADE_CREATED, self.on_trade_created)
+        event_bus.subscribe(EventType.TRADE_CANCELLED, self.on_trade_cancelled)
+        event_bus.subscribe(EventType.TRADE_UPDATED, self.on_trade_updated)
+        self._registered = True
+
+
+class PositionHistoryService:
+    """
+    Point-in-time positions from position_daily snapshots plus trade deltas.
+
+    A position as of time T is the close_qty of its latest complete daily
+    snapshot before T plus the signed quantity of trades executed after that
+    day and before T, so a query reads O(trades since the snapshot) rows via
+    the trade (account_id, instrument_id, exec_time) index. Positions without
+    any snapshot fall back to summing their trades.
+    """
+
+    @staticmethod
+    def _latest_snapshots(
+        db: Session,
+        max_date: date,
+        account_id: Optional[str] = None,
+        instrument_id: Optional[str] = None
+    ) -> Dict[PositionKey, Tuple[date, int]]:
+        """Latest position_daily close on or before max_date per (instrument_id, account_id)"""
+        latest = select(
+            PositionDaily.instrument_id,
+            PositionDaily.account_id,
+            func.max(PositionDaily.val_date).label("val_date")
+        ).where(PositionDaily.val_date <= max_date)
+        if account_id:
+            latest = latest.where(PositionDaily.account_id == account_id)
+        if instrument_id:
+            latest = latest.where(PositionDaily.instrument_id == instrument_id)
+        latest = latest.group_by(PositionDaily.instrument_id, PositionDaily.account_id).subquery()
+
+        rows = db.execute(
+            select(PositionDaily.instrument_id, PositionDaily.account_id, PositionDaily.val_date,
+                   func.coalesce(PositionDaily.close_qty, 0))
+            .join(latest, and_(
+                PositionDaily.instrument_id == latest.c.instrument_id,
+                PositionDaily.account_id == latest.c.account_id,
+                PositionDaily.val_date == latest.c.val_date
+            ))
+        ).all()
+        return {(inst_id, acct_id): (val_date, int(close_qty)) for inst_id, acct_id, val_date, close_qty in rows}
+
+    @staticmethod
+    def get_positions_as_of(
+        db: Session,
+        account_id: str,
+        as_of: datetime,
+        instrument_id: Optional[str] = None,
+        include_flat: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Positions of an account as of a point in time
+
+        Args:
+            db: Database session
+            account_id: Account
+            as_of: Point in time (trades executed before it are included)
+            instrument_id: Filter by instrument
+            include_flat: Include positions with zero net quantity
+
+        Returns:
+            One row per instrument with the snapshot used and the delta applied
+        """
+        # A snapshot is usable once its day has ended before as_of; today's row is still moving
+        max_snapshot = min((as_of - timedelta(days=1)).date(), date.today() - timedelta(days=1))
+        snapshots = PositionHistoryService._latest_snapshots(db, max_snapshot, account_id, instrument_id)
+
+        signed = case((func.upper(Trade.side) == "BUY", Trade.qty), else_=-Trade.qty)
+        since_snapshot = [
+            and_(
+                Trade.instrument_id == inst_id,
+                Trade.exec_time >= datetime.combine(snap_date + timedelta(days=1), dt_time.min)
+            )
+            for (inst_id, _), (snap_date, _) in snapshots.items()
+        ]
+        snapped = [inst_id for inst_id, _ in snapshots]
+        without_snapshot = Trade.instrument_id.notin_(snapped) if snapped else Trade.instrument_id.isnot(None)
+        query = select(
+            Trade.instrument_id, func.coalesce(func.sum(signed), 0), func.count(Trade.trade_id)
+        ).where(
+            Trade.account_id == account_id,
+            Trade.exec_time < as_of,
+            Trade.status != "CANCELLED",
+            or_(without_snapshot, *since_snapshot)
+        )
+        if instrument_id:
+            query = query.where(Trade.instrument_id == instrument_id)
+        deltas = {
+            inst_id: (int(delta), count)
+            for inst_id, delta, count in db.execute(query.group_by(Trade.instrument_id))
+        }
+
+        static_data_cache.ensure_fresh()
+        result = []
+        for inst_id in sorted(set(deltas) | {inst_id for inst_id, _ in snapshots}):
+            snap_date, snap_qty = snapshots.get((inst_id, account_id), (None, 0))
+            delta_qty, delta_trades = deltas.get(inst_id, (0, 0))
+            net = snap_qty + delta_qty
+            if not net and not include_flat:
+                continue
+            result.append({
+                "instrument_id": inst_id,
+                "instrument": static_data_cache.instrument_symbol(inst_id),
+                "account_id": account_id,
+                "account": static_data_cache.account_code(account_id),
+                "as_of": as_of,
+                "snapshot_date": snap_date,
+                "snapshot_qty": snap_qty,
+                "delta_qty": delta_qty,
+                "delta_trades": delta_trades,
+                "net_qty": net
+            })
+        return result
+
+    @staticmethod
+    def snapshot(db: Session, val_date: date) -> Dict[str, Any]:
+        """
+        Write end-of-day position_daily rows for a past date (backfills days the
+        position keeper did not roll through)
+
+        Args:
+            db: Database session
+            val_date: Day to snapshot (must be before today)
+
+        Returns:
+            Snapshot statistics
+        """
+        if val_date >= date.today():
+            raise ValueError("Snapshots can only be taken for completed days")
+        started = time.perf_counter()
+        day_start = datetime.combine(val_date, dt_time.min)
+        day_end = day_start + timedelta(days=1)
+
+        account_ids = [
+            acct_id for (acct_id,) in db.execute(
+                select(Trade.account_id).where(Trade.account_id.isnot(None), Trade.exec_time < day_end).distinct()
+            )
+        ]
+        rows = []
+        for acct_id in account_ids:
+            opening = {
+                position["instrument_id"]: position["net_qty"]
+                for position in PositionHistoryService.get_positions_as_of(db, acct_id, day_start, include_flat=True)
+            }
+            for position in PositionHistoryService.get_positions_as_of(db, acct_id, day_end, include_flat=True):
+                open_qty = opening.get(position["instrument_id"], 0)
+                rows.append({
+                    "instrument_id": position["instrument_id"],
+                    "account_id": acct_id,
+                    "val_date": val_date,
+                    "open_qty": open_qty,
+                    "net_qty": position["net_qty"] - open_qty,
+                    "close_qty": position["net_qty"]
+                })
+        for start in range(0, len(rows), 500):
+            bulk_upsert(db, PositionDaily.__table__, rows[start:start + 500], ("instrument_id", "account_id", "val_date"))
+        db.commit()
+        elapsed = time.perf_counter() - started
+        logger.info(f"Position snapshot {val_date}: {len(rows)} positions in {elapsed:.2f}s")
+        return {"val_date": val_date, "positions": len(rows), "elapsed_seconds": round(elapsed, 3)}
+
+
+def _group_order(keys: Sequence[Tuple[str, str]]) -> Tuple[List[int], List[int]]:
+    """
+    Order row indices by key, keeping input (time) order within each key.
+
+    Returns:
+        (row order, start offset of each group within that order)
+    """
+    n = len(keys)
+    if np is not None and n:
+        _, codes = np.unique(np.array([f"{a}\x00{b}" for a, b in keys], dtype=object), return_inverse=True)
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        return order.tolist(), starts.tolist()
+
+    order = sorted(range(n), key=keys.__getitem__)
+    starts = [i for i in range(n) if i == 0 or keys[order[i]] != keys[order[i - 1]]]
+    return order, starts
+
+
+def compute_eod_pnl(
+    instrument_ids: Sequence[str],
+    account_ids: Sequence[str],
+    signed_qtys: Sequence[int],
+    prices: Sequence[float],
+    is_today: Sequence[bool],
+    settle_prices: Dict[str, float],
+    multipliers: Dict[str, float]
+) -> List[Tuple[str, str, float, Optional[float], Optional[float]]]:
+    """
+    FIFO realized and settlement-based unrealized P&L per (instrument, account).
+
+    Inputs are parallel columns in execution-time order. Realized P&L counts
+    only closing quantity traded today; lots opened earlier are matched first.
+    Unrealized P&L marks the open lots left at the end of the day to the
+    settlement price (None when the instrument has no settlement price).
+
+    Returns:
+        Rows of (instrument_id, account_id, realized, unrealized, total)
+    """
+    keys = list(zip(instrument_ids, account_ids))
+    order, starts = _group_order(keys)
+    bounds = starts + [len(order)]
+    results = []
+
+    for g in range(len(starts)):
+        idx = order[bounds[g]:bounds[g + 1]]
+        lots: deque = deque()  # [qty, price], all on the side of lot_sign
+        lot_sign = 0
+        realized = 0.0
+        active_today = False
+
+        for i in idx:
+            qty = signed_qtys[i]
+            if not qty:
+                continue
+            price = prices[i]
+            today = is_today[i]
+            active_today = active_today or today
+            sign = 1 if qty > 0 else -1
+            if lot_sign == 0 or sign == lot_sign:
+                lots.append([abs(qty), price])
+                lot_sign = sign
+                continue
+
+            remaining = abs(qty)
+            while remaining and lots:
+                lot = lots[0]
+                matched = remaining if remaining < lot[0] else lot[0]
+                if today:
+                    realized += matched * (price - lot[1]) * lot_sign
+                lot[0] -= matched
+                remaining -= matched
+                if not lot[0]:
+                    lots.popleft()
+            if remaining:
+                lots.append([remaining, price])
+                lot_sign = sign
+            elif not lots:
+                lot_sign = 0
+
+        if not lots and not active_today:
+            continue
+
+        instrument_id, account_id = keys[idx[0]]
+        multiplier = multipliers.get(instrument_id, 1.0)
+        realized *= multiplier
+        settle = settle_prices.get(instrument_id)
+        if settle is None:
+            unrealized = None if lots else 0.0
+        else:
+            unrealized = sum(q * (settle - p) for q, p in lots) * lot_sign * multiplier
+        total = realized + unrealized if unrealized is not None else None
+        results.append((instrument_id, account_id, round(realized, 6),
+                        round(unrealized, 6) if unrealized is not None else None,
+                        round(total, 6) if total is not None else None))
+
+    return results
+
+
+class EodPnlService:
+    """Service class for the end-of-day P&L batch"""
+
+    COLUMNS = ("instrument_id", "account_id", "val_date", "realized_pnl", "unrealized_pnl", "total_pnl")
+
+    @staticmethod
+    def run(db: Session, val_date: date) -> Dict[str, Any]:
+        """
+        Compute P&L for a valuation date and replace its eod_pnl rows
+
+        Args:
+            db: Database session
+            val_date: Valuation date
+
+        Returns:
+            Run statistics
+        """
+        started = time.perf_counter()
+        day_start = datetime.combine(val_date, dt_time.min)
+        day_end = day_start + timedelta(days=1)
+
+        rows = db.execute(
+            select(Trade.instrument_id, Trade.account_id, Trade.side, Trade.qty, Trade.price, Trade.exec_time)
+            .where(
+                Trade.status != "CANCELLED",
+                Trade.exec_time < day_end,
+                Trade.instrument_id.isnot(None),
+                Trade.account_id.isnot(None)
+            )
+            .order_by(Trade.exec_time, Trade.trade_id)
+        ).all()
+        if rows:
+            instrument_ids, account_ids, sides, qtys, prices, exec_times = zip(*rows)
+        else:
+            instrument_ids = account_ids = sides = qtys = prices = exec_times = ()
+        signed = [signed_qty(side, qty) for side, qty in zip(sides, qtys)]
+        is_today = [t is not None and t >= day_start for t in exec_times]
+        prices = [float(p or 0.0) for p in prices]
+
+        settle_prices = EodPnlService.get_settlement_prices(db, val_date)
+        multipliers = {
+            instrument_id: float(multiplier)
+            for instrument_id, multiplier in db.execute(
+                select(InstrumentETD.instrument_id, InstrumentETD.contract_multiplier)
+                .where(InstrumentETD.contract_multiplier.isnot(None))
+            )
+        }
+        loaded = time.perf_counter()
+
+        results = compute_eod_pnl(instrument_ids, account_ids, signed, prices, is_today, settle_prices, multipliers)
+        computed = time.perf_counter()
+
+        db.execute(delete(EodPnl).where(EodPnl.val_date == val_date))
+        written = copy_rows(db, EodPnl.__table__, EodPnlService.COLUMNS, (
+            (instrument_id, account_id, val_date, realized, unrealized, total)
+            for instrument_id, account_id, realized, unrealized, total in results
+        ))
+        db.commit()
+        finished = time.perf_counter()
+
+        missing = sorted({row[0] for row in results if row[3] is None})
+        if missing:
+            logger.warning(f"EOD P&L {val_date}: no settlement price for {len(missing)} instruments")
+        logger.info(f"EOD P&L {val_date}: {len(rows)} trades -> {written} rows in {finished - started:.2f}s")
+        return {
+            "val_date": val_date,
+            "trades": len(rows),
+            "rows_written": written,
+            "instruments_without_settlement": missing,
+            "load_seconds": round(loaded - started, 3),
+            "compute_seconds": round(computed - loaded, 3),
+            "write_seconds": round(finished - computed, 3)
+        }
+
+    @staticmethod
+    def get_settlement_prices(db: Session, val_date: date) -> Dict[str, float]:
+        """Latest settlement price on or before the valuation date for every instrument"""
+        latest = (
+            select(SettlementPrice.instrument_id, func.max(SettlementPrice.val_date).label("val_date"))
+            .where(SettlementPrice.val_date <= val_date)
+            .group_by(SettlementPrice.instrument_id)
+            .subquery()
+        )
+        return {
+            instrument_id: float(price)
+            for instrument_id, price in db.execute(
+                select(SettlementPrice.instrument_id, SettlementPrice.settle_price).join(
+                    latest,
+                    (SettlementPrice.instrument_id == latest.c.instrument_id)
+                    & (SettlementPrice.val_date == latest.c.val_date)
+                )
+            )
+            if price is not None
+        }
+
+    @staticmethod
+    def get_pnl(db: Session, val_date: date, account_id: Optional[str] = None) -> Dict[str, Any]:
+        """Stored EOD P&L rows for a date with totals"""
+        query = db.query(EodPnl).filter(EodPnl.val_date == val_date)
+        if account_id:
+            query = query.filter(EodPnl.account_id == account_id)
+        rows = query.all()
+        to_float = lambda v: float(v) if v is not None else None
+        return {
+            "val_date": val_date,
+            "rows": [
+                {
+                    "instrument_id": r.instrument_id,
+                    "account_id": r.account_id,
+                    "realized_pnl": to_float(r.realized_pnl),
+                    "unrealized_pnl": to_float(r.unrealized_pnl),
+                    "total_pnl": to_float(r.total_pnl)
+                }
+                for r in rows
+            ],
+            "totals": {
+                "realized_pnl": sum(float(r.realized_pnl or 0) for r in rows),
+                "unrealized_pnl": sum(float(r.unrealized_pnl or 0) for r in rows),
+                "total_pnl": sum(float(r.total_pnl or 0) for r in rows)
+            }
+        }
+
+
+class VariationMarginService:
+    """Service class for the daily variation margin run"""
+
+    COLUMNS = (
+        "vm_id", "instrument_id", "account_id", "val_date", "prev_settle",
+        "today_settle", "net_qty", "contract_multiplier", "vm_amount"
+    )
+
+    @staticmethod
+    def run(db: Session, val_date: date) -> Dict[str, Any]:
+        """
+        Compute and upsert variation margin for every position in one
+        INSERT ... SELECT: net_qty * (today_settle - prev_settle) * multiplier.
+
+        Positions are the latest position_daily row on or before the date and
+        prev_settle is the latest settlement price before it, so weekends and
+        holidays carry over. Instruments without both prices are skipped.
+
+        Args:
+            db: Database session
+            val_date: Valuation date
+
+        Returns:
+            Run statistics
+        """
+        started = time.perf_counter()
+        if val_date == date.today():
+            # Make intraday position changes visible to the set-based query
+            position_keeper.flush()
+
+        position_date = (
+            select(
+                PositionDaily.instrument_id,
+                PositionDaily.account_id,
+                func.max(PositionDaily.val_date).label("val_date")
+            )
+            .where(PositionDaily.val_date <= val_date)
+            .group_by(PositionDaily.instrument_id, PositionDaily.account_id)
+            .subquery()
+        )
+        prev_date = (
+            select(SettlementPrice.instrument_id, func.max(SettlementPrice.val_date).label("val_date"))
+            .where(SettlementPrice.val_date < val_date)
+            .group_by(SettlementPrice.instrument_id)
+            .subquery()
+        )
+        today_px = aliased(SettlementPrice)
+        prev_px = aliased(SettlementPrice)
+        multiplier = func.coalesce(InstrumentETD.contract_multiplier, 1)
+        net_qty = func.coalesce(PositionDaily.close_qty, 0)
+
+        query = (
+            select(
+                (PositionDaily.instrument_id + literal(":") + PositionDaily.account_id
+                 + literal(f":{val_date.isoformat()}")).label("vm_id"),
+                PositionDaily.instrument_id,
+                PositionDaily.account_id,
+                literal(val_date).label("val_date"),
+                prev_px.settle_price,
+                today_px.settle_price,
+                net_qty,
+                cast(multiplier, Integer),
+                net_qty * (today_px.settle_price - prev_px.settle_price) * multiplier
+            )
+            .select_from(PositionDaily)
+            .join(position_date, and_(
+                PositionDaily.instrument_id == position_date.c.instrument_id,
+                PositionDaily.account_id == position_date.c.account_id,
+                PositionDaily.val_date == position_date.c.val_date
+            ))
+            .join(today_px, and_(today_px.instrument_id == PositionDaily.instrument_id, today_px.val_date == val_date))
+            .join(prev_date, prev_date.c.instrument_id == PositionDaily.instrument_id)
+            .join(prev_px, and_(prev_px.instrument_id == prev_date.c.instrument_id, prev_px.val_date == prev_date.c.val_date))
+            .outerjoin(InstrumentETD, InstrumentETD.instrument_id == PositionDaily.instrument_id)
+            .where(today_px.settle_price.isnot(None), prev_px.settle_price.isnot(None))
+        )
+
+        rows = upsert_from_select(
+            db, VariationMargin.__table__, VariationMarginService.COLUMNS, query,
+            ("instrument_id", "account_id", "val_date")
+        )
+        db.commit()
+        elapsed = time.perf_counter() - started
+        logger.info(f"Variation margin {val_date}: {rows} positions in {elapsed:.2f}s")
+        return {"val_date": val_date, "positions": rows, "elapsed_seconds": round(elapsed, 3)}
+
+    @staticmethod
+    def get_totals(db: Session, val_date: date, account_id: Optional[str] = None) -> Dict[str, Any]:
+        """Variation margin per account for a date, aggregated in the database"""
+        query = db.query(
+            VariationMargin.account_id,
+            func.count(VariationMargin.vm_id),
+            func.coalesce(func.sum(VariationMargin.vm_amount), 0)
+        ).filter(VariationMargin.val_date == val_date)
+        if account_id:
+            query = query.filter(VariationMargin.account_id == account_id)
+        static_data_cache.ensure_fresh()
+        accounts = [
+            {
+                "account_id": acct_id,
+                "account": static_data_cache.account_code(acct_id),
+                "positions": count,
+                "vm_amount": float(total)
+            }
+            for acct_id, count, total in query.group_by(VariationMargin.account_id).all()
+        ]
+        return {
+            "val_date": val_date,
+            "accounts": accounts,
+            "total_vm_amount": sum(a["vm_amount"] for a in accounts)
+        }
+
+
+# Global position keeper
+position_keeper = PositionKeeper(flush_interval_ms=settings.position_flush_interval_ms)
@@ -1,10 +1,12 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from typing import Optional
 from fastapi.security import OAuth2PasswordBearer
 import jwt
 from datetime import datetime
 import os
 
-from app.modules.auth.schemas import TokenData
+from app.core import settings
+from app.modules.auth.token_cache import TokenCache
 
 # Secret key for JWT - should match the one in routes.py
 SECRET_KEY = os.getenv("SECRET_KEY", "mocktrade_secret_key_for_development_only")
@@ -12,6 +14,13 @@ ALGORITHM = "HS256"
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Verified claims by token hash, with revocation
+token_cache = TokenCache(
+    SECRET_KEY, ALGORITHM,
+    max_size=settings.auth_token_cache_size,
+    deny_list_path=settings.auth_token_deny_list_path
+)
+
 # Hardcoded users for demo purposes (should match routes.py)
 USERS_DB = {
     "admin": {
@@ -53,17 +62,27 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        role: str = payload.get("role")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username, role=role)
+        payload = token_cache.decode(token)
     except jwt.PyJWTError:
         raise credentials_exception
+    username: str = payload.get("sub")
+    role: str = payload.get("role")
+    if username is None:
+        raise credentials_exception
     
     user = USERS_DB.get(username)
     if user is None:
         raise credentials_exception
     
-    return {"username": username, "role": role, "user_info": user}
\ No newline at end of file
+    return {"username": username, "role": role, "user_info": user}
+
+
+def request_username(request: Request) -> Optional[str]:
+    """Username of a request's valid bearer token, if any (served from the token cache)"""
+    authorization = request.headers.get("authorization")
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        return token_cache.decode(authorization[7:]).get("sub")
+    except jwt.PyJWTError:
+        return None
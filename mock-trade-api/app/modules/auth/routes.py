@@ -7,6 +7,8 @@ import hashlib
 import os
 
 from app.modules.auth.schemas import UserLogin, Token, UserResponse
+from app.modules.auth.middleware import oauth2_scheme, token_cache
+from app.modules.security.dependencies import permission_claims
 
 router = APIRouter(prefix="/api/v1/auth", tags=["authentication"])
 
@@ -58,7 +60,7 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return encoded_jwt
 
 @router.post("/login", response_model=Token)
-async def login_for_access_token(user_data: UserLogin):
+def login_for_access_token(user_data: UserLogin):
     user = authenticate_user(user_data.username, user_data.password, user_data.role)
     if not user:
         raise HTTPException(
@@ -69,7 +71,7 @@ async def login_for_access_token(user_data: UserLogin):
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user["username"], "role": user_data.role},
+        data={"sub": user["username"], "role": user_data.role, **permission_claims(user["id"], user_data.role)},
         expires_delta=access_token_expires
     )
     
@@ -88,17 +90,30 @@ async def login_for_access_token(user_data: UserLogin):
     )
 
 @router.post("/logout")
-async def logout():
-    # In a real application, you would invalidate the token here
-    # For this demo, we'll just return a success message
+def logout(token: str = Depends(oauth2_scheme)):
+    # Revoked tokens are rejected until they expire, including after a restart.
+    # Sync route: revoking saves the deny list to disk, so it runs in the threadpool
+    try:
+        token_cache.revoke(token)
+    except jwt.PyJWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return {"message": "Successfully logged out"}
 
+@router.get("/token-cache")
+async def get_token_cache_stats():
+    """Verified token cache hit rate and size"""
+    return token_cache.get_stats()
+
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(token: str):
     # In a real application, you would decode the token and return user info
     # For this demo, we'll just return a placeholder
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = token_cache.decode(token)
         username: str = payload.get("sub")
         role: str = payload.get("role")
         
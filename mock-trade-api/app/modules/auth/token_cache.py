@@ -0,0 +1,141 @@
+"""
+Auth Module - Decoded Token Cache
+Bounded LRU of verified JWT claims keyed by token hash, plus a locally
+persisted deny-set for revoked tokens.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import hashlib
+import threading
+import time
+import json
+import os
+import logging
+
+import jwt
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCache:
+    """
+    Verified token claims cache.
+
+    A token's signature and claims are checked once; later requests with the
+    same token are served from the cache until its exp, skipping the HMAC and
+    claim validation. Revoked tokens are kept (by hash, until their exp) in a
+    deny-set that is checked on every lookup and saved to deny_list_path so
+    revocations survive a restart.
+
+    Cached claims dicts are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, secret_key: str, algorithm: str, max_size: int, deny_list_path: Optional[str] = None):
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.max_size = max_size
+        self.deny_list_path = deny_list_path
+        self._lock = threading.Lock()
+        # token hash -> (claims, exp)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # token hash -> exp (kept until the token would have expired anyway)
+        self._denied: Dict[str, Optional[float]] = {}
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "denied": 0, "invalid": 0}
+        self._load_deny_list()
+
+    @staticmethod
+    def token_hash(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Verified claims of a token
+
+        Raises:
+            jwt.PyJWTError: If the token is invalid, expired or revoked
+        """
+        key = self.token_hash(token)
+        now = time.time()
+        with self._lock:
+            if key in self._denied:
+                self.stats["denied"] += 1
+                raise jwt.InvalidTokenError("Token has been revoked")
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] is None or entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[0]
+                del self._entries[key]
+                self.stats["expired"] += 1
+            self.stats["misses"] += 1
+
+        try:
+            claims = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        except jwt.PyJWTError:
+            with self._lock:
+                self.stats["invalid"] += 1
+            raise
+        exp = claims.get("exp")
+        with self._lock:
+            self._entries[key] = (claims, float(exp) if exp is not None else None)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return claims
+
+    def revoke(self, token: str) -> None:
+        """
+        Deny a token until it expires (persisted, so the revocation survives a restart).
+        Only verified tokens are denied, so junk cannot grow the deny list.
+        Saves the deny list to disk; call from a worker thread, not the event loop.
+
+        Raises:
+            jwt.PyJWTError: If the token is invalid, expired or already revoked
+        """
+        exp = self.decode(token).get("exp")
+        key = self.token_hash(token)
+        with self._lock:
+            self._entries.pop(key, None)
+            now = time.time()
+            self._denied = {k: e for k, e in self._denied.items() if e is None or e > now}
+            self._denied[key] = float(exp) if exp is not None else None
+            self._save_deny_list()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _load_deny_list(self) -> None:
+        if not self.deny_list_path or not os.path.exists(self.deny_list_path):
+            return
+        try:
+            with open(self.deny_list_path) as f:
+                denied = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not load token deny list {self.deny_list_path}: {e}")
+            return
+        now = time.time()
+        self._denied = {k: e for k, e in denied.items() if e is None or e > now}
+        logger.info(f"Loaded {len(self._denied)} revoked tokens")
+
+    def _save_deny_list(self) -> None:
+        if not self.deny_list_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.deny_list_path)), exist_ok=True)
+        tmp = f"{self.deny_list_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._denied, f)
+        os.replace(tmp, self.deny_list_path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "revoked": len(self._denied),
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else None,
+            }
@@ -1,8 +1,30 @@
 """
 Confirmations Module
 Handles trade confirmation management and matching.
+
+Exports are imported on first access. Document worker processes import
+app.modules.confirmations.rendering by module path when unpickling their
+task, and should not pay for the service, routes, database engines and
+event bus on every spawn.
 """
 
-from app.modules.confirmations.routes import router
+from importlib import import_module
+
+_EXPORTS = {
+    'ConfirmationMatcher': 'app.modules.confirmations.matching',
+    'ConfirmationService': 'app.modules.confirmations.service',
+    'DocumentPipeline': 'app.modules.confirmations.documents',
+    'document_pipeline': 'app.modules.confirmations.documents',
+    'router': 'app.modules.confirmations.routes',
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ['router']
+__all__ = ['ConfirmationMatcher', 'ConfirmationService', 'DocumentPipeline', 'document_pipeline', 'router']
@@ -0,0 +1,237 @@
+"""
+Confirmations Module - Document Pipeline
+Generates confirmation documents for matched confirmations off the request
+path: chunked reads with all reference data joined in, rendering on a
+process pool, and one bulk write of document records per chunk.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime
+import multiprocessing
+import threading
+import time
+import uuid
+import os
+import logging
+
+from app.core import settings, SessionLocal, copy_rows
+from app.core.exceptions import InvalidOrderError
+from app.models import Instrument, InstrumentOTC, Account, Broker, Trader
+from app.modules.trade.models import Trade
+from app.modules.confirmations.models import Confirmation, ConfirmationDocument
+from app.modules.confirmations.rendering import RENDERERS, write_documents
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_COLUMNS = (
+    "confirmation_id", "trade_id", "doc_format", "path", "checksum", "size_bytes", "run_id", "generated_at"
+)
+
+
+class DocumentPipeline:
+    """
+    Confirmation document generator.
+
+    Pending work is every MATCHED confirmation without a confirmation_document
+    row, read in confirmation_id order. Each chunk's document rows are
+    committed before the next chunk is read, so a stopped or crashed run
+    resumes where it left off and a finished run has nothing left to do.
+    The database read of chunk N+1 overlaps the rendering of chunk N.
+    """
+
+    def __init__(self, output_dir: str, workers: int, chunk_size: int, session_factory: Callable = SessionLocal):
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.session_factory = session_factory
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats: Dict[str, Any] = {"state": "IDLE"}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _fetch_chunk(self, db: Session, after: Optional[str]) -> List[Dict[str, Any]]:
+        """Next pending confirmations with trade, instrument, OTC and party details in one query"""
+        query = (
+            select(
+                Confirmation.confirmation_id, Confirmation.trade_date, Confirmation.matched_trade_id,
+                Trade.side, Trade.qty, Trade.price, Trade.settlement_date,
+                Instrument.instrument_id, Instrument.symbol, Instrument.name, Instrument.instrument_type,
+                InstrumentOTC.settlement_type, InstrumentOTC.day_count_convention,
+                InstrumentOTC.primary_calendar, InstrumentOTC.secondary_calendar,
+                InstrumentOTC.is_cleared, InstrumentOTC.clearing_house, InstrumentOTC.bilateral_cpty,
+                Account.name.label("account_name"), Account.code.label("account_code"),
+                Broker.name.label("broker_name"), Broker.code.label("broker_code"),
+                Trader.name.label("trader_name")
+            )
+            .join(Trade, Trade.trade_id == Confirmation.matched_trade_id)
+            .outerjoin(Instrument, Instrument.instrument_id == Trade.instrument_id)
+            .outerjoin(InstrumentOTC, InstrumentOTC.instrument_id == Trade.instrument_id)
+            .outerjoin(Account, Account.account_id == Trade.account_id)
+            .outerjoin(Broker, Broker.broker_id == Trade.broker_id)
+            .outerjoin(Trader, Trader.trader_id == Trade.trader_id)
+            .outerjoin(ConfirmationDocument, ConfirmationDocument.confirmation_id == Confirmation.confirmation_id)
+            .where(Confirmation.status == "MATCHED", ConfirmationDocument.confirmation_id.is_(None))
+            .order_by(Confirmation.confirmation_id)
+            .limit(self.chunk_size)
+        )
+        if after is not None:
+            query = query.where(Confirmation.confirmation_id > after)
+
+        contexts = []
+        for row in db.execute(query).mappings():
+            calendars = "+".join(c for c in (row["primary_calendar"], row["secondary_calendar"]) if c)
+            if row["is_cleared"] == "Y":
+                clearing = f"Cleared via {row['clearing_house'] or ''}".strip()
+            else:
+                clearing = "Bilateral" if row["is_cleared"] else None
+            contexts.append({
+                "confirmation_id": row["confirmation_id"],
+                "trade_id": row["matched_trade_id"],
+                "trade_date": row["trade_date"].isoformat() if row["trade_date"] else None,
+                "settlement_date": row["settlement_date"].isoformat() if row["settlement_date"] else None,
+                "side": row["side"],
+                "qty": row["qty"],
+                "price": row["price"],
+                "notional": (row["qty"] or 0) * (row["price"] or 0.0),
+                "instrument_id": row["instrument_id"],
+                "symbol": row["symbol"],
+                "instrument_name": row["name"],
+                "instrument_type": row["instrument_type"],
+                "settlement_type": row["settlement_type"],
+                "day_count_convention": row["day_count_convention"],
+                "calendars": calendars or None,
+                "clearing": clearing,
+                "account": row["account_name"] or row["account_code"],
+                "broker": row["broker_name"] or row["broker_code"],
+                "counterparty": row["bilateral_cpty"] or row["broker_name"] or row["broker_code"],
+                "trader": row["trader_name"],
+            })
+        return contexts
+
+    def _store(self, db: Session, run_id: str, doc_format: str, contexts: List[Dict[str, Any]], results) -> None:
+        now = datetime.utcnow()
+        trade_ids = {c["confirmation_id"]: c["trade_id"] for c in contexts}
+        rows = []
+        for batch in results:
+            for confirmation_id, path, checksum, size, error in batch:
+                if error:
+                    self.stats["failed"] += 1
+                    logger.error(f"Confirmation document {confirmation_id} failed: {error}")
+                    continue
+                rows.append((confirmation_id, trade_ids[confirmation_id], doc_format, path, checksum, size, run_id, now))
+        copy_rows(db, ConfirmationDocument.__table__, DOCUMENT_COLUMNS, rows)
+        db.commit()
+        self.stats["documents"] += len(rows)
+        self.stats["chunks"] += 1
+        elapsed = time.perf_counter() - self._started
+        self.stats["elapsed_seconds"] = round(elapsed, 3)
+        self.stats["documents_per_second"] = round(self.stats["documents"] / elapsed, 1) if elapsed else None
+
+    def run(self, doc_format: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Generate documents for pending confirmations (blocking)
+
+        Args:
+            doc_format: html, fpml or text (defaults to the configured format)
+            limit: Stop after about this many documents (whole chunks)
+
+        Returns:
+            Run statistics including throughput
+        """
+        doc_format = doc_format or settings.confirmation_document_format
+        if doc_format not in RENDERERS:
+            raise InvalidOrderError(f"Unknown document format {doc_format}")
+        run_id = str(uuid.uuid4())
+        self._started = time.perf_counter()
+        self.stats = {
+            "run_id": run_id, "state": "RUNNING", "format": doc_format, "workers": self.workers,
+            "documents": 0, "failed": 0, "chunks": 0, "elapsed_seconds": 0.0, "documents_per_second": None,
+            "started_at": datetime.utcnow().isoformat()
+        }
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        db = self.session_factory()
+        # spawn: the API process runs threads, which fork would copy in an undefined state
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            after = None
+            in_flight = None
+            while not self._stop.is_set():
+                contexts = self._fetch_chunk(db, after)
+                if in_flight:
+                    self._store(db, run_id, doc_format, *in_flight)
+                    in_flight = None
+                if not contexts or (limit is not None and self.stats["documents"] >= limit):
+                    break
+                after = contexts[-1]["confirmation_id"]
+                # One task per worker batch keeps pickling overhead per document low
+                size = max(1, -(-len(contexts) // (self.workers * 4)))
+                batches = [contexts[i:i + size] for i in range(0, len(contexts), size)]
+                results = pool.map(write_documents, batches, [doc_format] * len(batches),
+                                   [self.output_dir] * len(batches))
+                in_flight = (contexts, results)
+            if in_flight:
+                self._store(db, run_id, doc_format, *in_flight)
+            self.stats["state"] = "STOPPED" if self._stop.is_set() else "COMPLETED"
+        except Exception as e:
+            db.rollback()
+            self.stats["state"] = "FAILED"
+            self.stats["error"] = str(e)
+            logger.error(f"Confirmation document run {run_id} failed: {e}", exc_info=True)
+            raise
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            db.close()
+        logger.info(
+            f"Confirmation documents {run_id}: {self.stats['documents']} written, {self.stats['failed']} failed, "
+            f"{self.stats['documents_per_second']} docs/s"
+        )
+        return dict(self.stats)
+
+    def start(self, doc_format: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Run in a background thread so the API is not blocked"""
+        if self.running:
+            raise InvalidOrderError("A confirmation document run is already in progress")
+        doc_format = doc_format or settings.confirmation_document_format
+        if doc_format not in RENDERERS:
+            raise InvalidOrderError(f"Unknown document format {doc_format}")
+        self._stop.clear()
+        self.stats = {"state": "STARTING", "format": doc_format}
+
+        def target():
+            try:
+                self.run(doc_format, limit)
+            except Exception:
+                pass  # recorded in stats by run()
+
+        self._thread = threading.Thread(target=target, name="confirmation-documents", daemon=True)
+        self._thread.start()
+        return dict(self.stats)
+
+    def stop(self) -> None:
+        """Stop after the chunk in progress (the next run resumes from there)"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(30)
+        self._thread = None
+
+    def get_document(self, db: Session, confirmation_id: str) -> Optional[ConfirmationDocument]:
+        return db.query(ConfirmationDocument).filter(ConfirmationDocument.confirmation_id == confirmation_id).first()
+
+    def document_path(self, document: ConfirmationDocument) -> str:
+        return os.path.join(self.output_dir, document.path)
+
+
+# Global confirmation document pipeline
+document_pipeline = DocumentPipeline(
+    output_dir=settings.confirmation_document_dir,
+    workers=settings.confirmation_document_workers,
+    chunk_size=settings.confirmation_document_chunk_size
+)
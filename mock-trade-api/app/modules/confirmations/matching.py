@@ -0,0 +1,152 @@
+"""
+Confirmations Module - Matching Index
+Hash buckets on exact trade keys with a sorted price index per bucket for
+tolerance matching.
+"""
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import date
+
+# (status, matched trade, candidate trade, price diff, break reason)
+MatchResult = Tuple[str, Optional[str], Optional[str], Optional[float], Optional[str]]
+
+
+class ConfirmationMatcher:
+    """
+    In-memory matching index over unconfirmed trades.
+
+    Every trade is placed in an exact bucket keyed on (instrument, side, qty,
+    trade date, party) once for its account and once for its broker, with the
+    bucket's prices kept sorted so the nearest price within tolerance is found
+    by bisection. A second, quantity-free bucket per (instrument, side, trade
+    date, party) classifies quantity breaks. A confirmation therefore costs a
+    couple of dict lookups plus a bisect instead of a scan over the trades.
+    """
+
+    def __init__(self, tolerance_bps: float):
+        self.tolerance_bps = tolerance_bps
+        self._trade_ids: List[str] = []
+        self._prices: List[float] = []
+        self._consumed = bytearray()
+        # exact key -> ([sorted prices], [trade ordinals]) kept in step
+        self._exact: Dict[tuple, Tuple[List[float], List[int]]] = {}
+        # qty-free key -> [trade ordinals], with the first possibly unconsumed position per key
+        self._loose: Dict[tuple, List[int]] = {}
+        self._loose_head: Dict[tuple, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._trade_ids)
+
+    @staticmethod
+    def _parties(account_id: Optional[str], broker_id: Optional[str]) -> List[str]:
+        parties = []
+        if account_id:
+            parties.append(f"A:{account_id}")
+        if broker_id:
+            parties.append(f"B:{broker_id}")
+        return parties
+
+    def load(self, trades: Iterable[tuple]) -> None:
+        """
+        Index trades given as (trade_id, instrument_id, side, qty, price,
+        trade_date, account_id, broker_id) tuples (call once)
+        """
+        for trade_id, instrument_id, side, qty, price, trade_date, account_id, broker_id in trades:
+            ordinal = len(self._trade_ids)
+            self._trade_ids.append(trade_id)
+            self._prices.append(price)
+            side = (side or "").upper()
+            for party in self._parties(account_id, broker_id):
+                bucket = self._exact.get((instrument_id, side, qty, trade_date, party))
+                if bucket is None:
+                    bucket = self._exact[(instrument_id, side, qty, trade_date, party)] = ([], [])
+                bucket[0].append(price)
+                bucket[1].append(ordinal)
+                self._loose.setdefault((instrument_id, side, trade_date, party), []).append(ordinal)
+        self._consumed.extend(bytes(len(self._trade_ids) - len(self._consumed)))
+
+        # Sort each bucket's prices once after loading
+        for key, (prices, ordinals) in self._exact.items():
+            if len(prices) > 1:
+                order = sorted(range(len(prices)), key=prices.__getitem__)
+                self._exact[key] = ([prices[i] for i in order], [ordinals[i] for i in order])
+
+    def _nearest(self, prices: List[float], ordinals: List[int], price: float) -> Optional[int]:
+        """Position of the unconsumed entry closest to price, dropping consumed entries met on the way"""
+        i = bisect_left(prices, price)
+        left, right = i - 1, i
+        while right < len(prices) and self._consumed[ordinals[right]]:
+            del prices[right], ordinals[right]
+        while left >= 0 and self._consumed[ordinals[left]]:
+            del prices[left], ordinals[left]
+            left -= 1
+            right -= 1
+        if left < 0:
+            return right if right < len(prices) else None
+        if right >= len(prices):
+            return left
+        return left if price - prices[left] <= prices[right] - price else right
+
+    def match(
+        self,
+        instrument_id: str,
+        side: str,
+        qty: int,
+        price: float,
+        trade_date: date,
+        account_id: Optional[str] = None,
+        broker_id: Optional[str] = None
+    ) -> MatchResult:
+        """
+        Match one confirmation, consuming the matched trade
+
+        The account is preferred over the broker when the confirmation
+        carries both.
+        """
+        side = (side or "").upper()
+        tolerance = abs(price) * self.tolerance_bps / 10000.0
+        parties = self._parties(account_id, broker_id)
+
+        nearest_break: Optional[Tuple[float, int]] = None
+        for party in parties:
+            bucket = self._exact.get((instrument_id, side, qty, trade_date, party))
+            if not bucket:
+                continue
+            prices, ordinals = bucket
+            pos = self._nearest(prices, ordinals, price)
+            if pos is None:
+                continue
+            diff = price - prices[pos]
+            if abs(diff) <= tolerance:
+                ordinal = ordinals[pos]
+                self._consumed[ordinal] = 1
+                del prices[pos], ordinals[pos]
+                return "MATCHED", self._trade_ids[ordinal], None, round(diff, 10), None
+            if nearest_break is None or abs(diff) < abs(nearest_break[0]):
+                nearest_break = (diff, ordinals[pos])
+
+        if nearest_break is not None:
+            diff, ordinal = nearest_break
+            return (
+                "BREAK", None, self._trade_ids[ordinal], round(diff, 10),
+                f"Price {price} outside tolerance of trade price {self._prices[ordinal]}"
+            )
+
+        for party in parties:
+            key = (instrument_id, side, trade_date, party)
+            ordinals = self._loose.get(key)
+            if not ordinals:
+                continue
+            # Advance past consumed trades; the head only moves forward, so scans are amortized O(1)
+            head = self._loose_head.get(key, 0)
+            while head < len(ordinals) and self._consumed[ordinals[head]]:
+                head += 1
+            self._loose_head[key] = head
+            if head < len(ordinals):
+                return "BREAK", None, self._trade_ids[ordinals[head]], None, f"Quantity {qty} does not match any trade"
+
+        return "UNMATCHED", None, None, None, None
+
+
+__all__ = ['ConfirmationMatcher', 'MatchResult']
@@ -0,0 +1,48 @@
+# Confirmations Module - Models
+
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, Index
+from app.core import Base
+
+
+class Confirmation(Base):
+    """
+    Inbound broker confirmation and its matching outcome.
+    Status: UNMATCHED (no candidate trade), MATCHED, BREAK (candidate found
+    but price or quantity differs), REJECTED (closed manually).
+    """
+    __tablename__ = "confirmation"
+    __table_args__ = (
+        Index("ix_confirmation_status_trade_date", "status", "trade_date"),
+    )
+    confirmation_id = Column(String, primary_key=True)  # broker's confirmation reference
+    upload_id = Column(String, index=True)
+    broker_id = Column(String, nullable=True)
+    account_id = Column(String, nullable=True)
+    instrument_id = Column(String, nullable=False)
+    side = Column(String, nullable=False)
+    qty = Column(Integer, nullable=False)
+    price = Column(Float, nullable=False)
+    trade_date = Column(Date, nullable=False)
+    status = Column(String, default="UNMATCHED")
+    matched_trade_id = Column(String, nullable=True, index=True)
+    candidate_trade_id = Column(String, nullable=True)  # nearest trade for a break
+    price_diff = Column(Float, nullable=True)  # confirmed price - trade price
+    break_reason = Column(String, nullable=True)
+    received_at = Column(DateTime)
+    matched_at = Column(DateTime, nullable=True)
+
+
+class ConfirmationDocument(Base):
+    """Generated confirmation document (one per matched confirmation)"""
+    __tablename__ = "confirmation_document"
+    confirmation_id = Column(String, primary_key=True)
+    trade_id = Column(String, nullable=True)
+    doc_format = Column(String, nullable=False)  # html, fpml, text
+    path = Column(String, nullable=False)  # relative to the document output directory
+    checksum = Column(String, nullable=False)  # sha256 of the document
+    size_bytes = Column(Integer)
+    run_id = Column(String)
+    generated_at = Column(DateTime)
+
+
+__all__ = ['Confirmation', 'ConfirmationDocument']
@@ -0,0 +1,115 @@
+"""
+Confirmations Module - Document Rendering
+Pure functions that render and write one confirmation document. They run in
+worker processes, so they take plain dicts and use only the standard library.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+from html import escape as html_escape
+from xml.sax.saxutils import escape as xml_escape
+import hashlib
+import os
+
+FORMATS = {"html": "html", "fpml": "xml", "text": "txt"}
+
+# (confirmation_id, relative path, sha256, size in bytes, error)
+RenderResult = Tuple[str, Optional[str], Optional[str], Optional[int], Optional[str]]
+
+FIELDS = (
+    ("Confirmation", "confirmation_id"),
+    ("Trade ID", "trade_id"),
+    ("Trade Date", "trade_date"),
+    ("Settlement Date", "settlement_date"),
+    ("Side", "side"),
+    ("Quantity", "qty"),
+    ("Price", "price"),
+    ("Notional", "notional"),
+    ("Instrument", "instrument_id"),
+    ("Symbol", "symbol"),
+    ("Description", "instrument_name"),
+    ("Instrument Type", "instrument_type"),
+    ("Settlement Type", "settlement_type"),
+    ("Day Count", "day_count_convention"),
+    ("Calendars", "calendars"),
+    ("Clearing", "clearing"),
+    ("Account", "account"),
+    ("Broker", "broker"),
+    ("Counterparty", "counterparty"),
+    ("Trader", "trader"),
+)
+
+
+def _value(context: Dict[str, Any], key: str) -> str:
+    value = context.get(key)
+    return "" if value is None else str(value)
+
+
+def render_html(context: Dict[str, Any]) -> str:
+    rows = "\n".join(
+        f"<tr><th>{label}</th><td>{html_escape(_value(context, key))}</td></tr>" for label, key in FIELDS
+    )
+    return (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+        f"<title>Trade Confirmation {html_escape(_value(context, 'confirmation_id'))}</title></head>\n"
+        f"<body><h1>Trade Confirmation</h1>\n<table>\n{rows}\n</table></body></html>\n"
+    )
+
+
+def render_fpml(context: Dict[str, Any]) -> str:
+    """FpML-style trade confirmation message (structure only, not schema-validated)"""
+    v = lambda key: xml_escape(_value(context, key), {'"': "&quot;"})
+    return (
+        "<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n"
+        "<requestConfirmation>\n"
+        f"  <header><messageId>{v('confirmation_id')}</messageId><sentBy>{v('broker')}</sentBy>"
+        f"<sendTo>{v('account')}</sendTo></header>\n"
+        "  <trade>\n"
+        f"    <tradeHeader><partyTradeIdentifier><tradeId>{v('trade_id')}</tradeId></partyTradeIdentifier>"
+        f"<tradeDate>{v('trade_date')}</tradeDate></tradeHeader>\n"
+        f"    <product instrumentId=\"{v('instrument_id')}\" symbol=\"{v('symbol')}\" type=\"{v('instrument_type')}\">\n"
+        f"      <buyerSeller>{v('side')}</buyerSeller><quantity>{v('qty')}</quantity>"
+        f"<price>{v('price')}</price><notional>{v('notional')}</notional>\n"
+        f"      <settlement type=\"{v('settlement_type')}\" date=\"{v('settlement_date')}\" "
+        f"calendars=\"{v('calendars')}\" dayCount=\"{v('day_count_convention')}\"/>\n"
+        "    </product>\n"
+        f"    <clearing>{v('clearing')}</clearing><counterparty>{v('counterparty')}</counterparty>\n"
+        "  </trade>\n"
+        "</requestConfirmation>\n"
+    )
+
+
+def render_text(context: Dict[str, Any]) -> str:
+    width = max(len(label) for label, _ in FIELDS)
+    lines = [f"{label.ljust(width)} : {_value(context, key)}" for label, key in FIELDS]
+    return "TRADE CONFIRMATION\n" + "\n".join(lines) + "\n"
+
+
+RENDERERS = {"html": render_html, "fpml": render_fpml, "text": render_text}
+
+
+def write_document(context: Dict[str, Any], doc_format: str, output_dir: str) -> RenderResult:
+    """
+    Render one confirmation and write it under output_dir/<trade date>/.
+
+    The file is written to a temporary name and renamed into place, so a
+    rerun after a crash overwrites partial output instead of keeping it.
+    """
+    confirmation_id = context["confirmation_id"]
+    try:
+        body = RENDERERS[doc_format](context).encode("utf-8")
+        safe_id = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in confirmation_id)
+        relative = os.path.join(_value(context, "trade_date") or "undated", f"{safe_id}.{FORMATS[doc_format]}")
+        path = os.path.join(output_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+        return confirmation_id, relative, hashlib.sha256(body).hexdigest(), len(body), None
+    except Exception as e:
+        return confirmation_id, None, None, None, str(e)
+
+
+def write_documents(contexts: list, doc_format: str, output_dir: str) -> list:
+    """Render a batch in one worker call (one pickling round trip per batch)"""
+    return [write_document(context, doc_format, output_dir) for context in contexts]
@@ -1,32 +1,126 @@
 """
 Confirmations Module - API Routes
-Handles trade confirmation endpoints.
+Handles confirmation upload, matching and resolution endpoints.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
+from datetime import date
+import logging
+
 from app.core import get_db
+from app.core.exceptions import ConfirmationNotFoundError, TradeNotFoundError, InvalidOrderError
+from app.modules.confirmations.schemas import ConfirmationUploadSchema, ConfirmationSchema, ConfirmationListSchema
+from app.modules.confirmations.service import ConfirmationService
+from app.modules.confirmations.documents import document_pipeline
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/confirmations", tags=["Confirmations"])
 
 
-@router.get("/")
-def list_confirmations(db: Session = Depends(get_db)):
-    """List all confirmations"""
-    # Placeholder - to be implemented
-    return {"confirmations": [], "message": "Confirmations module - to be implemented"}
+@router.get("/", response_model=ConfirmationListSchema)
+def list_confirmations(
+    status: Optional[str] = Query(None, description="Filter by status (UNMATCHED, MATCHED, BREAK, REJECTED)"),
+    trade_date: Optional[date] = Query(None, description="Filter by trade date"),
+    upload_id: Optional[str] = Query(None, description="Filter by upload batch"),
+    limit: int = Query(500, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """List confirmations"""
+    confirmations = ConfirmationService.list_confirmations(db, status, trade_date, upload_id, limit)
+    return {"confirmations": confirmations, "count": len(confirmations)}
+
+
+@router.post("/upload")
+def upload_confirmations(upload: ConfirmationUploadSchema, db: Session = Depends(get_db)):
+    """Bulk upload broker confirmations and match them against trades"""
+    try:
+        return ConfirmationService.upload(
+            db, [c.model_dump() for c in upload.confirmations], upload.tolerance_bps
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Confirmation upload failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/rematch")
+def rematch_confirmations(
+    trade_date: Optional[date] = Query(None, description="Only confirmations for this trade date"),
+    tolerance_bps: Optional[float] = Query(None, ge=0, description="Price tolerance in basis points"),
+    db: Session = Depends(get_db)
+):
+    """Re-run matching for unmatched confirmations and breaks"""
+    try:
+        return ConfirmationService.rematch(db, trade_date, tolerance_bps)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Confirmation rematch failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/documents/generate")
+def generate_documents(
+    format: Optional[str] = Query(None, description="Document format (html, fpml, text)"),
+    limit: Optional[int] = Query(None, ge=1, description="Stop after about this many documents"),
+):
+    """Start generating documents for matched confirmations in the background"""
+    try:
+        return document_pipeline.start(format, limit)
+    except InvalidOrderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/documents/status")
+def get_document_status():
+    """Progress and throughput of the current or last document run"""
+    return {**document_pipeline.stats, "running": document_pipeline.running}
+
+
+@router.post("/documents/stop")
+def stop_documents():
+    """Stop the document run after its current chunk (the next run resumes)"""
+    document_pipeline.stop()
+    return {**document_pipeline.stats, "running": document_pipeline.running}
+
+
+@router.get("/{confirmation_id}/document")
+def get_document(confirmation_id: str, db: Session = Depends(get_db)):
+    """Download the generated document of a confirmation"""
+    document = document_pipeline.get_document(db, confirmation_id)
+    if not document:
+        raise HTTPException(status_code=404, detail=f"No document generated for confirmation {confirmation_id}")
+    return FileResponse(document_pipeline.document_path(document), filename=document.path.rsplit("/", 1)[-1])
 
 
-@router.post("/{trade_id}/confirm")
-def confirm_trade(trade_id: str, db: Session = Depends(get_db)):
-    """Confirm a trade"""
-    # Placeholder - to be implemented
-    return {"message": f"Trade {trade_id} confirmed (placeholder)"}
+@router.post("/{confirmation_id}/confirm", response_model=ConfirmationSchema)
+def confirm_trade(
+    confirmation_id: str,
+    trade_id: Optional[str] = Query(None, description="Trade to match (defaults to the break candidate)"),
+    db: Session = Depends(get_db)
+):
+    """Manually match a confirmation to a trade"""
+    try:
+        return ConfirmationService.confirm(db, confirmation_id, trade_id)
+    except (ConfirmationNotFoundError, TradeNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidOrderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/{trade_id}/reject")
-def reject_confirmation(trade_id: str, reason: str, db: Session = Depends(get_db)):
+@router.post("/{confirmation_id}/reject", response_model=ConfirmationSchema)
+def reject_confirmation(confirmation_id: str, reason: str, db: Session = Depends(get_db)):
     """Reject a confirmation"""
-    # Placeholder - to be implemented
-    return {"message": f"Trade {trade_id} rejected (placeholder)"}
+    try:
+        return ConfirmationService.reject(db, confirmation_id, reason)
+    except ConfirmationNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidOrderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,60 @@
+"""Confirmations Module - Pydantic Schemas
+Defines request and response models for confirmation endpoints.
+"""
+
+from pydantic import BaseModel, Field, model_validator
+from datetime import date, datetime
+from typing import List, Optional
+
+
+class ConfirmationCreateSchema(BaseModel):
+    """Inbound broker confirmation"""
+    confirmation_id: str = Field(..., description="Broker confirmation reference")
+    instrument_id: str
+    side: str = Field(..., pattern="^(BUY|SELL|buy|sell)$")
+    qty: int = Field(..., gt=0)
+    price: float
+    trade_date: date
+    account_id: Optional[str] = None
+    broker_id: Optional[str] = None
+
+    @model_validator(mode="after")
+    def require_party(self):
+        if not self.account_id and not self.broker_id:
+            raise ValueError("account_id or broker_id is required")
+        return self
+
+
+class ConfirmationUploadSchema(BaseModel):
+    """Bulk confirmation upload"""
+    confirmations: List[ConfirmationCreateSchema]
+    tolerance_bps: Optional[float] = Field(None, ge=0, description="Price tolerance in basis points")
+
+
+class ConfirmationSchema(BaseModel):
+    """Confirmation with its matching outcome"""
+    confirmation_id: str
+    upload_id: Optional[str] = None
+    broker_id: Optional[str] = None
+    account_id: Optional[str] = None
+    instrument_id: str
+    side: str
+    qty: int
+    price: float
+    trade_date: date
+    status: str
+    matched_trade_id: Optional[str] = None
+    candidate_trade_id: Optional[str] = None
+    price_diff: Optional[float] = None
+    break_reason: Optional[str] = None
+    received_at: Optional[datetime] = None
+    matched_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ConfirmationListSchema(BaseModel):
+    """Confirmations response"""
+    confirmations: List[ConfirmationSchema]
+    count: int
@@ -0,0 +1,292 @@
+"""
+Confirmations Module - Service Layer
+Bulk confirmation upload, matching against trades and manual resolution.
+"""
+
+from sqlalchemy import select, update, delete, exists, bindparam
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Any
+from datetime import date, datetime, timedelta, time as dt_time
+import time
+import uuid
+import logging
+
+from app.core import settings, copy_rows
+from app.core.exceptions import ConfirmationNotFoundError, TradeNotFoundError, InvalidOrderError
+from app.modules.trade.models import Trade
+from app.modules.confirmations.models import Confirmation
+from app.modules.confirmations.matching import ConfirmationMatcher
+
+logger = logging.getLogger(__name__)
+
+# Confirmations in these states are never re-matched
+FINAL_STATUSES = ("MATCHED", "REJECTED")
+
+# Outcome columns written back by matching
+OUTCOME_COLUMNS = ("status", "matched_trade_id", "candidate_trade_id", "price_diff", "break_reason", "matched_at")
+
+COLUMNS = (
+    "confirmation_id", "upload_id", "broker_id", "account_id", "instrument_id", "side", "qty", "price",
+    "trade_date", "received_at"
+) + OUTCOME_COLUMNS
+
+# Ids per IN (...) lookup
+ID_CHUNK_SIZE = 500
+
+
+class ConfirmationService:
+    """Service class for confirmation matching"""
+
+    @staticmethod
+    def build_matcher(db: Session, date_from: date, date_to: date, tolerance_bps: float) -> ConfirmationMatcher:
+        """
+        Index the live trades executed between date_from and date_to (inclusive)
+        that are not yet matched to a confirmation
+        """
+        # matched_trade_id is only ever set on MATCHED confirmations
+        already_matched = exists().where(Confirmation.matched_trade_id == Trade.trade_id)
+        rows = db.execute(
+            select(Trade.trade_id, Trade.instrument_id, Trade.side, Trade.qty, Trade.price, Trade.exec_time,
+                   Trade.account_id, Trade.broker_id)
+            .where(
+                Trade.status.in_(("ACTIVE", "SETTLED")),
+                Trade.exec_time >= datetime.combine(date_from, dt_time.min),
+                Trade.exec_time < datetime.combine(date_to + timedelta(days=1), dt_time.min),
+                ~already_matched
+            )
+            .execution_options(yield_per=10000)
+        )
+        matcher = ConfirmationMatcher(tolerance_bps)
+        matcher.load(
+            (trade_id, instrument_id, side, qty, price, exec_time.date(), account_id, broker_id)
+            for trade_id, instrument_id, side, qty, price, exec_time, account_id, broker_id in rows
+        )
+        return matcher
+
+    @staticmethod
+    def _match_rows(matcher: ConfirmationMatcher, confirmations: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Match confirmation rows in place, filling in their outcome columns"""
+        counts = {"MATCHED": 0, "BREAK": 0, "UNMATCHED": 0}
+        now = datetime.utcnow()
+        for row in confirmations:
+            status, matched, candidate, diff, reason = matcher.match(
+                row["instrument_id"], row["side"], row["qty"], row["price"], row["trade_date"],
+                row.get("account_id"), row.get("broker_id")
+            )
+            row.update(
+                status=status,
+                matched_trade_id=matched,
+                candidate_trade_id=candidate,
+                price_diff=diff,
+                break_reason=reason,
+                matched_at=now if matched else None
+            )
+            counts[status] += 1
+        return counts
+
+    @staticmethod
+    def _existing(db: Session, confirmation_ids: List[str]) -> Dict[str, str]:
+        """confirmation_id -> status for the ids already stored"""
+        existing: Dict[str, str] = {}
+        for start in range(0, len(confirmation_ids), ID_CHUNK_SIZE):
+            chunk = confirmation_ids[start:start + ID_CHUNK_SIZE]
+            existing.update(db.execute(
+                select(Confirmation.confirmation_id, Confirmation.status)
+                .where(Confirmation.confirmation_id.in_(chunk))
+            ).all())
+        return existing
+
+    @staticmethod
+    def _write_outcomes(db: Session, rows: List[Dict[str, Any]]) -> None:
+        """Update the matching outcome of stored confirmations with one executemany UPDATE"""
+        table = Confirmation.__table__
+        db.execute(
+            update(table)
+            .where(table.c.confirmation_id == bindparam("b_confirmation_id"))
+            .values({column: bindparam(f"b_{column}") for column in OUTCOME_COLUMNS}),
+            [
+                {"b_confirmation_id": row["confirmation_id"], **{f"b_{c}": row[c] for c in OUTCOME_COLUMNS}}
+                for row in rows
+            ]
+        )
+
+    @staticmethod
+    def upload(
+        db: Session,
+        confirmations: List[Dict[str, Any]],
+        tolerance_bps: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Store a batch of broker confirmations and match them against trades
+
+        Confirmations already MATCHED or REJECTED are left untouched; any
+        other confirmation with the same id is replaced and re-matched.
+
+        Args:
+            db: Database session
+            confirmations: Confirmation dicts (confirmation_id, instrument_id, side,
+                qty, price, trade_date, account_id and/or broker_id)
+            tolerance_bps: Price tolerance (defaults to the configured tolerance)
+
+        Returns:
+            Upload statistics
+        """
+        started = time.perf_counter()
+        tolerance_bps = settings.confirmation_price_tolerance_bps if tolerance_bps is None else tolerance_bps
+        upload_id = str(uuid.uuid4())
+        if not confirmations:
+            return {"upload_id": upload_id, "received": 0, "skipped": 0, "matched": 0, "breaks": 0, "unmatched": 0}
+
+        now = datetime.utcnow()
+        # Last occurrence wins when a batch repeats a confirmation id
+        latest = {
+            c["confirmation_id"]: {**c, "side": c["side"].upper(), "upload_id": upload_id, "received_at": now}
+            for c in confirmations
+        }
+        existing = ConfirmationService._existing(db, list(latest))
+        rows = [row for confirmation_id, row in latest.items() if existing.get(confirmation_id) not in FINAL_STATUSES]
+        replaced = [row["confirmation_id"] for row in rows if row["confirmation_id"] in existing]
+
+        date_from = min(row["trade_date"] for row in rows) if rows else None
+        date_to = max(row["trade_date"] for row in rows) if rows else None
+        matcher = (
+            ConfirmationService.build_matcher(db, date_from, date_to, tolerance_bps)
+            if rows else ConfirmationMatcher(tolerance_bps)
+        )
+        loaded = time.perf_counter()
+        counts = ConfirmationService._match_rows(matcher, rows)
+        matched = time.perf_counter()
+
+        for start in range(0, len(replaced), ID_CHUNK_SIZE):
+            db.execute(delete(Confirmation).where(
+                Confirmation.confirmation_id.in_(replaced[start:start + ID_CHUNK_SIZE])
+            ))
+        copy_rows(db, Confirmation.__table__, COLUMNS, ([row[c] for c in COLUMNS] for row in rows))
+        db.commit()
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Confirmation upload {upload_id}: {len(rows)} confirmations vs {len(matcher)} trades, "
+            f"{counts['MATCHED']} matched, {counts['BREAK']} breaks in {elapsed:.2f}s"
+        )
+        return {
+            "upload_id": upload_id,
+            "received": len(confirmations),
+            "skipped": len(latest) - len(rows),
+            "replaced": len(replaced),
+            "matched": counts["MATCHED"],
+            "breaks": counts["BREAK"],
+            "unmatched": counts["UNMATCHED"],
+            "trades_indexed": len(matcher),
+            "index_seconds": round(loaded - started, 3),
+            "match_seconds": round(matched - loaded, 3),
+            "elapsed_seconds": round(elapsed, 3)
+        }
+
+    @staticmethod
+    def rematch(db: Session, trade_date: Optional[date] = None, tolerance_bps: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Re-run matching for UNMATCHED and BREAK confirmations (e.g. after late trade bookings)
+
+        Args:
+            db: Database session
+            trade_date: Only confirmations for this trade date
+            tolerance_bps: Price tolerance (defaults to the configured tolerance)
+        """
+        started = time.perf_counter()
+        tolerance_bps = settings.confirmation_price_tolerance_bps if tolerance_bps is None else tolerance_bps
+        query = select(Confirmation.confirmation_id, Confirmation.instrument_id, Confirmation.side,
+                       Confirmation.qty, Confirmation.price, Confirmation.trade_date, Confirmation.account_id,
+                       Confirmation.broker_id).where(Confirmation.status.in_(("UNMATCHED", "BREAK")))
+        if trade_date:
+            query = query.where(Confirmation.trade_date == trade_date)
+        rows = [dict(row) for row in db.execute(query).mappings()]
+        if not rows:
+            return {"rematched": 0, "matched": 0, "breaks": 0, "unmatched": 0}
+
+        matcher = ConfirmationService.build_matcher(
+            db, min(r["trade_date"] for r in rows), max(r["trade_date"] for r in rows), tolerance_bps
+        )
+        counts = ConfirmationService._match_rows(matcher, rows)
+        ConfirmationService._write_outcomes(db, rows)
+        db.commit()
+        return {
+            "rematched": len(rows),
+            "matched": counts["MATCHED"],
+            "breaks": counts["BREAK"],
+            "unmatched": counts["UNMATCHED"],
+            "elapsed_seconds": round(time.perf_counter() - started, 3)
+        }
+
+    @staticmethod
+    def list_confirmations(
+        db: Session,
+        status: Optional[str] = None,
+        trade_date: Optional[date] = None,
+        upload_id: Optional[str] = None,
+        limit: int = 500
+    ) -> List[Confirmation]:
+        """Confirmations with optional filters"""
+        query = db.query(Confirmation)
+        if status:
+            query = query.filter(Confirmation.status == status)
+        if trade_date:
+            query = query.filter(Confirmation.trade_date == trade_date)
+        if upload_id:
+            query = query.filter(Confirmation.upload_id == upload_id)
+        return query.order_by(Confirmation.trade_date, Confirmation.confirmation_id).limit(limit).all()
+
+    @staticmethod
+    def _get(db: Session, confirmation_id: str) -> Confirmation:
+        confirmation = db.query(Confirmation).filter(Confirmation.confirmation_id == confirmation_id).first()
+        if not confirmation:
+            raise ConfirmationNotFoundError(f"Confirmation {confirmation_id} not found")
+        if confirmation.status in FINAL_STATUSES:
+            raise InvalidOrderError(f"Confirmation is already {confirmation.status}")
+        return confirmation
+
+    @staticmethod
+    def confirm(db: Session, confirmation_id: str, trade_id: Optional[str] = None) -> Confirmation:
+        """
+        Manually match a confirmation to a trade (the break candidate by default)
+
+        Raises:
+            ConfirmationNotFoundError: If the confirmation does not exist
+            TradeNotFoundError: If the trade does not exist
+            InvalidOrderError: If the confirmation is closed, has no candidate,
+                or the trade is already matched
+        """
+        confirmation = ConfirmationService._get(db, confirmation_id)
+        trade_id = trade_id or confirmation.candidate_trade_id
+        if not trade_id:
+            raise InvalidOrderError("No trade given and the confirmation has no candidate trade")
+        trade = db.query(Trade).filter(Trade.trade_id == trade_id).first()
+        if not trade:
+            raise TradeNotFoundError(f"Trade {trade_id} not found")
+        taken = db.query(Confirmation.confirmation_id).filter(Confirmation.matched_trade_id == trade_id).first()
+        if taken:
+            raise InvalidOrderError(f"Trade {trade_id} is already matched to confirmation {taken[0]}")
+
+        confirmation.status = "MATCHED"
+        confirmation.matched_trade_id = trade_id
+        confirmation.price_diff = confirmation.price - (trade.price or 0.0)
+        confirmation.matched_at = datetime.utcnow()
+        db.commit()
+        db.refresh(confirmation)
+        return confirmation
+
+    @staticmethod
+    def reject(db: Session, confirmation_id: str, reason: str) -> Confirmation:
+        """
+        Close a confirmation as REJECTED
+
+        Raises:
+            ConfirmationNotFoundError: If the confirmation does not exist
+            InvalidOrderError: If the confirmation is already closed
+        """
+        confirmation = ConfirmationService._get(db, confirmation_id)
+        confirmation.status = "REJECTED"
+        confirmation.break_reason = reason
+        db.commit()
+        db.refresh(confirmation)
+        return confirmation
@@ -37,6 +37,7 @@ class EnrichmentService:
         db.refresh(db_mapping)
         
         logger.info(f"Created portfolio mapping {mapping_id}")
+        publish_event(EventType.PORTFOLIO_MAPPING_UPDATED, {"mapping_id": mapping_id}, "enrichment")
         return db_mapping
     
     @staticmethod
@@ -83,6 +84,7 @@ class EnrichmentService:
         db.refresh(db_mapping)
         
         logger.info(f"Updated portfolio mapping {mapping_id}")
+        publish_event(EventType.PORTFOLIO_MAPPING_UPDATED, {"mapping_id": mapping_id}, "enrichment")
         return db_mapping
     
     @staticmethod
@@ -96,6 +98,7 @@ class EnrichmentService:
         db.commit()
         
         logger.info(f"Deleted portfolio mapping {mapping_id}")
+        publish_event(EventType.PORTFOLIO_MAPPING_UPDATED, {"mapping_id": mapping_id}, "enrichment")
         return {"message": "Portfolio mapping deleted"}
     
     @staticmethod
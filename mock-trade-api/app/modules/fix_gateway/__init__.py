@@ -0,0 +1,10 @@
+"""
+FIX Gateway Module
+FIX 4.4 acceptor mapping NewOrderSingle/OrderCancelRequest onto the order pipeline.
+"""
+
+from app.modules.fix_gateway.service import FixAcceptor, FixGatewayService, FixSession, fix_acceptor
+from app.modules.fix_gateway.initiator import FixInitiator
+from app.modules.fix_gateway.routes import router
+
+__all__ = ['FixAcceptor', 'FixGatewayService', 'FixSession', 'fix_acceptor', 'FixInitiator', 'router']
@@ -0,0 +1,216 @@
+"""
+FIX Gateway Module - Tag/Value Codec
+Encodes and incrementally decodes FIX 4.4 messages (SOH delimited tag=value).
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+BEGIN_STRING = "FIX.4.4"
+SOH = b"\x01"
+
+# Session level message types
+HEARTBEAT = "0"
+TEST_REQUEST = "1"
+RESEND_REQUEST = "2"
+REJECT = "3"
+SEQUENCE_RESET = "4"
+LOGOUT = "5"
+LOGON = "A"
+
+# Application message types
+NEW_ORDER_SINGLE = "D"
+ORDER_CANCEL_REQUEST = "F"
+EXECUTION_REPORT = "8"
+ORDER_CANCEL_REJECT = "9"
+
+ADMIN_MSG_TYPES = {HEARTBEAT, TEST_REQUEST, RESEND_REQUEST, REJECT, SEQUENCE_RESET, LOGOUT, LOGON}
+
+# Frequently used tags
+TAG_BEGIN_STRING = 8
+TAG_BODY_LENGTH = 9
+TAG_CHECKSUM = 10
+TAG_MSG_SEQ_NUM = 34
+TAG_MSG_TYPE = 35
+TAG_SENDER_COMP_ID = 49
+TAG_SENDER_SUB_ID = 50
+TAG_SENDING_TIME = 52
+TAG_TARGET_COMP_ID = 56
+TAG_POSS_DUP_FLAG = 43
+TAG_ORIG_SENDING_TIME = 122
+TAG_TEXT = 58
+TAG_REF_SEQ_NUM = 45
+TAG_REF_TAG_ID = 371
+TAG_REF_MSG_TYPE = 372
+TAG_SESSION_REJECT_REASON = 373
+
+# SessionRejectReason values
+REJECT_REQUIRED_TAG_MISSING = "1"
+REJECT_INCORRECT_DATA_FORMAT = "6"
+REJECT_INVALID_MSG_TYPE = "11"
+
+# Header fields written by the encoder, in order
+HEADER_TAGS = (TAG_MSG_TYPE, TAG_SENDER_COMP_ID, TAG_TARGET_COMP_ID, TAG_MSG_SEQ_NUM, TAG_SENDING_TIME)
+
+Fields = List[Tuple[int, str]]
+
+
+class FixParseError(ValueError):
+    """Raised when a frame is not valid FIX"""
+
+
+class FixFieldError(FixParseError):
+    """Raised when a well-framed message has a missing or malformed field; answered with a session Reject"""
+
+    def __init__(self, tag: int, reason: str, text: str):
+        super().__init__(text)
+        self.tag = tag
+        self.reason = reason
+
+
+class FixMessage:
+    """A decoded message; repeated tags keep their last value"""
+    __slots__ = ("fields", "raw")
+
+    def __init__(self, fields: Dict[int, str], raw: bytes = b""):
+        self.fields = fields
+        self.raw = raw
+
+    @property
+    def msg_type(self) -> str:
+        return self.fields.get(TAG_MSG_TYPE, "")
+
+    @property
+    def seq_num(self) -> int:
+        return self.get_int(TAG_MSG_SEQ_NUM, 0)
+
+    def get(self, tag: int, default: Optional[str] = None) -> Optional[str]:
+        return self.fields.get(tag, default)
+
+    def get_int(self, tag: int, default: Optional[int] = None) -> int:
+        """
+        Integer field value, or default when the tag is absent
+
+        Raises:
+            FixFieldError: If the value is not an integer, or the tag is absent without a default
+        """
+        value = self.fields.get(tag)
+        if value is None:
+            if default is None:
+                raise FixFieldError(tag, REJECT_REQUIRED_TAG_MISSING, f"Required tag {tag} missing")
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise FixFieldError(tag, REJECT_INCORRECT_DATA_FORMAT, f"Incorrect data format for tag {tag}: {value!r}")
+
+    def __repr__(self) -> str:
+        return "FixMessage(" + "|".join(f"{k}={v}" for k, v in self.fields.items()) + ")"
+
+
+def utc_timestamp() -> str:
+    """SendingTime in UTCTimestamp format with milliseconds"""
+    return datetime.utcnow().strftime("%Y%m%d-%H:%M:%S.%f")[:-3]
+
+
+def checksum(data: bytes) -> str:
+    return f"{sum(data) % 256:03d}"
+
+
+def encode(msg_type: str, sender: str, target: str, seq_num: int, body: Fields,
+           sending_time: Optional[str] = None, header_extra: Fields = ()) -> bytes:
+    """Build a complete message with BodyLength and CheckSum"""
+    parts = [
+        f"{TAG_MSG_TYPE}={msg_type}",
+        f"{TAG_SENDER_COMP_ID}={sender}",
+        f"{TAG_TARGET_COMP_ID}={target}",
+        f"{TAG_MSG_SEQ_NUM}={seq_num}",
+        f"{TAG_SENDING_TIME}={sending_time or utc_timestamp()}",
+    ]
+    parts.extend(f"{tag}={value}" for tag, value in header_extra)
+    parts.extend(f"{tag}={value}" for tag, value in body if value is not None)
+    payload = ("\x01".join(parts) + "\x01").encode("ascii")
+    head = f"{TAG_BEGIN_STRING}={BEGIN_STRING}\x01{TAG_BODY_LENGTH}={len(payload)}\x01".encode("ascii")
+    message = head + payload
+    return message + f"{TAG_CHECKSUM}={checksum(message)}\x01".encode("ascii")
+
+
+def session_reject(msg: FixMessage, reason: str, text: str, ref_tag: Optional[int] = None) -> Fields:
+    """Body of a session level Reject (35=3) of msg"""
+    return [
+        (TAG_REF_SEQ_NUM, msg.get(TAG_MSG_SEQ_NUM)),
+        (TAG_REF_TAG_ID, str(ref_tag) if ref_tag is not None else None),
+        (TAG_REF_MSG_TYPE, msg.msg_type or None),
+        (TAG_SESSION_REJECT_REASON, reason),
+        (TAG_TEXT, text),
+    ]
+
+
+def parse(raw: bytes) -> FixMessage:
+    """Decode one complete message (checksum is verified by the stream decoder)"""
+    fields: Dict[int, str] = {}
+    for part in raw.split(SOH):
+        if not part:
+            continue
+        tag, sep, value = part.partition(b"=")
+        if not sep:
+            raise FixParseError(f"Malformed field {part!r}")
+        try:
+            fields[int(tag)] = value.decode("ascii")
+        except (ValueError, UnicodeDecodeError):
+            raise FixParseError(f"Malformed field {part!r}")
+    return FixMessage(fields, raw)
+
+
+class FixStreamDecoder:
+    """
+    Incremental decoder for a TCP byte stream.
+
+    Frames are located with BodyLength rather than by scanning for the
+    CheckSum field, so a read containing many messages is split in one pass.
+    """
+
+    _PREFIX = f"{TAG_BEGIN_STRING}={BEGIN_STRING}\x01{TAG_BODY_LENGTH}=".encode("ascii")
+    _TRAILER_LEN = 7  # "10=NNN" + SOH
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.garbled = 0
+
+    def feed(self, data: bytes) -> List[FixMessage]:
+        """Append received bytes and return every complete message"""
+        self._buffer.extend(data)
+        messages = []
+        buf = self._buffer
+        pos = 0
+        while True:
+            start = buf.find(self._PREFIX, pos)
+            if start < 0:
+                # Keep a possible partial prefix only
+                pos = max(pos, len(buf) - len(self._PREFIX))
+                break
+            length_start = start + len(self._PREFIX)
+            length_end = buf.find(SOH, length_start)
+            if length_end < 0:
+                pos = start
+                break
+            try:
+                body_length = int(buf[length_start:length_end])
+            except ValueError:
+                raise FixParseError("Invalid BodyLength")
+            body_end = length_end + 1 + body_length
+            frame_end = body_end + self._TRAILER_LEN
+            if len(buf) < frame_end:
+                pos = start
+                break
+            trailer = bytes(buf[body_end:frame_end])
+            if not trailer.startswith(b"10=") or trailer[-1:] != SOH:
+                raise FixParseError("Missing CheckSum")
+            pos = frame_end
+            if trailer[3:6].decode("ascii") != checksum(bytes(buf[start:body_end])):
+                # Garbled messages are dropped; the sequence gap triggers a resend
+                self.garbled += 1
+                continue
+            messages.append(parse(bytes(buf[start:frame_end])))
+        del buf[:pos]
+        return messages
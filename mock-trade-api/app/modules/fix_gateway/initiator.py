@@ -0,0 +1,189 @@
+"""
+FIX Gateway Module - Local Initiator
+Minimal FIX 4.4 initiator for exercising the acceptor and measuring throughput.
+
+Usage:
+    python -m app.modules.fix_gateway.initiator --instrument <instrument_id> --trader <trader_id> --orders 5000
+"""
+
+from typing import Dict, List, Optional, Any
+import argparse
+import asyncio
+import time
+
+from app.modules.fix_gateway import codec
+from app.modules.fix_gateway.codec import FixMessage, Fields
+
+
+class FixInitiator:
+    """
+    Client side FIX session: logon, heartbeat replies, gap fills for resend
+    requests, and an ExecutionReport queue for callers to consume.
+    """
+
+    def __init__(self, host: str, port: int, sender_comp_id: str, target_comp_id: str,
+                 trader: Optional[str] = None, heartbeat_interval: int = 30):
+        self.host = host
+        self.port = port
+        self.sender_comp_id = sender_comp_id
+        self.target_comp_id = target_comp_id
+        self.trader = trader
+        self.heartbeat_interval = heartbeat_interval
+        self.next_out_seq = 1
+        self.next_in_seq = 1
+        self.sent: Dict[int, bytes] = {}
+        self.executions: "asyncio.Queue[FixMessage]" = asyncio.Queue()
+        self.logged_on = asyncio.Event()
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._decoder = codec.FixStreamDecoder()
+        self._read_task: Optional[asyncio.Task] = None
+
+    async def connect(self, reset: bool = True) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._read_task = asyncio.create_task(self._read_loop())
+        self.send(codec.LOGON, [(98, "0"), (108, str(self.heartbeat_interval)), (141, "Y" if reset else None)],
+                  header_extra=[(codec.TAG_SENDER_SUB_ID, self.trader)] if self.trader else ())
+        await self.flush()
+        await asyncio.wait_for(self.logged_on.wait(), timeout=10)
+
+    async def close(self) -> None:
+        if self._writer is None:
+            return
+        self.send(codec.LOGOUT, [])
+        await self.flush()
+        self._writer.close()
+        if self._read_task:
+            self._read_task.cancel()
+        self._writer = None
+
+    def send(self, msg_type: str, body: Fields, header_extra: Fields = ()) -> int:
+        seq_num = self.next_out_seq
+        self.next_out_seq += 1
+        data = codec.encode(msg_type, self.sender_comp_id, self.target_comp_id, seq_num, body,
+                            header_extra=header_extra)
+        self.sent[seq_num] = data
+        self._writer.write(data)
+        return seq_num
+
+    async def flush(self) -> None:
+        await self._writer.drain()
+
+    def new_order_single(self, cl_ord_id: str, instrument_id: str, side: str, qty: int,
+                         price: Optional[float] = None, account: Optional[str] = None,
+                         tif: str = "0") -> int:
+        return self.send(codec.NEW_ORDER_SINGLE, [
+            (11, cl_ord_id),
+            (1, account),
+            (48, instrument_id),
+            (54, "1" if side.upper() == "BUY" else "2"),
+            (38, str(qty)),
+            (40, "2" if price is not None else "1"),
+            (44, f"{price:g}" if price is not None else None),
+            (59, tif),
+            (60, codec.utc_timestamp())
+        ])
+
+    def order_cancel_request(self, cl_ord_id: str, orig_cl_ord_id: str, side: str = "BUY") -> int:
+        return self.send(codec.ORDER_CANCEL_REQUEST, [
+            (11, cl_ord_id),
+            (41, orig_cl_ord_id),
+            (54, "1" if side.upper() == "BUY" else "2"),
+            (60, codec.utc_timestamp())
+        ])
+
+    async def _read_loop(self) -> None:
+        while True:
+            data = await self._reader.read(65536)
+            if not data:
+                return
+            for msg in self._decoder.feed(data):
+                self._on_message(msg)
+
+    def _on_message(self, msg: FixMessage) -> None:
+        try:
+            self._dispatch(msg)
+        except codec.FixFieldError as e:
+            self.send(codec.REJECT, codec.session_reject(msg, e.reason, str(e), e.tag))
+
+    def _dispatch(self, msg: FixMessage) -> None:
+        if msg.msg_type == codec.SEQUENCE_RESET:
+            self.next_in_seq = msg.get_int(36)
+            return
+        self.next_in_seq = msg.seq_num + 1
+        if msg.msg_type == codec.LOGON:
+            self.logged_on.set()
+        elif msg.msg_type == codec.TEST_REQUEST:
+            self.send(codec.HEARTBEAT, [(112, msg.get(112))])
+        elif msg.msg_type == codec.RESEND_REQUEST:
+            begin, end = msg.get_int(7), msg.get_int(16) or self.next_out_seq - 1
+            for seq_num in range(begin, end + 1):
+                self._writer.write(self._replay(seq_num))
+        elif msg.msg_type in (codec.EXECUTION_REPORT, codec.ORDER_CANCEL_REJECT):
+            self.executions.put_nowait(msg)
+
+    def _replay(self, seq_num: int) -> bytes:
+        """Application messages are resent as PossDup; admin messages are gap filled"""
+        original = codec.parse(self.sent[seq_num]) if seq_num in self.sent else None
+        if original is None or original.msg_type in codec.ADMIN_MSG_TYPES:
+            return codec.encode(codec.SEQUENCE_RESET, self.sender_comp_id, self.target_comp_id, seq_num,
+                                [(123, "Y"), (36, str(seq_num + 1))],
+                                header_extra=[(codec.TAG_POSS_DUP_FLAG, "Y")])
+        skip = (codec.TAG_BEGIN_STRING, codec.TAG_BODY_LENGTH, codec.TAG_CHECKSUM) + codec.HEADER_TAGS
+        body = [(tag, value) for tag, value in original.fields.items() if tag not in skip]
+        return codec.encode(original.msg_type, self.sender_comp_id, self.target_comp_id, seq_num, body,
+                            header_extra=[(codec.TAG_POSS_DUP_FLAG, "Y"),
+                                          (codec.TAG_ORIG_SENDING_TIME, original.get(codec.TAG_SENDING_TIME))])
+
+    async def next_execution(self, timeout: float = 10) -> FixMessage:
+        return await asyncio.wait_for(self.executions.get(), timeout=timeout)
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Send a burst of NewOrderSingle messages and wait for every acknowledgement"""
+    initiator = FixInitiator(args.host, args.port, args.sender, args.target, trader=args.trader)
+    await initiator.connect()
+
+    started = time.perf_counter()
+    for i in range(args.orders):
+        initiator.new_order_single(f"BENCH-{int(started)}-{i}", args.instrument, "BUY" if i % 2 else "SELL",
+                                   qty=1, price=args.price + (i % 10) * 0.01, account=args.account)
+        if i % 500 == 0:
+            await initiator.flush()
+    await initiator.flush()
+
+    statuses: Dict[str, int] = {}
+    for _ in range(args.orders):
+        report = await initiator.next_execution(timeout=30)
+        statuses[report.get(39, "?")] = statuses.get(report.get(39, "?"), 0) + 1
+    elapsed = time.perf_counter() - started
+    await initiator.close()
+
+    return {
+        "orders": args.orders,
+        "elapsed_seconds": round(elapsed, 3),
+        "orders_per_second": round(args.orders / elapsed, 1),
+        "ord_status_counts": statuses
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local FIX 4.4 initiator for the MockTrade acceptor")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9878)
+    parser.add_argument("--sender", default="LOCALCLIENT", help="Initiator SenderCompID")
+    parser.add_argument("--target", default="MOCKTRADE", help="Acceptor CompID")
+    parser.add_argument("--trader", required=True, help="trader_id sent as SenderSubID")
+    parser.add_argument("--instrument", required=True, help="instrument_id sent as SecurityID")
+    parser.add_argument("--account", default=None)
+    parser.add_argument("--price", type=float, default=100.0)
+    parser.add_argument("--orders", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run_benchmark(args))
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""FIX Gateway Module - API Routes
+Status of the FIX acceptor and its counterparty sessions.
+"""
+
+from fastapi import APIRouter
+import logging
+
+from app.modules.fix_gateway.service import FixGatewayService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/fix", tags=["FIX Gateway"])
+
+
+@router.get("/sessions")
+def get_fix_sessions():
+    """Acceptor address and per-counterparty sequence numbers and message counts"""
+    return FixGatewayService.get_status()
@@ -0,0 +1,594 @@
+"""
+FIX Gateway Module - Service Layer
+asyncio FIX 4.4 acceptor: session layer (logon, heartbeats, sequence numbers,
+resend) and order flow mapped onto the order intake pipeline.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Any
+import asyncio
+import itertools
+import time
+import logging
+
+from app.core import settings, event_bus, Event, EventType, InvalidOrderError, OrderQueueFullError
+from app.modules.order_intake import order_intake, validate_order
+from app.modules.order_gateway.service import OrderGatewayService
+from app.modules.static_data.cache import static_data_cache
+from app.modules.fix_gateway import codec
+from app.modules.fix_gateway.codec import FixMessage, Fields
+
+logger = logging.getLogger(__name__)
+
+# FIX enumerations <-> OrderHdr values
+FIX_SIDES = {"1": "BUY", "2": "SELL"}
+FIX_ORD_TYPES = {"1": "MARKET", "2": "LIMIT", "3": "STOP"}
+FIX_TIFS = {"0": "DAY", "1": "GTC", "3": "IOC", "4": "FOK"}
+SIDE_CODES = {v: k for k, v in FIX_SIDES.items()}
+
+# Sent application messages kept per session for ResendRequest
+RESEND_STORE_SIZE = 100000
+
+
+class FixSessionState:
+    """Sequence numbers and resend store for one counterparty, kept across reconnects"""
+
+    def __init__(self, counterparty: str):
+        self.counterparty = counterparty
+        self.next_out_seq = 1
+        self.next_in_seq = 1
+        # seq -> (msg_type, body, sending_time) for application messages
+        self.store: Dict[int, Tuple[str, Fields, str]] = {}
+        self._store_order: deque = deque()
+
+    def remember(self, seq_num: int, msg_type: str, body: Fields, sending_time: str) -> None:
+        self.store[seq_num] = (msg_type, body, sending_time)
+        self._store_order.append(seq_num)
+        if len(self._store_order) > RESEND_STORE_SIZE:
+            self.store.pop(self._store_order.popleft(), None)
+
+    def reset(self) -> None:
+        self.next_out_seq = 1
+        self.next_in_seq = 1
+        self.store.clear()
+        self._store_order.clear()
+
+
+class FixSession:
+    """
+    One TCP connection from a FIX initiator.
+
+    Outbound messages are written without awaiting the socket; the reader
+    drains once per received chunk, so a burst of orders costs one flush.
+    Order persistence is pipelined through the intake group commit and the
+    ExecutionReport is written when the batch holding the order commits.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, acceptor: "FixAcceptor"):
+        self.reader = reader
+        self.writer = writer
+        self.acceptor = acceptor
+        self.loop = asyncio.get_running_loop()
+        self.decoder = codec.FixStreamDecoder()
+        self.state: Optional[FixSessionState] = None
+        self.trader: Optional[str] = None
+        self.heartbeat_interval = settings.fix_heartbeat_interval
+        self.awaiting_resend_until: Optional[int] = None
+        self.test_request_pending = False
+        self.last_received = time.monotonic()
+        self.last_sent = time.monotonic()
+        self.closed = False
+        self.messages_in = 0
+        self.messages_out = 0
+        # ClOrdID -> order state; order_id -> ClOrdID
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.cl_ord_ids: Dict[str, str] = {}
+        self._exec_ids = itertools.count(1)
+
+    @property
+    def logged_on(self) -> bool:
+        return self.state is not None
+
+    # ============= TRANSPORT =============
+
+    async def run(self) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        try:
+            while not self.closed:
+                data = await self.reader.read(65536)
+                if not data:
+                    break
+                self.last_received = time.monotonic()
+                try:
+                    messages = self.decoder.feed(data)
+                except codec.FixParseError as e:
+                    logger.warning(f"FIX framing error from {self.peer}: {e}")
+                    break
+                for message in messages:
+                    self.messages_in += 1
+                    self.on_message(message)
+                    if self.closed:
+                        break
+                await self.writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            heartbeat.cancel()
+            self.close()
+
+    @property
+    def peer(self) -> str:
+        return self.state.counterparty if self.state else str(self.writer.get_extra_info("peername"))
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.acceptor.unregister(self)
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+    def send(self, msg_type: str, body: Fields, header_extra: Fields = ()) -> None:
+        """Assign the next outbound sequence number and write the message"""
+        if self.closed or self.state is None:
+            return
+        seq_num = self.state.next_out_seq
+        self.state.next_out_seq += 1
+        sending_time = codec.utc_timestamp()
+        if msg_type not in codec.ADMIN_MSG_TYPES:
+            self.state.remember(seq_num, msg_type, body, sending_time)
+        self._write(codec.encode(msg_type, settings.fix_sender_comp_id, self.state.counterparty,
+                                 seq_num, body, sending_time, header_extra))
+
+    def _write(self, data: bytes) -> None:
+        self.writer.write(data)
+        self.messages_out += 1
+        self.last_sent = time.monotonic()
+
+    async def _heartbeat_loop(self) -> None:
+        while not self.closed:
+            await asyncio.sleep(1)
+            if not self.logged_on:
+                continue
+            now = time.monotonic()
+            idle_in = now - self.last_received
+            if idle_in >= self.heartbeat_interval * 2:
+                logger.warning(f"FIX session {self.peer} timed out")
+                self.logout("Heartbeat timeout")
+                return
+            if idle_in >= self.heartbeat_interval * 1.2 and not self.test_request_pending:
+                self.test_request_pending = True
+                self.send(codec.TEST_REQUEST, [(112, f"TEST-{int(now)}")])
+            elif now - self.last_sent >= self.heartbeat_interval:
+                self.send(codec.HEARTBEAT, [])
+
+    def logout(self, text: str = "") -> None:
+        self.send(codec.LOGOUT, [(codec.TAG_TEXT, text or None)])
+        self.close()
+
+    # ============= SESSION LAYER =============
+
+    def on_message(self, msg: FixMessage) -> None:
+        try:
+            self._dispatch(msg)
+        except codec.FixFieldError as e:
+            if e.tag == codec.TAG_MSG_SEQ_NUM:
+                # A message that cannot be sequenced cannot be referenced by a Reject either
+                logger.warning(f"FIX message from {self.peer} has an invalid MsgSeqNum: {e}")
+                self.logout(str(e))
+                return
+            logger.warning(f"FIX session reject to {self.peer}: {e}")
+            self.send(codec.REJECT, codec.session_reject(msg, e.reason, str(e), e.tag))
+
+    def _dispatch(self, msg: FixMessage) -> None:
+        if not self.logged_on:
+            if msg.msg_type != codec.LOGON:
+                logger.warning(f"FIX message {msg.msg_type} before logon from {self.peer}; disconnecting")
+                self.close()
+                return
+            self.on_logon(msg)
+            return
+
+        if msg.msg_type == codec.SEQUENCE_RESET and msg.get(123) != "Y":
+            # Reset mode ignores MsgSeqNum
+            self.state.next_in_seq = msg.get_int(36)
+            return
+        if not self._check_sequence(msg):
+            return
+
+        handler = self._handlers.get(msg.msg_type)
+        if handler is None:
+            self.send(codec.REJECT, codec.session_reject(
+                msg, codec.REJECT_INVALID_MSG_TYPE, f"Unsupported MsgType {msg.msg_type}"
+            ))
+            return
+        handler(self, msg)
+
+    def _check_sequence(self, msg: FixMessage) -> bool:
+        """Validate MsgSeqNum; returns True if the message should be processed"""
+        expected = self.state.next_in_seq
+        seq_num = msg.seq_num
+        if seq_num == expected:
+            self.state.next_in_seq += 1
+            if self.awaiting_resend_until is not None and seq_num >= self.awaiting_resend_until:
+                self.awaiting_resend_until = None
+            return True
+        if seq_num < expected:
+            if msg.get(codec.TAG_POSS_DUP_FLAG) == "Y":
+                return False
+            self.logout(f"MsgSeqNum too low, expecting {expected} but received {seq_num}")
+            return False
+        # Gap: ask for everything from the first missing message and drop until it is filled
+        if self.awaiting_resend_until is None:
+            self.awaiting_resend_until = seq_num
+            self.send(codec.RESEND_REQUEST, [(7, str(expected)), (16, "0")])
+        return False
+
+    def on_logon(self, msg: FixMessage) -> None:
+        counterparty = msg.get(codec.TAG_SENDER_COMP_ID, "")
+        if msg.get(codec.TAG_TARGET_COMP_ID) != settings.fix_sender_comp_id or not counterparty:
+            logger.warning(f"FIX logon rejected: unknown TargetCompID {msg.get(codec.TAG_TARGET_COMP_ID)}")
+            self.close()
+            return
+        try:
+            heartbeat_interval = msg.get_int(108, settings.fix_heartbeat_interval) or settings.fix_heartbeat_interval
+            seq_num = msg.seq_num
+        except codec.FixFieldError as e:
+            logger.warning(f"FIX logon rejected: {e}")
+            self.close()
+            return
+        if not self.acceptor.register(counterparty, self):
+            logger.warning(f"FIX logon rejected: {counterparty} is already logged on")
+            self.close()
+            return
+
+        self.state = self.acceptor.session_state(counterparty)
+        if msg.get(141) == "Y":
+            self.state.reset()
+        self.heartbeat_interval = heartbeat_interval
+        self.trader = msg.get(codec.TAG_SENDER_SUB_ID)
+
+        self.send(codec.LOGON, [(98, "0"), (108, str(self.heartbeat_interval)),
+                                (141, "Y" if msg.get(141) == "Y" else None)])
+        logger.info(f"FIX session logged on: {counterparty} (heartbeat {self.heartbeat_interval}s)")
+
+        if seq_num < self.state.next_in_seq:
+            self.logout(f"MsgSeqNum too low, expecting {self.state.next_in_seq} but received {seq_num}")
+        elif seq_num > self.state.next_in_seq:
+            self.awaiting_resend_until = seq_num
+            self.send(codec.RESEND_REQUEST, [(7, str(self.state.next_in_seq)), (16, "0")])
+        else:
+            self.state.next_in_seq += 1
+
+    def on_heartbeat(self, msg: FixMessage) -> None:
+        self.test_request_pending = False
+
+    def on_test_request(self, msg: FixMessage) -> None:
+        self.send(codec.HEARTBEAT, [(112, msg.get(112))])
+
+    def on_resend_request(self, msg: FixMessage) -> None:
+        """Replay stored application messages; gaps (admin or evicted) become SequenceReset-GapFill"""
+        begin = msg.get_int(7, 1)
+        end = msg.get_int(16, 0)
+        last = self.state.next_out_seq - 1
+        end = last if end == 0 or end > last else end
+
+        gap_start = None
+        for seq_num in range(begin, end + 1):
+            stored = self.state.store.get(seq_num)
+            if stored is None:
+                if gap_start is None:
+                    gap_start = seq_num
+                continue
+            if gap_start is not None:
+                self._send_gap_fill(gap_start, seq_num)
+                gap_start = None
+            msg_type, body, sending_time = stored
+            self._write(codec.encode(
+                msg_type, settings.fix_sender_comp_id, self.state.counterparty, seq_num, body,
+                header_extra=[(codec.TAG_POSS_DUP_FLAG, "Y"), (codec.TAG_ORIG_SENDING_TIME, sending_time)]
+            ))
+        if gap_start is not None:
+            self._send_gap_fill(gap_start, end + 1)
+
+    def _send_gap_fill(self, seq_num: int, new_seq_num: int) -> None:
+        self._write(codec.encode(
+            codec.SEQUENCE_RESET, settings.fix_sender_comp_id, self.state.counterparty, seq_num,
+            [(123, "Y"), (36, str(new_seq_num))], header_extra=[(codec.TAG_POSS_DUP_FLAG, "Y")]
+        ))
+
+    def on_sequence_reset(self, msg: FixMessage) -> None:
+        # Gap fill mode (reset mode is handled before the sequence check)
+        new_seq_num = msg.get_int(36)
+        if new_seq_num > self.state.next_in_seq:
+            self.state.next_in_seq = new_seq_num
+            if self.awaiting_resend_until is not None and new_seq_num > self.awaiting_resend_until:
+                self.awaiting_resend_until = None
+
+    def on_logout(self, msg: FixMessage) -> None:
+        logger.info(f"FIX session {self.peer} logged out")
+        self.logout()
+
+    def on_reject(self, msg: FixMessage) -> None:
+        logger.warning(f"FIX session reject from {self.peer}: {msg.get(codec.TAG_TEXT)}")
+
+    # ============= APPLICATION LAYER =============
+
+    def on_new_order_single(self, msg: FixMessage) -> None:
+        cl_ord_id = msg.get(11)
+        if cl_ord_id in self.orders and msg.get(codec.TAG_POSS_DUP_FLAG) == "Y":
+            return  # Retransmission of an order we already hold
+        if not cl_ord_id or cl_ord_id in self.orders:
+            self._reject_order(msg, "Missing or duplicate ClOrdID")
+            return
+
+        instrument_id = msg.get(48) or static_data_cache.get_instrument_id_by_symbol(msg.get(55)) or msg.get(55)
+        try:
+            row = validate_order({
+                "instrument": instrument_id,
+                "side": FIX_SIDES.get(msg.get(54), msg.get(54)),
+                "qty": msg.get(38),
+                "price": msg.get(44),
+                "type": FIX_ORD_TYPES.get(msg.get(40, "2"), msg.get(40)),
+                "tif": FIX_TIFS.get(msg.get(59, "0"), msg.get(59)),
+                "trader": msg.get(codec.TAG_SENDER_SUB_ID) or self.trader,
+                "account": msg.get(1)
+            })
+            persisted = order_intake.submit_row(row)
+        except (InvalidOrderError, OrderQueueFullError) as e:
+            self._reject_order(msg, str(e))
+            return
+
+        order = {
+            "cl_ord_id": cl_ord_id,
+            "order_id": row["order_id"],
+            "instrument_id": row["instrument_id"],
+            "symbol": msg.get(55) or static_data_cache.instrument_symbol(row["instrument_id"]),
+            "side": row["side"],
+            "qty": row["qty"],
+            "price": row["limit_price"],
+            "account": msg.get(1),
+            "cum_qty": 0,
+            "notional": 0.0,
+            "status": "PENDING",
+            "persisted": asyncio.wrap_future(persisted, loop=self.loop)
+        }
+        self.orders[cl_ord_id] = order
+        self.cl_ord_ids[row["order_id"]] = cl_ord_id
+        FixGatewayService.route_order(row["order_id"], self)
+        order["persisted"].add_done_callback(lambda fut: self._on_persisted(order, fut))
+
+    def _on_persisted(self, order: Dict[str, Any], fut: asyncio.Future) -> None:
+        if fut.cancelled() or fut.exception() is not None:
+            error = "cancelled" if fut.cancelled() else str(fut.exception())
+            order["status"] = "REJECTED"
+            self._forget(order)
+            self.send(codec.EXECUTION_REPORT, self._execution_fields(order, "8", "8") + [(codec.TAG_TEXT, error)])
+            return
+        if order["status"] == "PENDING":
+            order["status"] = "NEW"
+        self.send(codec.EXECUTION_REPORT, self._execution_fields(order, "0", "0"))
+
+    def on_order_cancel_request(self, msg: FixMessage) -> None:
+        order = self.orders.get(msg.get(41))
+        if order is None or order["status"] not in ("PENDING", "NEW", "PARTIALLY_FILLED"):
+            self._reject_cancel(msg, "Unknown order" if order is None else "Order is not working", unknown=order is None)
+            return
+        asyncio.ensure_future(self._cancel(msg, order))
+
+    async def _cancel(self, msg: FixMessage, order: Dict[str, Any]) -> None:
+        # A cancel can overtake the batch holding its order; wait for the insert first
+        try:
+            await order["persisted"]
+        except Exception:
+            self._reject_cancel(msg, "Order was rejected")
+            return
+        cancelled = await asyncio.to_thread(OrderGatewayService.cancel_order, order["order_id"], order["instrument_id"])
+        if not cancelled:
+            self._reject_cancel(msg, "Order is not working")
+            return
+        order["status"] = "CANCELLED"
+        self._forget(order)
+        self.send(codec.EXECUTION_REPORT,
+                  self._execution_fields(order, "4", "4", cl_ord_id=msg.get(11)) + [(41, order["cl_ord_id"])])
+
+    def on_fill(self, order_id: str, fill_qty: Optional[int], price: float) -> None:
+        cl_ord_id = self.cl_ord_ids.get(order_id)
+        order = self.orders.get(cl_ord_id) if cl_ord_id else None
+        if order is None:
+            return
+        leaves = order["qty"] - order["cum_qty"]
+        last_qty = min(fill_qty or leaves, leaves)
+        order["cum_qty"] += last_qty
+        order["notional"] += last_qty * price
+        filled = order["cum_qty"] >= order["qty"]
+        order["status"] = "FILLED" if filled else "PARTIALLY_FILLED"
+        if filled:
+            self._forget(order)
+        self.send(codec.EXECUTION_REPORT, self._execution_fields(
+            order, "F", "2" if filled else "1"
+        ) + [(32, str(last_qty)), (31, f"{price:g}")])
+
+    def _execution_fields(self, order: Dict[str, Any], exec_type: str, ord_status: str,
+                          cl_ord_id: Optional[str] = None) -> Fields:
+        cum_qty = order["cum_qty"]
+        leaves = 0 if ord_status in ("2", "4", "8") else order["qty"] - cum_qty
+        avg_px = order["notional"] / cum_qty if cum_qty else 0.0
+        return [
+            (37, order["order_id"]),
+            (11, cl_ord_id or order["cl_ord_id"]),
+            (17, f"{order['order_id'][:8]}-{next(self._exec_ids)}"),
+            (150, exec_type),
+            (39, ord_status),
+            (1, order["account"]),
+            (55, order["symbol"]),
+            (54, SIDE_CODES.get(order["side"], "1")),
+            (38, str(order["qty"])),
+            (44, f"{order['price']:g}" if order["price"] is not None else None),
+            (151, str(leaves)),
+            (14, str(cum_qty)),
+            (6, f"{avg_px:g}"),
+            (60, codec.utc_timestamp())
+        ]
+
+    def _reject_order(self, msg: FixMessage, reason: str) -> None:
+        self.send(codec.EXECUTION_REPORT, [
+            (37, "NONE"),
+            (11, msg.get(11) or "NONE"),
+            (17, f"REJ-{next(self._exec_ids)}"),
+            (150, "8"),
+            (39, "8"),
+            (55, msg.get(55) or msg.get(48)),
+            (54, msg.get(54)),
+            (38, msg.get(38)),
+            (151, "0"),
+            (14, "0"),
+            (6, "0"),
+            (codec.TAG_TEXT, reason)
+        ])
+
+    def _reject_cancel(self, msg: FixMessage, reason: str, unknown: bool = False) -> None:
+        order = self.orders.get(msg.get(41))
+        self.send(codec.ORDER_CANCEL_REJECT, [
+            (37, order["order_id"] if order else "NONE"),
+            (11, msg.get(11)),
+            (41, msg.get(41)),
+            (39, "8" if order is None else {"FILLED": "2", "CANCELLED": "4"}.get(order["status"], "0")),
+            (434, "1"),
+            (102, "1" if unknown else "0"),
+            (codec.TAG_TEXT, reason)
+        ])
+
+    def _forget(self, order: Dict[str, Any]) -> None:
+        """Stop routing events for a terminal order (its ClOrdID stays reserved)"""
+        self.cl_ord_ids.pop(order["order_id"], None)
+        FixGatewayService.unroute_order(order["order_id"])
+
+    _handlers = {
+        codec.HEARTBEAT: on_heartbeat,
+        codec.TEST_REQUEST: on_test_request,
+        codec.RESEND_REQUEST: on_resend_request,
+        codec.SEQUENCE_RESET: on_sequence_reset,
+        codec.LOGOUT: on_logout,
+        codec.REJECT: on_reject,
+        codec.NEW_ORDER_SINGLE: on_new_order_single,
+        codec.ORDER_CANCEL_REQUEST: on_order_cancel_request,
+    }
+
+
+class FixAcceptor:
+    """TCP acceptor owning per-counterparty session state"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._states: Dict[str, FixSessionState] = {}
+        self._active: Dict[str, FixSession] = {}
+        self._connections: List[FixSession] = []
+
+    async def start(self) -> None:
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._on_connect, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"FIX acceptor listening on {self.host}:{self.port} as {settings.fix_sender_comp_id}")
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        for session in list(self._connections):
+            session.logout("Acceptor shutting down")
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        logger.info("FIX acceptor stopped")
+
+    async def _on_connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = FixSession(reader, writer, self)
+        self._connections.append(session)
+        await session.run()
+
+    def session_state(self, counterparty: str) -> FixSessionState:
+        state = self._states.get(counterparty)
+        if state is None:
+            state = self._states[counterparty] = FixSessionState(counterparty)
+        return state
+
+    def register(self, counterparty: str, session: FixSession) -> bool:
+        """Bind a logged-on session to its counterparty; only one session per counterparty"""
+        current = self._active.get(counterparty)
+        if current is not None and not current.closed:
+            return False
+        self._active[counterparty] = session
+        return True
+
+    def unregister(self, session: FixSession) -> None:
+        if session in self._connections:
+            self._connections.remove(session)
+        if session.state is not None and self._active.get(session.state.counterparty) is session:
+            del self._active[session.state.counterparty]
+        for order_id in list(session.cl_ord_ids):
+            FixGatewayService.unroute_order(order_id)
+
+    def get_sessions(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "counterparty": counterparty,
+                "logged_on": counterparty in self._active,
+                "next_out_seq": state.next_out_seq,
+                "next_in_seq": state.next_in_seq,
+                "messages_in": self._active[counterparty].messages_in if counterparty in self._active else None,
+                "messages_out": self._active[counterparty].messages_out if counterparty in self._active else None,
+                "working_orders": len(self._active[counterparty].cl_ord_ids) if counterparty in self._active else None
+            }
+            for counterparty, state in self._states.items()
+        ]
+
+
+class FixGatewayService:
+    """Service class routing order lifecycle events to FIX sessions"""
+
+    _routes: Dict[str, FixSession] = {}
+    _registered = False
+
+    @staticmethod
+    def route_order(order_id: str, session: FixSession) -> None:
+        FixGatewayService._routes[order_id] = session
+
+    @staticmethod
+    def unroute_order(order_id: str) -> None:
+        FixGatewayService._routes.pop(order_id, None)
+
+    @staticmethod
+    def get_status() -> Dict[str, Any]:
+        return {
+            "enabled": settings.fix_acceptor_enabled,
+            "host": fix_acceptor.host,
+            "port": fix_acceptor.port,
+            "sender_comp_id": settings.fix_sender_comp_id,
+            "sessions": fix_acceptor.get_sessions()
+        }
+
+    @staticmethod
+    def on_order_filled(event: Event) -> None:
+        data = event.data
+        session = FixGatewayService._routes.get(data["order_id"])
+        if session is not None:
+            session.loop.call_soon_threadsafe(
+                session.on_fill, data["order_id"], data.get("fill_qty"), float(data.get("price") or 0.0)
+            )
+
+    @staticmethod
+    def register_event_handlers() -> None:
+        """Subscribe to fills so they are reported as ExecutionReports (idempotent)"""
+        if FixGatewayService._registered:
+            return
+        event_bus.subscribe(EventType.ORDER_FILLED, FixGatewayService.on_order_filled)
+        FixGatewayService._registered = True
+
+
+# Global acceptor
+fix_acceptor = FixAcceptor(settings.fix_host, settings.fix_port)
@@ -1,6 +1,6 @@
 # Market Data Module - Models
 
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Index
 from app.core import Base
 from datetime import datetime
 
@@ -24,12 +24,18 @@ class MarketData(Base):
 
 class PriceQuote(Base):
     __tablename__ = "price_quote"
+    # Monthly range partitions on PostgreSQL (see app.core.partitions); the key is part of the primary key
+    __table_args__ = (
+        # Latest quotes per instrument (newest partitions first)
+        Index("ix_price_quote_instrument_quote_time", "instrument_id", "quote_time"),
+        {"postgresql_partition_by": "RANGE (quote_time)"},
+    )
     quote_id = Column(String, primary_key=True, index=True)
     instrument_id = Column(String, ForeignKey("instrument.instrument_id"))
     price = Column(Float)
     qty = Column(Float)
     side = Column(String)  # BID or ASK
-    quote_time = Column(DateTime, default=datetime.utcnow)
+    quote_time = Column(DateTime, primary_key=True, default=datetime.utcnow)
     source = Column(String)  # Market feed source
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -1,8 +1,10 @@
 # Market Data Module - Routes (Skeleton)
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core import get_db
+from app.core import get_db, get_async_read_db, publish_event, EventType
 from app.modules.market_data import models
 from pydantic import BaseModel
 import uuid
@@ -52,6 +54,7 @@ def create_market_data(
             setattr(existing, key, value)
         db.commit()
         db.refresh(existing)
+        _publish_market_data(existing)
         return existing
 
     # Create new
@@ -62,22 +65,33 @@ def create_market_data(
     db.add(db_market_data)
     db.commit()
     db.refresh(db_market_data)
+    _publish_market_data(db_market_data)
     return db_market_data
 
+
+def _publish_market_data(market_data: models.MarketData) -> None:
+    """Notify mark consumers (live P&L) of the new prices"""
+    publish_event(EventType.MARKET_DATA_UPDATED, {
+        "instrument_id": market_data.instrument_id,
+        "bid_price": market_data.bid_price,
+        "ask_price": market_data.ask_price,
+        "last_price": market_data.last_price
+    }, "market_data")
+
 @router.get("/market-data/{instrument_id}", response_model=MarketDataSchema)
-def get_market_data(instrument_id: str, db: Session = Depends(get_db)):
+async def get_market_data(instrument_id: str, db: AsyncSession = Depends(get_async_read_db)):
     """Get market data for an instrument"""
-    market_data = db.query(models.MarketData).filter(
-        models.MarketData.instrument_id == instrument_id
-    ).first()
+    market_data = (await db.execute(
+        select(models.MarketData).where(models.MarketData.instrument_id == instrument_id).limit(1)
+    )).scalars().first()
     if not market_data:
         raise HTTPException(status_code=404, detail="Market data not found")
     return market_data
 
 @router.get("/market-data", response_model=list[MarketDataSchema])
-def list_market_data(db: Session = Depends(get_db)):
+async def list_market_data(db: AsyncSession = Depends(get_async_read_db)):
     """List all market data"""
-    return db.query(models.MarketData).all()
+    return (await db.execute(select(models.MarketData))).scalars().all()
 
 class PriceQuoteSchema(BaseModel):
     instrument_id: str
@@ -104,10 +118,12 @@ def record_price_quote(
     return {"message": "Quote recorded", "quote_id": db_quote.quote_id}
 
 @router.get("/quotes/{instrument_id}")
-def get_recent_quotes(instrument_id: str, limit: int = 10, db: Session = Depends(get_db)):
+async def get_recent_quotes(instrument_id: str, limit: int = 10, db: AsyncSession = Depends(get_async_read_db)):
     """Get recent price quotes for an instrument"""
-    quotes = db.query(models.PriceQuote).filter(
-        models.PriceQuote.instrument_id == instrument_id
-    ).order_by(models.PriceQuote.quote_time.desc()).limit(limit).all()
+    quotes = (await db.execute(
+        select(models.PriceQuote).where(
+            models.PriceQuote.instrument_id == instrument_id
+        ).order_by(models.PriceQuote.quote_time.desc()).limit(limit)
+    )).scalars().all()
     return quotes
 
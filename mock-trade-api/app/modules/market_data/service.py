@@ -40,7 +40,8 @@ class MarketDataService:
         publish_event(EventType.MARKET_DATA_UPDATED, {
             "instrument_id": db_market_data.instrument_id,
             "bid_price": db_market_data.bid_price,
-            "ask_price": db_market_data.ask_price
+            "ask_price": db_market_data.ask_price,
+            "last_price": db_market_data.last_price
         }, "market_data")
         
         logger.info(f"Created market data {market_data_id} for instrument {db_market_data.instrument_id}")
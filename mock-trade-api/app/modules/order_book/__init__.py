@@ -0,0 +1,9 @@
+"""
+Order Book Module
+Maintains in-memory L2 market depth per instrument from resting orders.
+"""
+
+from app.modules.order_book.service import OrderBook, OrderBookService
+from app.modules.order_book.routes import router
+
+__all__ = ['OrderBook', 'OrderBookService', 'router']
@@ -0,0 +1,54 @@
+"""Order Book Module - API Routes
+Serves L2 depth snapshots and the incremental depth WebSocket feed.
+"""
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+import logging
+
+from app.core.websocket import manager
+from app.modules.order_book.service import OrderBookService
+from app.modules.order_book.schemas import DepthSnapshotSchema
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/order-book", tags=["Order Book"])
+
+
+@router.get("/{instrument_id}/depth", response_model=DepthSnapshotSchema)
+def get_depth(
+    instrument_id: str,
+    levels: int = Query(10, ge=1, le=500, description="Number of price levels per side")
+):
+    """Get aggregated L2 depth for an instrument"""
+    return OrderBookService.get_depth(instrument_id, levels)
+
+
+@router.websocket("/ws/{instrument_id}")
+async def websocket_depth_endpoint(websocket: WebSocket, instrument_id: str, levels: int = 10):
+    """
+    WebSocket endpoint for incremental depth updates.
+    Sends a `depth_snapshot` on connect, then `depth_update` level deltas.
+    Clients should discard deltas whose sequence is <= the snapshot sequence.
+    """
+    channel = OrderBookService.channel(instrument_id)
+    await manager.connect(websocket, channel=channel)
+    try:
+        await websocket.send_json({
+            "type": "depth_snapshot",
+            "data": OrderBookService.get_depth(instrument_id, levels)
+        })
+        while True:
+            data = await websocket.receive_text()
+            if data == "ping":
+                await manager.send_personal_message("pong", websocket)
+            elif data == "snapshot":
+                await websocket.send_json({
+                    "type": "depth_snapshot",
+                    "data": OrderBookService.get_depth(instrument_id, levels)
+                })
+    except WebSocketDisconnect:
+        manager.disconnect(websocket, channel=channel)
+        logger.info(f"Client disconnected from depth feed for {instrument_id}")
+    except Exception as e:
+        logger.error(f"WebSocket error: {e}")
+        manager.disconnect(websocket, channel=channel)
@@ -0,0 +1,21 @@
+"""Order Book Module - Pydantic Schemas
+Defines response models for market depth endpoints.
+"""
+
+from pydantic import BaseModel
+from typing import List
+
+
+class DepthLevelSchema(BaseModel):
+    """Aggregated size at a single price level"""
+    price: float
+    qty: int
+    orders: int
+
+
+class DepthSnapshotSchema(BaseModel):
+    """L2 depth snapshot for an instrument"""
+    instrument_id: str
+    sequence: int
+    bids: List[DepthLevelSchema]
+    asks: List[DepthLevelSchema]
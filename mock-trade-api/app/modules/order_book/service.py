@@ -0,0 +1,261 @@
+"""
+Order Book Module - Service Layer
+Maintains aggregated price-level depth incrementally from order lifecycle events.
+"""
+
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Any
+import bisect
+import threading
+import logging
+
+from app.core import event_bus, Event, EventType
+from app.core.websocket import manager
+from app.models import OrderHdr
+
+logger = logging.getLogger(__name__)
+
+# Order statuses that leave quantity resting in the book
+RESTING_STATUSES = ("NEW", "PARTIALLY_FILLED")
+
+
+class OrderBook:
+    """
+    Aggregated L2 book for a single instrument.
+
+    Each side keeps a dict of price -> [qty, order_count] plus an ascending
+    list of prices, so level updates are a dict lookup plus a bisect and
+    a snapshot only touches the levels it returns.
+    """
+
+    def __init__(self, instrument_id: str):
+        self.instrument_id = instrument_id
+        self.sequence = 0
+        self._levels: Dict[str, Dict[float, List[int]]] = {"BUY": {}, "SELL": {}}
+        self._prices: Dict[str, List[float]] = {"BUY": [], "SELL": []}
+        # order_id -> [side, price, remaining_qty]
+        self._orders: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def add_order(self, order_id: str, side: str, price: float, qty: int) -> Optional[Dict[str, Any]]:
+        """
+        Add a resting order to the book
+
+        Returns:
+            Level delta, or None if the book did not change
+        """
+        with self._lock:
+            if order_id in self._orders or qty <= 0:
+                return None
+            self._orders[order_id] = [side, price, qty]
+            return self._apply(side, price, qty, 1)
+
+    def reduce_order(self, order_id: str, qty: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Remove quantity from a resting order (fill or cancel)
+
+        Args:
+            order_id: Order identifier
+            qty: Quantity to remove, defaults to the full remaining quantity
+
+        Returns:
+            Level delta, or None if the order is not in the book
+        """
+        with self._lock:
+            entry = self._orders.get(order_id)
+            if entry is None:
+                return None
+
+            side, price, remaining = entry
+            qty = remaining if qty is None else min(qty, remaining)
+            entry[2] = remaining - qty
+
+            removed_orders = 0
+            if entry[2] <= 0:
+                del self._orders[order_id]
+                removed_orders = 1
+
+            return self._apply(side, price, -qty, -removed_orders)
+
+    def _apply(self, side: str, price: float, qty_delta: int, count_delta: int) -> Dict[str, Any]:
+        """Apply a quantity change to a price level and return the resulting delta"""
+        levels = self._levels[side]
+        level = levels.get(price)
+        if level is None:
+            level = levels[price] = [0, 0]
+            bisect.insort(self._prices[side], price)
+
+        level[0] += qty_delta
+        level[1] += count_delta
+
+        if level[0] <= 0 or level[1] <= 0:
+            del levels[price]
+            prices = self._prices[side]
+            del prices[bisect.bisect_left(prices, price)]
+            level = [0, 0]
+
+        self.sequence += 1
+        return {
+            "instrument_id": self.instrument_id,
+            "sequence": self.sequence,
+            "side": side,
+            "price": price,
+            "qty": level[0],
+            "orders": level[1]
+        }
+
+    def snapshot(self, depth: int = 10) -> Dict[str, Any]:
+        """Return the best `depth` levels per side with the current sequence number"""
+        with self._lock:
+            bid_prices = self._prices["BUY"][-depth:][::-1] if depth > 0 else []
+            ask_prices = self._prices["SELL"][:depth] if depth > 0 else []
+            bids = self._levels["BUY"]
+            asks = self._levels["SELL"]
+            return {
+                "instrument_id": self.instrument_id,
+                "sequence": self.sequence,
+                "bids": [{"price": p, "qty": bids[p][0], "orders": bids[p][1]} for p in bid_prices],
+                "asks": [{"price": p, "qty": asks[p][0], "orders": asks[p][1]} for p in ask_prices]
+            }
+
+
+class OrderBookService:
+    """Service class holding the per-instrument books and wiring them to order events"""
+
+    _books: Dict[str, OrderBook] = {}
+    _books_lock = threading.Lock()
+    _registered = False
+
+    @staticmethod
+    def channel(instrument_id: str) -> str:
+        """WebSocket channel name for an instrument's depth feed"""
+        return f"depth:{instrument_id}"
+
+    @staticmethod
+    def get_book(instrument_id: str) -> OrderBook:
+        """Get (or lazily create) the book for an instrument; only order events and the startup load create books"""
+        book = OrderBookService._books.get(instrument_id)
+        if book is None:
+            with OrderBookService._books_lock:
+                book = OrderBookService._books.setdefault(instrument_id, OrderBook(instrument_id))
+        return book
+
+    @staticmethod
+    def get_depth(instrument_id: str, levels: int = 10) -> Dict[str, Any]:
+        """
+        Get an L2 snapshot for an instrument without touching the database.
+        An instrument without a book gets an empty snapshot at sequence 0, which
+        is where its book's deltas start once an order creates it.
+        """
+        book = OrderBookService._books.get(instrument_id)
+        if book is None:
+            return {"instrument_id": instrument_id, "sequence": 0, "bids": [], "asks": []}
+        return book.snapshot(levels)
+
+    @staticmethod
+    def add_order(order_id: str, instrument_id: str, side: str, price: Optional[float],
+                  qty: int, order_type: str = "LIMIT") -> None:
+        """Rest an order in its instrument's book (market orders never rest)"""
+        if not instrument_id or price is None or (order_type or "LIMIT").upper() != "LIMIT":
+            return
+        book = OrderBookService.get_book(instrument_id)
+        delta = book.add_order(order_id, side.upper(), float(price), int(qty or 0))
+        OrderBookService._publish_delta(delta)
+
+    @staticmethod
+    def remove_order(order_id: str, instrument_id: str, qty: Optional[int] = None) -> None:
+        """Remove quantity of an order from its book (cancel or fill)"""
+        book = OrderBookService._books.get(instrument_id)
+        if book is None:
+            return
+        delta = book.reduce_order(order_id, qty)
+        OrderBookService._publish_delta(delta)
+
+    @staticmethod
+    def _publish_delta(delta: Optional[Dict[str, Any]]) -> None:
+        """Push a level delta to subscribers of the instrument's depth channel"""
+        if delta is None:
+            return
+        manager.publish(
+            {"type": "depth_update", "data": delta},
+            channel=OrderBookService.channel(delta["instrument_id"])
+        )
+
+    # ============= EVENT HANDLERS =============
+
+    @staticmethod
+    def on_order_created(event: Event) -> None:
+        data = event.data
+        OrderBookService.add_order(
+            order_id=data["order_id"],
+            instrument_id=data.get("instrument_id"),
+            side=data.get("side", ""),
+            price=data.get("price"),
+            qty=data.get("qty"),
+            order_type=data.get("type", "LIMIT")
+        )
+
+    @staticmethod
+    def on_order_cancelled(event: Event) -> None:
+        data = event.data
+        OrderBookService.remove_order(data["order_id"], data.get("instrument_id"))
+
+    @staticmethod
+    def on_order_filled(event: Event) -> None:
+        data = event.data
+        # fill_qty is set for partial fills; a plain fill removes the whole order
+        OrderBookService.remove_order(data["order_id"], data.get("instrument_id"), data.get("fill_qty"))
+
+    @staticmethod
+    def on_order_updated(event: Event) -> None:
+        data = event.data
+        # An amended order loses its queue position: pull it and rest it again
+        OrderBookService.remove_order(data["order_id"], data.get("instrument_id"))
+        OrderBookService.add_order(
+            order_id=data["order_id"],
+            instrument_id=data.get("instrument_id"),
+            side=data.get("side", ""),
+            price=data.get("price"),
+            qty=data.get("qty"),
+            order_type=data.get("type", "LIMIT")
+        )
+
+    @staticmethod
+    def register_event_handlers() -> None:
+        """Subscribe the books to order lifecycle events (idempotent)"""
+        if OrderBookService._registered:
+            return
+        event_bus.subscribe(EventType.ORDER_CREATED, OrderBookService.on_order_created)
+        event_bus.subscribe(EventType.ORDER_CANCELLED, OrderBookService.on_order_cancelled)
+        event_bus.subscribe(EventType.ORDER_FILLED, OrderBookService.on_order_filled)
+        event_bus.subscribe(EventType.ORDER_UPDATED, OrderBookService.on_order_updated)
+        OrderBookService._registered = True
+
+    @staticmethod
+    def load_open_orders(db: Session) -> int:
+        """
+        Rebuild all books from resting orders in order_hdr.
+        Called once at startup; afterwards books are maintained from events only.
+
+        Returns:
+            Number of orders loaded
+        """
+        with OrderBookService._books_lock:
+            OrderBookService._books = {}
+
+        rows = db.query(
+            OrderHdr.order_id,
+            OrderHdr.instrument_id,
+            OrderHdr.side,
+            OrderHdr.limit_price,
+            OrderHdr.qty,
+            OrderHdr.type
+        ).filter(OrderHdr.status.in_(RESTING_STATUSES)).all()
+
+        for order_id, instrument_id, side, price, qty, order_type in rows:
+            if not side or price is None or (order_type or "LIMIT").upper() != "LIMIT":
+                continue
+            OrderBookService.get_book(instrument_id).add_order(order_id, side.upper(), float(price), int(qty or 0))
+
+        logger.info(f"Loaded {len(rows)} resting orders into {len(OrderBookService._books)} order books")
+        return len(rows)
@@ -0,0 +1,9 @@
+"""
+Order Gateway Module
+Low-latency binary order entry over a persistent WebSocket session.
+"""
+
+from app.modules.order_gateway.service import GatewaySession, LatencyHistogram, OrderGatewayService
+from app.modules.order_gateway.routes import router
+
+__all__ = ['GatewaySession', 'LatencyHistogram', 'OrderGatewayService', 'router']
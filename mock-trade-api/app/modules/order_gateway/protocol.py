@@ -0,0 +1,186 @@
+"""
+Order Gateway Module - Binary Wire Protocol
+Fixed-layout little-endian messages packed with `struct`.
+
+Every message starts with a one byte ASCII message type. Identifiers are
+fixed-width, NUL padded ASCII fields; prices are float64, quantities uint32
+and client order ids uint64.
+
+Inbound (client -> server):
+    'L' Logon        trader(36s) account(36s)
+    'N' NewOrder     cl_ord_id(Q) side(B) ord_type(B) tif(B) qty(I) price(d) instrument(36s)
+    'F' Cancel       cl_ord_id(Q) orig_cl_ord_id(Q)
+    'G' Replace      cl_ord_id(Q) orig_cl_ord_id(Q) qty(I) price(d)
+    'H' Heartbeat    (no body)
+
+Outbound (server -> client):
+    'l' LogonAck     status(B)
+    'E' Execution    cl_ord_id(Q) exec_type(c) order_id(36s) last_qty(I) leaves_qty(I) last_px(d) latency_us(I)
+    'J' Reject       cl_ord_id(Q) reason(64s)
+    'h' Heartbeat    (no body)
+"""
+
+from typing import Dict, Any, Tuple
+import struct
+
+ID_WIDTH = 36
+REASON_WIDTH = 64
+
+# Inbound message types
+LOGON = b"L"
+NEW_ORDER = b"N"
+CANCEL = b"F"
+REPLACE = b"G"
+HEARTBEAT = b"H"
+
+# Outbound message types
+LOGON_ACK = b"l"
+EXECUTION = b"E"
+REJECT = b"J"
+HEARTBEAT_ACK = b"h"
+
+# Execution types (FIX ExecType values)
+EXEC_NEW = b"0"
+EXEC_CANCELLED = b"4"
+EXEC_REPLACED = b"5"
+EXEC_TRADE = b"F"
+
+# Enum codes used on the wire
+SIDES = {1: "BUY", 2: "SELL"}
+ORDER_TYPES = {1: "MARKET", 2: "LIMIT", 3: "STOP"}
+TIFS = {0: "DAY", 1: "GTC", 3: "IOC", 4: "FOK"}
+
+LOGON_STRUCT = struct.Struct(f"<c{ID_WIDTH}s{ID_WIDTH}s")
+NEW_ORDER_STRUCT = struct.Struct(f"<cQBBBId{ID_WIDTH}s")
+CANCEL_STRUCT = struct.Struct("<cQQ")
+REPLACE_STRUCT = struct.Struct("<cQQId")
+LOGON_ACK_STRUCT = struct.Struct("<cB")
+EXECUTION_STRUCT = struct.Struct(f"<cQc{ID_WIDTH}sIIdI")
+REJECT_STRUCT = struct.Struct(f"<cQ{REASON_WIDTH}s")
+
+INBOUND_STRUCTS = {
+    LOGON: LOGON_STRUCT,
+    NEW_ORDER: NEW_ORDER_STRUCT,
+    CANCEL: CANCEL_STRUCT,
+    REPLACE: REPLACE_STRUCT,
+}
+
+
+class ProtocolError(ValueError):
+    """Raised for frames that cannot be decoded"""
+
+
+def _text(raw: bytes) -> str:
+    try:
+        return raw.rstrip(b"\x00").decode("ascii")
+    except UnicodeDecodeError as e:
+        raise ProtocolError(f"Non-ASCII byte in identifier at offset {e.start}")
+
+
+def _field(value: str, width: int) -> bytes:
+    return (value or "").encode("ascii", "replace")[:width]
+
+
+def decode(frame: bytes) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Decode an inbound frame
+
+    Returns:
+        (message type, fields)
+
+    Raises:
+        ProtocolError: If the type is unknown, the frame has the wrong length or an identifier is not ASCII
+    """
+    if not frame:
+        raise ProtocolError("Empty frame")
+    msg_type = frame[:1]
+    if msg_type == HEARTBEAT:
+        return msg_type, {}
+
+    layout = INBOUND_STRUCTS.get(msg_type)
+    if layout is None:
+        raise ProtocolError(f"Unknown message type {msg_type!r}")
+    if len(frame) != layout.size:
+        raise ProtocolError(f"Message {msg_type!r} must be {layout.size} bytes, got {len(frame)}")
+    values = layout.unpack(frame)
+
+    if msg_type == NEW_ORDER:
+        _, cl_ord_id, side, ord_type, tif, qty, price, instrument = values
+        return msg_type, {
+            "cl_ord_id": cl_ord_id,
+            "side": SIDES.get(side, str(side)),
+            "type": ORDER_TYPES.get(ord_type, str(ord_type)),
+            "tif": TIFS.get(tif, str(tif)),
+            "qty": qty,
+            "price": price if price > 0 else None,
+            "instrument": _text(instrument)
+        }
+    if msg_type == CANCEL:
+        _, cl_ord_id, orig_cl_ord_id = values
+        return msg_type, {"cl_ord_id": cl_ord_id, "orig_cl_ord_id": orig_cl_ord_id}
+    if msg_type == REPLACE:
+        _, cl_ord_id, orig_cl_ord_id, qty, price = values
+        return msg_type, {
+            "cl_ord_id": cl_ord_id,
+            "orig_cl_ord_id": orig_cl_ord_id,
+            "qty": qty,
+            "price": price if price > 0 else None
+        }
+    _, trader, account = values
+    return msg_type, {"trader": _text(trader), "account": _text(account)}
+
+
+def encode_logon(trader: str, account: str = "") -> bytes:
+    return LOGON_STRUCT.pack(LOGON, _field(trader, ID_WIDTH), _field(account, ID_WIDTH))
+
+
+def encode_new_order(cl_ord_id: int, instrument: str, side: int, ord_type: int, tif: int,
+                     qty: int, price: float = 0.0) -> bytes:
+    return NEW_ORDER_STRUCT.pack(NEW_ORDER, cl_ord_id, side, ord_type, tif, qty, price,
+                                 _field(instrument, ID_WIDTH))
+
+
+def encode_cancel(cl_ord_id: int, orig_cl_ord_id: int) -> bytes:
+    return CANCEL_STRUCT.pack(CANCEL, cl_ord_id, orig_cl_ord_id)
+
+
+def encode_replace(cl_ord_id: int, orig_cl_ord_id: int, qty: int, price: float = 0.0) -> bytes:
+    return REPLACE_STRUCT.pack(REPLACE, cl_ord_id, orig_cl_ord_id, qty, price)
+
+
+def encode_logon_ack(accepted: bool) -> bytes:
+    return LOGON_ACK_STRUCT.pack(LOGON_ACK, 1 if accepted else 0)
+
+
+def encode_execution(cl_ord_id: int, exec_type: bytes, order_id: str, last_qty: int,
+                     leaves_qty: int, last_px: float, latency_us: int = 0) -> bytes:
+    return EXECUTION_STRUCT.pack(EXECUTION, cl_ord_id, exec_type, _field(order_id, ID_WIDTH),
+                                 last_qty, leaves_qty, last_px or 0.0, min(latency_us, 0xFFFFFFFF))
+
+
+def encode_reject(cl_ord_id: int, reason: str) -> bytes:
+    return REJECT_STRUCT.pack(REJECT, cl_ord_id, _field(reason, REASON_WIDTH))
+
+
+def decode_outbound(frame: bytes) -> Tuple[bytes, Dict[str, Any]]:
+    """Decode a server frame (used by test clients)"""
+    msg_type = frame[:1]
+    if msg_type == HEARTBEAT_ACK:
+        return msg_type, {}
+    if msg_type == LOGON_ACK:
+        return msg_type, {"accepted": bool(LOGON_ACK_STRUCT.unpack(frame)[1])}
+    if msg_type == EXECUTION:
+        _, cl_ord_id, exec_type, order_id, last_qty, leaves_qty, last_px, latency_us = EXECUTION_STRUCT.unpack(frame)
+        return msg_type, {
+            "cl_ord_id": cl_ord_id,
+            "exec_type": exec_type.decode("ascii"),
+            "order_id": _text(order_id),
+            "last_qty": last_qty,
+            "leaves_qty": leaves_qty,
+            "last_px": last_px,
+            "latency_us": latency_us
+        }
+    if msg_type == REJECT:
+        _, cl_ord_id, reason = REJECT_STRUCT.unpack(frame)
+        return msg_type, {"cl_ord_id": cl_ord_id, "reason": _text(reason)}
+    raise ProtocolError(f"Unknown message type {msg_type!r}")
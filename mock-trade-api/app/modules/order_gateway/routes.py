@@ -0,0 +1,43 @@
+"""Order Gateway Module - API Routes
+Binary order-entry WebSocket and gateway latency statistics.
+"""
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import asyncio
+import logging
+
+from app.modules.order_gateway.service import GatewaySession, OrderGatewayService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/order-gateway", tags=["Order Gateway"])
+
+
+@router.get("/stats")
+def get_gateway_stats():
+    """Per-message-type latency histograms (receive to ack, microseconds)"""
+    return OrderGatewayService.get_stats()
+
+
+@router.websocket("/ws")
+async def order_entry_endpoint(websocket: WebSocket):
+    """
+    Persistent binary order-entry session.
+    Frames are struct-packed messages (see order_gateway.protocol); the first
+    message must be a Logon. Acks, rejects and fills are returned on the same socket.
+    """
+    await websocket.accept()
+    session = GatewaySession(websocket)
+    OrderGatewayService.register_session(session)
+    writer = asyncio.create_task(session.writer())
+    try:
+        while True:
+            frame = await websocket.receive_bytes()
+            await session.handle(frame)
+    except WebSocketDisconnect:
+        logger.info(f"Order entry session for trader {session.trader} disconnected")
+    except Exception as e:
+        logger.error(f"Order entry session error: {e}")
+    finally:
+        session.close()
+        writer.cancel()
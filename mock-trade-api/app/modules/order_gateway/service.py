@@ -0,0 +1,385 @@
+"""
+Order Gateway Module - Service Layer
+Persistent binary order-entry sessions feeding the order intake pipeline.
+"""
+
+from sqlalchemy import update
+from typing import Dict, Optional, Set, Any
+import asyncio
+import bisect
+import threading
+import time
+import logging
+
+from app.core import SessionLocal, event_bus, Event, EventType, publish_event, InvalidOrderError, OrderQueueFullError
+from app.models import OrderHdr
+from app.modules.order_intake import order_intake, validate_order
+from app.modules.order_gateway import protocol
+
+logger = logging.getLogger(__name__)
+
+# Order statuses that can still be cancelled or replaced
+WORKING_STATUSES = ("NEW", "PARTIALLY_FILLED")
+
+# Histogram bucket upper bounds in microseconds (powers of two up to ~16s)
+LATENCY_BUCKETS_US = [2 ** i for i in range(25)]
+
+
+class LatencyHistogram:
+    """Fixed log2-bucketed latency histogram; recording is O(log buckets) and allocation free"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_US) + 1)
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency_us: int) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(LATENCY_BUCKETS_US, latency_us)] += 1
+            self.count += 1
+            self.total_us += latency_us
+            self.max_us = max(self.max_us, latency_us)
+            self.min_us = latency_us if self.min_us is None else min(self.min_us, latency_us)
+
+    def percentile(self, pct: float) -> Optional[int]:
+        """Upper bound of the bucket containing the given percentile"""
+        if not self.count:
+            return None
+        target = self.count * pct / 100.0
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(LATENCY_BUCKETS_US[i], self.max_us) if i < len(LATENCY_BUCKETS_US) else self.max_us
+        return self.max_us
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+            "mean_us": round(self.total_us / self.count, 1) if self.count else None,
+            "p50_us": self.percentile(50),
+            "p90_us": self.percentile(90),
+            "p99_us": self.percentile(99),
+            "buckets": {
+                f"le_{bound}us": count
+                for bound, count in zip(LATENCY_BUCKETS_US, self.counts) if count
+            }
+        }
+
+
+class GatewaySession:
+    """
+    One order-entry connection.
+
+    Outbound frames go through an asyncio queue drained by `writer()`, so
+    fills raised on other threads are delivered in order on the same socket.
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.loop = asyncio.get_running_loop()
+        self.outbound: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+        self.trader: Optional[str] = None
+        self.account: Optional[str] = None
+        # cl_ord_id -> order_id, and order_id -> working order state
+        self.cl_ord_ids: Dict[int, str] = {}
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self._pending: Set[asyncio.Task] = set()
+
+    def send(self, frame: bytes) -> None:
+        """Queue a frame for delivery (safe from any thread)"""
+        self.loop.call_soon_threadsafe(self.outbound.put_nowait, frame)
+
+    async def writer(self) -> None:
+        while True:
+            frame = await self.outbound.get()
+            if frame is None:
+                return
+            await self.websocket.send_bytes(frame)
+
+    def close(self) -> None:
+        self.send(None)
+        OrderGatewayService.unregister_session(self)
+
+    # ============= INBOUND =============
+
+    async def handle(self, frame: bytes) -> None:
+        received = time.perf_counter_ns()
+        try:
+            msg_type, fields = protocol.decode(frame)
+        except protocol.ProtocolError as e:
+            self.send(protocol.encode_reject(0, str(e)))
+            return
+
+        if msg_type == protocol.HEARTBEAT:
+            self.send(protocol.HEARTBEAT_ACK)
+        elif msg_type == protocol.LOGON:
+            self.on_logon(fields)
+        elif self.trader is None:
+            self.send(protocol.encode_reject(fields.get("cl_ord_id", 0), "Logon required"))
+        elif msg_type == protocol.NEW_ORDER:
+            self.on_new_order(fields, received)
+        elif msg_type == protocol.CANCEL:
+            await self.on_cancel(fields, received)
+        elif msg_type == protocol.REPLACE:
+            await self.on_replace(fields, received)
+
+    def on_logon(self, fields: Dict[str, Any]) -> None:
+        self.trader = fields["trader"] or None
+        self.account = fields["account"] or None
+        self.send(protocol.encode_logon_ack(self.trader is not None))
+
+    def on_new_order(self, fields: Dict[str, Any], received: int) -> None:
+        """
+        Validate, track and enqueue an order, then acknowledge it from a task once
+        persisted. Pipelined: new orders from one session can share a group commit,
+        and a cancel or replace right behind finds the order tracked and waits for it.
+        """
+        cl_ord_id = fields["cl_ord_id"]
+        if cl_ord_id in self.cl_ord_ids:
+            self.send(protocol.encode_reject(cl_ord_id, "Duplicate cl_ord_id"))
+            return
+        try:
+            row = validate_order({**fields, "trader": self.trader, "account": self.account})
+            # Route fills to this session before the order can possibly trade
+            order = self._track(cl_ord_id, row)
+            order["persisted"] = asyncio.wrap_future(order_intake.submit_row(row), loop=self.loop)
+        except (InvalidOrderError, OrderQueueFullError) as e:
+            self._untrack(cl_ord_id)
+            self.send(protocol.encode_reject(cl_ord_id, str(e)))
+            return
+
+        task = asyncio.ensure_future(self._acknowledge_new(order, row, received))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _acknowledge_new(self, order: Dict[str, Any], row: Dict[str, Any], received: int) -> None:
+        cl_ord_id = order["cl_ord_id"]
+        try:
+            await order["persisted"]
+        except Exception as e:
+            self._untrack(cl_ord_id)
+            self.send(protocol.encode_reject(cl_ord_id, str(e)))
+            return
+
+        latency_us = OrderGatewayService.record_latency("new_order", received)
+        self.send(protocol.encode_execution(
+            cl_ord_id, protocol.EXEC_NEW, row["order_id"], 0, row["qty"], 0.0, latency_us
+        ))
+
+    async def on_cancel(self, fields: Dict[str, Any], received: int) -> None:
+        cl_ord_id = fields["cl_ord_id"]
+        order = self._working_order(fields["orig_cl_ord_id"])
+        if order is None:
+            self.send(protocol.encode_reject(cl_ord_id, "Unknown order"))
+            return
+        if not await self._wait_persisted(order, cl_ord_id):
+            return
+        if not await asyncio.to_thread(OrderGatewayService.cancel_order, order["order_id"], order["instrument_id"]):
+            self.send(protocol.encode_reject(cl_ord_id, "Order is not working"))
+            return
+
+        self._untrack(fields["orig_cl_ord_id"])
+        latency_us = OrderGatewayService.record_latency("cancel", received)
+        self.send(protocol.encode_execution(cl_ord_id, protocol.EXEC_CANCELLED, order["order_id"], 0, 0, 0.0, latency_us))
+
+    async def on_replace(self, fields: Dict[str, Any], received: int) -> None:
+        cl_ord_id = fields["cl_ord_id"]
+        order = self._working_order(fields["orig_cl_ord_id"])
+        if order is None:
+            self.send(protocol.encode_reject(cl_ord_id, "Unknown order"))
+            return
+        if fields["qty"] <= 0:
+            self.send(protocol.encode_reject(cl_ord_id, "Quantity must be greater than zero"))
+            return
+        if not await self._wait_persisted(order, cl_ord_id):
+            return
+        price = fields["price"] if fields["price"] is not None else order["price"]
+        if not await asyncio.to_thread(OrderGatewayService.replace_order, order, fields["qty"], price):
+            self.send(protocol.encode_reject(cl_ord_id, "Order is not working"))
+            return
+
+        # The order keeps its id; later messages refer to it by the new cl_ord_id
+        del self.cl_ord_ids[fields["orig_cl_ord_id"]]
+        self.cl_ord_ids[cl_ord_id] = order["order_id"]
+        order.update(cl_ord_id=cl_ord_id, leaves_qty=fields["qty"], price=price)
+        latency_us = OrderGatewayService.record_latency("replace", received)
+        self.send(protocol.encode_execution(
+            cl_ord_id, protocol.EXEC_REPLACED, order["order_id"], 0, fields["qty"], 0.0, latency_us
+        ))
+
+    async def _wait_persisted(self, order: Dict[str, Any], cl_ord_id: int) -> bool:
+        """A cancel or replace can overtake the batch holding its order; wait for the insert first"""
+        try:
+            await order["persisted"]
+        except Exception:
+            self.send(protocol.encode_reject(cl_ord_id, "Order was rejected"))
+            return False
+        return True
+
+    # ============= FILLS =============
+
+    def on_fill(self, order_id: str, fill_qty: Optional[int], price: float) -> None:
+        order = self.orders.get(order_id)
+        if order is None:
+            return
+        last_qty = min(fill_qty or order["leaves_qty"], order["leaves_qty"])
+        order["leaves_qty"] -= last_qty
+        self.send(protocol.encode_execution(
+            order["cl_ord_id"], protocol.EXEC_TRADE, order_id, last_qty, order["leaves_qty"], price
+        ))
+        if order["leaves_qty"] <= 0:
+            self._untrack(order["cl_ord_id"])
+
+    # ============= ORDER STATE =============
+
+    def _track(self, cl_ord_id: int, row: Dict[str, Any]) -> Dict[str, Any]:
+        self.cl_ord_ids[cl_ord_id] = row["order_id"]
+        order = self.orders[row["order_id"]] = {
+            "order_id": row["order_id"],
+            "cl_ord_id": cl_ord_id,
+            "instrument_id": row["instrument_id"],
+            "side": row["side"],
+            "type": row["type"],
+            "price": row["limit_price"],
+            "leaves_qty": row["qty"]
+        }
+        OrderGatewayService.route_order(row["order_id"], self)
+        return order
+
+    def _untrack(self, cl_ord_id: int) -> None:
+        order_id = self.cl_ord_ids.pop(cl_ord_id, None)
+        if order_id is not None:
+            self.orders.pop(order_id, None)
+            OrderGatewayService.unroute_order(order_id)
+
+    def _working_order(self, cl_ord_id: int) -> Optional[Dict[str, Any]]:
+        order_id = self.cl_ord_ids.get(cl_ord_id)
+        return self.orders.get(order_id) if order_id else None
+
+
+class OrderGatewayService:
+    """Service class routing order events to gateway sessions and keeping latency statistics"""
+
+    _routes: Dict[str, GatewaySession] = {}
+    _histograms: Dict[str, LatencyHistogram] = {
+        "new_order": LatencyHistogram(),
+        "cancel": LatencyHistogram(),
+        "replace": LatencyHistogram()
+    }
+    _sessions = 0
+    _registered = False
+
+    @staticmethod
+    def route_order(order_id: str, session: GatewaySession) -> None:
+        OrderGatewayService._routes[order_id] = session
+
+    @staticmethod
+    def unroute_order(order_id: str) -> None:
+        OrderGatewayService._routes.pop(order_id, None)
+
+    @staticmethod
+    def register_session(session: GatewaySession) -> None:
+        OrderGatewayService._sessions += 1
+
+    @staticmethod
+    def unregister_session(session: GatewaySession) -> None:
+        """Stop routing a closed session's orders (the orders themselves stay working)"""
+        OrderGatewayService._sessions -= 1
+        for order_id in list(session.orders):
+            OrderGatewayService.unroute_order(order_id)
+
+    @staticmethod
+    def record_latency(kind: str, received_ns: int) -> int:
+        """Record receive-to-response latency and return it in microseconds"""
+        latency_us = (time.perf_counter_ns() - received_ns) // 1000
+        OrderGatewayService._histograms[kind].record(latency_us)
+        return latency_us
+
+    @staticmethod
+    def get_stats() -> Dict[str, Any]:
+        return {
+            "sessions": OrderGatewayService._sessions,
+            "routed_orders": len(OrderGatewayService._routes),
+            "latency": {kind: h.summary() for kind, h in OrderGatewayService._histograms.items()}
+        }
+
+    # ============= ORDER ACTIONS =============
+
+    @staticmethod
+    def cancel_order(order_id: str, instrument_id: str) -> bool:
+        """
+        Cancel a working order with a single conditional UPDATE
+
+        Returns:
+            True if the order was cancelled, False if it was no longer working
+        """
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                update(OrderHdr)
+                .where(OrderHdr.order_id == order_id, OrderHdr.status.in_(WORKING_STATUSES))
+                .values(status="CANCELLED")
+            )
+            db.commit()
+        finally:
+            db.close()
+        if not result.rowcount:
+            return False
+        publish_event(EventType.ORDER_CANCELLED, {"order_id": order_id, "instrument_id": instrument_id}, "order_gateway")
+        return True
+
+    @staticmethod
+    def replace_order(order: Dict[str, Any], qty: int, price: Optional[float]) -> bool:
+        """
+        Amend quantity and price of a working order in place
+
+        Returns:
+            True if the order was replaced, False if it was no longer working
+        """
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                update(OrderHdr)
+                .where(OrderHdr.order_id == order["order_id"], OrderHdr.status.in_(WORKING_STATUSES))
+                .values(qty=qty, limit_price=price)
+            )
+            db.commit()
+        finally:
+            db.close()
+        if not result.rowcount:
+            return False
+        publish_event(EventType.ORDER_UPDATED, {
+            "order_id": order["order_id"],
+            "instrument_id": order["instrument_id"],
+            "side": order["side"],
+            "qty": qty,
+            "price": price,
+            "type": order["type"]
+        }, "order_gateway")
+        return True
+
+    # ============= EVENT HANDLERS =============
+
+    @staticmethod
+    def on_order_filled(event: Event) -> None:
+        data = event.data
+        session = OrderGatewayService._routes.get(data["order_id"])
+        if session is not None:
+            # Session state is owned by its event loop; fills may be published from any thread
+            session.loop.call_soon_threadsafe(
+                session.on_fill, data["order_id"], data.get("fill_qty"), float(data.get("price") or 0.0)
+            )
+
+    @staticmethod
+    def register_event_handlers() -> None:
+        """Subscribe to fills so they are reported on the owning session (idempotent)"""
+        if OrderGatewayService._registered:
+            return
+        event_bus.subscribe(EventType.ORDER_FILLED, OrderGatewayService.on_order_filled)
+        OrderGatewayService._registered = True
@@ -0,0 +1,8 @@
+"""
+Order Intake Module
+Queues validated orders and group-commits them to order_hdr in micro-batches.
+"""
+
+from app.modules.order_intake.service import OrderIntakeQueue, order_intake, validate_order, format_order, publish_order_created
+
+__all__ = ['OrderIntakeQueue', 'order_intake', 'validate_order', 'format_order', 'publish_order_created']
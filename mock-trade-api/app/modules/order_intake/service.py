@@ -0,0 +1,331 @@
+"""
+Order Intake Module - Service Layer
+Accepts orders on the request path and group-commits them to order_hdr from a
+background writer, so throughput scales with batch size rather than commits/sec.
+"""
+
+from concurrent.futures import Future, InvalidStateError
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from datetime import datetime
+import asyncio
+import queue
+import threading
+import time
+import uuid
+import logging
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core import (
+    settings, SessionLocal, publish_event, EventType,
+    OrderSide, OrderType, TimeInForce, InvalidOrderError, OrderQueueFullError
+)
+from app.models import OrderHdr
+from app.modules.static_data.cache import static_data_cache
+
+logger = logging.getLogger(__name__)
+
+VALID_SIDES = {s.value for s in OrderSide}
+VALID_TYPES = {t.value for t in OrderType}
+VALID_TIFS = {t.value for t in TimeInForce}
+REQUIRED_FIELDS = ("instrument", "side", "qty", "type", "tif", "trader")
+
+# Sentinel placed on the queue to stop the writer
+_STOP = object()
+
+
+def validate_order(order: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate an order payload against cached static data and build its order_hdr row.
+    The order id is assigned here, before the row is persisted.
+
+    Raises:
+        InvalidOrderError: If the payload is malformed or references unknown static data
+    """
+    missing = [field for field in REQUIRED_FIELDS if order.get(field) in (None, "")]
+    if missing:
+        raise InvalidOrderError(f"Missing required fields: {', '.join(missing)}")
+
+    side = str(order["side"]).upper()
+    order_type = str(order["type"]).upper()
+    tif = str(order["tif"]).upper()
+    if side not in VALID_SIDES:
+        raise InvalidOrderError(f"Invalid side '{order['side']}'")
+    if order_type not in VALID_TYPES:
+        raise InvalidOrderError(f"Invalid order type '{order['type']}'")
+    if tif not in VALID_TIFS:
+        raise InvalidOrderError(f"Invalid time in force '{order['tif']}'")
+
+    try:
+        qty = int(float(order["qty"]))
+        price = float(order["price"]) if order.get("price") not in (None, "") else None
+    except (TypeError, ValueError):
+        raise InvalidOrderError("Quantity and price must be numeric")
+    if qty <= 0:
+        raise InvalidOrderError("Quantity must be greater than zero")
+    if order_type == OrderType.LIMIT.value and (price is None or price <= 0):
+        raise InvalidOrderError("LIMIT orders require a positive price")
+
+    instrument_id = order["instrument"]
+    trader_id = order["trader"]
+    account_id = order.get("account") or None
+    if static_data_cache.get_instrument(instrument_id) is None:
+        raise InvalidOrderError(f"Unknown instrument '{instrument_id}'")
+    if static_data_cache.get_trader(trader_id) is None:
+        raise InvalidOrderError(f"Unknown trader '{trader_id}'")
+    if account_id and static_data_cache.get_account(account_id) is None:
+        raise InvalidOrderError(f"Unknown account '{account_id}'")
+
+    return {
+        "order_id": str(uuid.uuid4()),
+        "instrument_id": instrument_id,
+        "side": side,
+        "qty": qty,
+        "limit_price": price,
+        "type": order_type,
+        "tif": tif,
+        "trader_id": trader_id,
+        "account_id": account_id,
+        "status": "NEW",
+        "created_at": datetime.utcnow()
+    }
+
+
+def format_order(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Render an order_hdr row in the legacy order API shape, resolving codes from cache"""
+    return {
+        "id": row["order_id"],
+        "instrument": static_data_cache.instrument_symbol(row["instrument_id"]),
+        "side": row["side"],
+        "qty": row["qty"],
+        "price": float(row["limit_price"]) if row["limit_price"] is not None else None,
+        "type": row["type"],
+        "tif": row["tif"],
+        "trader": static_data_cache.trader_user_id(row["trader_id"]),
+        "account": static_data_cache.account_code(row["account_id"]),
+        "status": row["status"],
+        "created_at": str(row["created_at"])
+    }
+
+
+class PendingOrder:
+    """An accepted order waiting for its batch to commit"""
+    __slots__ = ("row", "future", "enqueued_at")
+
+    def __init__(self, row: Dict[str, Any]):
+        self.row = row
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class OrderIntakeQueue:
+    """
+    Bounded intake queue drained by a single writer thread.
+
+    The writer takes the first waiting order, collects more until either
+    `batch_size` orders are queued or `max_wait_ms` has elapsed, inserts the
+    batch with one executemany and commits once. Each submitter's future
+    resolves only after that commit, so a response always means durable.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        max_wait_ms: float,
+        max_queue_size: int,
+        session_factory: Callable = SessionLocal
+    ):
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._session_factory = session_factory
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {
+            "orders_committed": 0,
+            "orders_failed": 0,
+            "batches": 0,
+            "max_batch_size": 0,
+            "last_batch_size": 0,
+            "last_commit_ms": 0.0,
+            "total_commit_ms": 0.0,
+            "total_latency_ms": 0.0
+        }
+
+    # ============= LIFECYCLE =============
+
+    def start(self) -> None:
+        """Start the writer thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="order-intake-writer", daemon=True)
+            self._thread.start()
+            logger.info(f"Order intake writer started (batch_size={self.batch_size}, max_wait={self.max_wait * 1000:.1f}ms)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush queued orders and stop the writer"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        logger.info("Order intake writer stopped")
+
+    # ============= SUBMISSION =============
+
+    def submit(self, order: Dict[str, Any]) -> Future:
+        """
+        Validate and enqueue an order
+
+        Returns:
+            Future resolving to the formatted order once its batch is committed
+
+        Raises:
+            InvalidOrderError: If validation fails
+            OrderQueueFullError: If the queue is at capacity
+        """
+        return self.submit_row(validate_order(order))
+
+    def submit_row(self, row: Dict[str, Any]) -> Future:
+        """Enqueue an already validated order_hdr row"""
+        self.start()
+        pending = PendingOrder(row)
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            raise OrderQueueFullError("Order intake queue is full, retry later")
+        return pending.future
+
+    async def submit_async(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Submit an order and await its durable acknowledgement without blocking the event loop.
+        Validation may reload the static data cache from the database, so it runs in the threadpool.
+        """
+        row = await run_in_threadpool(validate_order, order)
+        return await asyncio.wrap_future(self.submit_row(row))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Throughput and batching statistics"""
+        stats = dict(self.stats)
+        batches = stats["batches"] or 1
+        committed = stats["orders_committed"] or 1
+        stats["queue_depth"] = self._queue.qsize()
+        stats["avg_batch_size"] = round(stats["orders_committed"] / batches, 2)
+        stats["avg_commit_ms"] = round(stats.pop("total_commit_ms") / batches, 3)
+        stats["avg_latency_ms"] = round(stats.pop("total_latency_ms") / committed, 3)
+        return stats
+
+    # ============= WRITER =============
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.batch_size:
+                try:
+                    # Drain whatever is already queued, then wait out the window
+                    timeout = deadline - time.perf_counter()
+                    item = self._queue.get_nowait() if timeout <= 0 else self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                self._flush(batch)
+            except Exception as e:
+                logger.error(f"Order intake flush failed: {e}", exc_info=True)
+                for pending in batch:
+                    if not pending.future.done():
+                        _resolve(pending.future, error=e)
+
+    def _flush(self, batch: List[PendingOrder]) -> None:
+        """Insert and commit a batch, falling back to row-by-row to isolate bad orders"""
+        started = time.perf_counter()
+        db = self._session_factory()
+        try:
+            try:
+                db.execute(OrderHdr.__table__.insert(), [p.row for p in batch])
+                db.commit()
+                committed, failed = batch, []
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Batch insert of {len(batch)} orders failed ({e}); retrying individually")
+                committed, failed = self._insert_individually(db, batch)
+        finally:
+            db.close()
+
+        finished = time.perf_counter()
+        commit_ms = (finished - started) * 1000
+        self.stats["batches"] += 1
+        self.stats["orders_committed"] += len(committed)
+        self.stats["orders_failed"] += len(failed)
+        self.stats["last_batch_size"] = len(batch)
+        self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(batch))
+        self.stats["last_commit_ms"] = round(commit_ms, 3)
+        self.stats["total_commit_ms"] += commit_ms
+
+        for pending, error in failed:
+            _resolve(pending.future, error=InvalidOrderError(f"Order could not be persisted: {error}"))
+
+        for pending in committed:
+            self.stats["total_latency_ms"] += (finished - pending.enqueued_at) * 1000
+            # The row is committed whether or not its submitter is still waiting
+            publish_order_created(pending.row)
+            if not pending.future.cancelled():
+                _resolve(pending.future, format_order(pending.row))
+
+    def _insert_individually(self, db, batch: List[PendingOrder]) -> Tuple[List[PendingOrder], List[Tuple[PendingOrder, Exception]]]:
+        committed, failed = [], []
+        for pending in batch:
+            try:
+                db.execute(OrderHdr.__table__.insert(), [pending.row])
+                db.commit()
+                committed.append(pending)
+            except Exception as e:
+                db.rollback()
+                failed.append((pending, e))
+        return committed, failed
+
+
+def _resolve(future: Future, result: Any = None, error: Optional[Exception] = None) -> None:
+    """Complete a submitter's future; one cancelled by its submitter (e.g. a dropped request) is left alone"""
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+def publish_order_created(row: Dict[str, Any]) -> None:
+    """Publish ORDER_CREATED for a committed order_hdr row so in-memory consumers (order book) can track it"""
+    publish_event(EventType.ORDER_CREATED, {
+        "order_id": row["order_id"],
+        "instrument_id": row["instrument_id"],
+        "side": row["side"],
+        "qty": row["qty"],
+        "price": float(row["limit_price"]) if row["limit_price"] is not None else None,
+        "type": row["type"],
+        "trader_id": row["trader_id"],
+        "account_id": row["account_id"]
+    }, "order")
+
+
+# Global intake queue
+order_intake = OrderIntakeQueue(
+    batch_size=settings.order_batch_size,
+    max_wait_ms=settings.order_batch_max_wait_ms,
+    max_queue_size=settings.order_queue_max_size
+)
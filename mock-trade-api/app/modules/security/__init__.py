@@ -6,6 +6,8 @@ from app.modules.security.schemas import (
     RoleCreate, PermissionCreate, RolePermissionMappingCreate
 )
 from app.modules.security.service import SecurityService
+from app.modules.security.permissions import PermissionCache, CompiledPermissions, permission_cache
+from app.modules.security.dependencies import require, get_token_claims, permission_claims
 from app.modules.security.routes import router
 
 # Aliases for consistency
@@ -27,5 +29,11 @@ __all__ = [
     'PermissionCreate',
     'PermissionCreateSchema',
     'SecurityService',
+    'PermissionCache',
+    'CompiledPermissions',
+    'permission_cache',
+    'require',
+    'get_token_claims',
+    'permission_claims',
     'router',
 ]
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Security Module - Route Dependencies
+Stateless permission enforcement from access token claims. Login embeds the
+user's compiled permission bitset, so authorizing a request is a signature
+check and a bit test rather than RBAC queries.
+"""
+
+from fastapi import Depends, HTTPException, Response, status
+import jwt
+
+from app.modules.auth.middleware import oauth2_scheme, token_cache, SECRET_KEY, ALGORITHM
+from app.modules.security.permissions import permission_cache
+
+
+def permission_claims(user_id: str, role: str) -> dict:
+    """
+    Token claims carrying the user's compiled permission bitset ("perms") and
+    the digest of the security configuration it was compiled from ("sv")
+    """
+    snapshot = permission_cache.current()
+    bits = snapshot.subject_bits(user_id, role)
+    return {"uid": user_id, "perms": permission_cache.encode_bits(bits), "sv": snapshot.digest}
+
+
+def get_token_claims(token: str = Depends(oauth2_scheme)) -> dict:
+    """Verified JWT claims (cached per token, no user lookup)"""
+    try:
+        payload = token_cache.decode(token)
+    except jwt.PyJWTError:
+        payload = None
+    if not payload or payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+
+def require(module_name: str, permission_name: str):
+    """
+    Route dependency enforcing a module permission from the token claims
+
+    A token minted under the current security configuration is checked with a
+    bit test on its own claims. A token from an older configuration is
+    re-derived from the in-memory permission cache (still no query) and a
+    refreshed token, with the original expiry, is returned in the
+    X-Refreshed-Token response header for the client to swap in.
+
+    Usage:
+        @router.post("/roles", dependencies=[Depends(require("Security", "READ_WRITE"))])
+    """
+    def dependency(response: Response, claims: dict = Depends(get_token_claims)) -> dict:
+        snapshot = permission_cache.current()
+        if claims.get("sv") == snapshot.digest and "perms" in claims:
+            bits = permission_cache.decode_bits(claims["perms"])
+        else:
+            bits = snapshot.subject_bits(claims.get("uid"), claims.get("role"))
+            claims = {**claims, "perms": permission_cache.encode_bits(bits), "sv": snapshot.digest}
+            response.headers["X-Refreshed-Token"] = jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+        if not snapshot.permitted(bits, module_name, permission_name):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Permission denied. Required: {permission_name} on {module_name}"
+            )
+        return claims
+
+    return dependency
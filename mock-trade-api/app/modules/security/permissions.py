@@ -0,0 +1,266 @@
+"""
+Security Module - Compiled Permissions
+Flattens user roles, role-permission mappings, modules and permissions into
+one bitset per user so a permission check is a dict lookup and a bit test.
+"""
+
+from sqlalchemy.orm import Session
+from typing import Dict, Optional, Tuple
+from collections import defaultdict
+import threading
+import hashlib
+import base64
+import time
+import logging
+
+from app.core import settings, SessionLocal
+from app.models import Role, Permission, Module, RolePermissionMapping, UserRole
+
+logger = logging.getLogger(__name__)
+
+# Mappings on this module grant their permission on every module
+ALL_MODULE = "All"
+# A READ_WRITE grant also satisfies READ checks
+READ_WRITE = "READ_WRITE"
+READ = "READ"
+
+
+class CompiledPermissions:
+    """
+    One compile of the security configuration: the module and permission
+    indexes, the role and user bitsets built over them, and the digest and
+    version they were compiled under. Never modified after construction, so
+    a reader holding one sees a consistent configuration.
+    """
+
+    __slots__ = ("version", "digest", "module_index", "permission_index", "user_bits", "role_bits", "loaded_at")
+
+    def __init__(
+        self,
+        version: int = 0,
+        digest: Optional[str] = None,
+        module_index: Optional[Dict[str, int]] = None,
+        permission_index: Optional[Dict[str, int]] = None,
+        user_bits: Optional[Dict[str, int]] = None,
+        role_bits: Optional[Dict[str, int]] = None,
+        loaded_at: float = 0.0
+    ):
+        self.version = version
+        self.digest = digest
+        self.module_index = module_index or {}
+        self.permission_index = permission_index or {}
+        self.user_bits = user_bits or {}
+        self.role_bits = role_bits or {}
+        self.loaded_at = loaded_at
+
+    def bit(self, module_name: str, permission_name: str) -> Optional[int]:
+        """Bit position of (module, permission), or None if either is unknown"""
+        module = self.module_index.get(module_name)
+        permission = self.permission_index.get(permission_name)
+        if module is None or permission is None:
+            return None
+        return module * len(self.permission_index) + permission
+
+    def subject_bits(self, user_id: Optional[str], role_name: Optional[str] = None) -> int:
+        """Bitset of a user's role assignments plus the role they signed in with"""
+        return self.user_bits.get(user_id, 0) | self.role_bits.get(role_name, 0)
+
+    def permitted(self, bits: int, module_name: str, permission_name: str) -> bool:
+        """Bit test of a bitset compiled from this configuration"""
+        bit = self.bit(module_name, permission_name)
+        return bit is not None and bool(bits >> bit & 1)
+
+
+class PermissionCache:
+    """
+    Per-user permission bitsets over (module x permission).
+
+    Bit module_index * permission_count + permission_index is set when one of
+    the user's ACTIVE roles has an ACTIVE mapping granting that permission on
+    that module, either directly or through the "All" module, with READ_WRITE
+    implying READ. The rules are applied once per compile, not per check.
+
+    Security writes call invalidate(), which bumps the version; the next check
+    recompiles. The snapshot is also recompiled when older than the TTL so
+    writes made outside this process are picked up (bumping the version if
+    anything changed). Each compile builds a new CompiledPermissions and
+    publishes it with a single assignment; checks read the snapshot once, so
+    they never take a lock or mix indexes and bits from different compiles.
+
+    The digest is a content hash of the compiled configuration. Unlike the
+    version it is the same in every process, so it is what access tokens carry
+    to show which configuration their embedded permission bits were taken from.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.version = 1
+        self.snapshot = CompiledPermissions()
+        self._compile_lock = threading.Lock()
+        self.stats = {"compiles": 0, "checks": 0, "compile_ms": None}
+
+    def compile(self, db: Optional[Session] = None) -> None:
+        """Rebuild all user bitsets in four queries"""
+        owns_session = db is None
+        db = db or SessionLocal()
+        version = self.version
+        started = time.perf_counter()
+        try:
+            module_index = {
+                name: i for i, (name,) in enumerate(db.query(Module.module_name).order_by(Module.module_name))
+            }
+            permission_index = {
+                name: i for i, (name,) in enumerate(
+                    db.query(Permission.permission_name).order_by(Permission.permission_name)
+                )
+            }
+            mappings = (
+                db.query(Role.role_name, Module.module_name, Permission.permission_name)
+                .select_from(RolePermissionMapping)
+                .join(Role, Role.role_id == RolePermissionMapping.role_id)
+                .join(Module, Module.module_id == RolePermissionMapping.module_id)
+                .join(Permission, Permission.permission_id == RolePermissionMapping.permission_id)
+                .filter(RolePermissionMapping.status == "ACTIVE")
+                .all()
+            )
+            user_roles = (
+                db.query(UserRole.user_id, Role.role_name)
+                .select_from(UserRole)
+                .join(Role, Role.role_id == UserRole.role_id)
+                .filter(UserRole.status == "ACTIVE")
+                .all()
+            )
+        finally:
+            if owns_session:
+                db.close()
+
+        width = len(permission_index)
+        row_mask = (1 << width) - 1
+        # One set bit per module row at each row's offset: multiplying a row by it copies the row to every module
+        every_row = sum(1 << (i * width) for i in range(len(module_index)))
+
+        role_bits: Dict[str, int] = defaultdict(int)
+        for role_name, module_name, permission_name in mappings:
+            role_bits[role_name] |= 1 << (module_index[module_name] * width + permission_index[permission_name])
+
+        all_index = module_index.get(ALL_MODULE)
+        read_index = permission_index.get(READ)
+        read_write_index = permission_index.get(READ_WRITE)
+        for role_name, bits in role_bits.items():
+            if all_index is not None:
+                bits |= ((bits >> (all_index * width)) & row_mask) * every_row
+            if read_index is not None and read_write_index is not None:
+                read_write_bits = bits & (every_row << read_write_index)
+                bits |= (read_write_bits >> read_write_index) << read_index
+            role_bits[role_name] = bits
+
+        user_bits: Dict[str, int] = {}
+        for user_id, role_name in user_roles:
+            user_bits[user_id] = user_bits.get(user_id, 0) | role_bits.get(role_name, 0)
+
+        content = hashlib.sha256(repr((
+            list(module_index), list(permission_index),
+            sorted(tuple(row) for row in mappings), sorted(tuple(row) for row in user_roles)
+        )).encode()).hexdigest()[:16]
+        # A TTL reload that finds changes made by another process moves the version on,
+        # so ETags derived from it change too
+        previous = self.snapshot.digest
+        if previous is not None and content != previous and version == self.version:
+            self.version = version = version + 1
+
+        self.snapshot = CompiledPermissions(
+            version, content, module_index, permission_index, user_bits, dict(role_bits), time.monotonic()
+        )
+        self.stats["compiles"] += 1
+        self.stats["compile_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        logger.info(
+            f"Compiled permissions v{version}: {len(user_bits)} users, {len(module_index)} modules, "
+            f"{len(permission_index)} permissions, {len(role_bits)} roles"
+        )
+
+    def invalidate(self) -> None:
+        """Recompile on the next check (call after any security write)"""
+        self.version += 1
+
+    def is_stale(self) -> bool:
+        """True if the next check will recompile (lets async callers move that to a thread)"""
+        snapshot = self.snapshot
+        return snapshot.version != self.version or time.monotonic() - snapshot.loaded_at >= self.ttl_seconds
+
+    def ensure_current(self, db: Optional[Session] = None) -> None:
+        """Recompile if invalidated since the last compile or older than the TTL"""
+        if not self.is_stale():
+            return
+        with self._compile_lock:
+            if self.is_stale():
+                self.compile(db)
+
+    def current(self, db: Optional[Session] = None) -> CompiledPermissions:
+        """The current snapshot, recompiled first if stale"""
+        self.ensure_current(db)
+        return self.snapshot
+
+    def etag(self, db: Optional[Session] = None) -> str:
+        """Validator for responses derived from the security configuration"""
+        return f'W/"security-{self.current(db).version}"'
+
+    def check(
+        self,
+        user_id: str,
+        module_name: str,
+        permission_name: str,
+        db: Optional[Session] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Check one permission
+
+        Returns:
+            (has_permission, reason) where reason explains a denial caused by an
+            unknown user, module or permission
+        """
+        snapshot = self.current(db)
+        self.stats["checks"] += 1
+        bits = snapshot.user_bits.get(user_id)
+        if bits is None:
+            return False, "User has no active roles"
+        if module_name not in snapshot.module_index:
+            return False, "Module not found"
+        if permission_name not in snapshot.permission_index:
+            return False, "Permission type not found"
+        return snapshot.permitted(bits, module_name, permission_name), None
+
+    def has_permission(self, user_id: str, module_name: str, permission_name: str) -> bool:
+        return self.check(user_id, module_name, permission_name)[0]
+
+    def subject_bits(self, user_id: Optional[str], role_name: Optional[str] = None) -> int:
+        """Bitset of a user's role assignments plus the role they signed in with"""
+        return self.current().subject_bits(user_id, role_name)
+
+    def permitted(self, bits: int, module_name: str, permission_name: str) -> bool:
+        """Bit test of a bitset compiled from the current configuration"""
+        return self.snapshot.permitted(bits, module_name, permission_name)
+
+    @staticmethod
+    def encode_bits(bits: int) -> str:
+        """Compact token claim form of a bitset (unpadded base64url, little-endian)"""
+        return base64.urlsafe_b64encode(bits.to_bytes((bits.bit_length() + 7) // 8, "little")).rstrip(b"=").decode()
+
+    @staticmethod
+    def decode_bits(claim: str) -> int:
+        return int.from_bytes(base64.urlsafe_b64decode(claim + "=" * (-len(claim) % 4)), "little")
+
+    def get_stats(self) -> Dict[str, object]:
+        snapshot = self.snapshot
+        return {
+            **self.stats,
+            "version": self.version,
+            "compiled_version": snapshot.version,
+            "digest": snapshot.digest,
+            "users": len(snapshot.user_bits),
+            "modules": len(snapshot.module_index),
+            "permissions": len(snapshot.permission_index),
+        }
+
+
+# Global permission cache
+permission_cache = PermissionCache(ttl_seconds=settings.permission_cache_ttl_seconds)
@@ -1,11 +1,13 @@
 """Security module routes for RBAC management"""
 import uuid
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, select
 
-from app.core import get_db
+from app.core import get_db, get_async_db
 from app.models import (
     Role, Permission, Module, RolePermissionMapping, UserRole, Trader
 )
@@ -19,14 +21,19 @@ from app.modules.security.schemas import (
     UserRoleDetailSchema, RolePermissionDetailSchema,
     SecurityConfigSchema, UserSecurityContextSchema
 )
+from app.modules.security.permissions import permission_cache
+from app.modules.security.dependencies import require
 from app.modules.auth.middleware import get_current_user
 
 router = APIRouter(prefix="/api/v1/security", tags=["security"])
 
+# Changing the security configuration needs READ_WRITE on the Security module
+WRITE_ACCESS = [Depends(require("Security", "READ_WRITE"))]
+
 
 # ============ ROLES ENDPOINTS ============
 
-@router.post("/roles", response_model=RoleSchema)
+@router.post("/roles", response_model=RoleSchema, dependencies=WRITE_ACCESS)
 def create_role(role: RoleCreate, db: Session = Depends(get_db)):
     """Create a new role"""
     # Check if role already exists
@@ -43,6 +50,7 @@ def create_role(role: RoleCreate, db: Session = Depends(get_db)):
     )
     db.add(db_role)
     db.commit()
+    permission_cache.invalidate()
     db.refresh(db_role)
     return db_role
 
@@ -65,7 +73,7 @@ def get_role(role_id: str, db: Session = Depends(get_db)):
     return role
 
 
-@router.put("/roles/{role_id}", response_model=RoleSchema)
+@router.put("/roles/{role_id}", response_model=RoleSchema, dependencies=WRITE_ACCESS)
 def update_role(role_id: str, role_update: RoleUpdate, db: Session = Depends(get_db)):
     """Update a role"""
     db_role = db.query(Role).filter(Role.role_id == role_id).first()
@@ -78,11 +86,12 @@ def update_role(role_id: str, role_update: RoleUpdate, db: Session = Depends(get
         db_role.status = role_update.status
 
     db.commit()
+    permission_cache.invalidate()
     db.refresh(db_role)
     return db_role
 
 
-@router.delete("/roles/{role_id}")
+@router.delete("/roles/{role_id}", dependencies=WRITE_ACCESS)
 def delete_role(role_id: str, db: Session = Depends(get_db)):
     """Delete a role"""
     db_role = db.query(Role).filter(Role.role_id == role_id).first()
@@ -94,13 +103,14 @@ def delete_role(role_id: str, db: Session = Depends(get_db)):
     db.query(UserRole).filter(UserRole.role_id == role_id).delete()
     db.delete(db_role)
     db.commit()
+    permission_cache.invalidate()
 
     return {"message": "Role deleted successfully"}
 
 
 # ============ PERMISSIONS ENDPOINTS ============
 
-@router.post("/permissions", response_model=PermissionSchema)
+@router.post("/permissions", response_model=PermissionSchema, dependencies=WRITE_ACCESS)
 def create_permission(permission: PermissionCreate, db: Session = Depends(get_db)):
     """Create a new permission"""
     # Check if permission already exists
@@ -117,6 +127,7 @@ def create_permission(permission: PermissionCreate, db: Session = Depends(get_db
     )
     db.add(db_permission)
     db.commit()
+    permission_cache.invalidate()
     db.refresh(db_permission)
     return db_permission
 
@@ -139,7 +150,7 @@ def get_permission(permission_id: str, db: Session = Depends(get_db)):
     return permission
 
 
-@router.put("/permissions/{permission_id}", response_model=PermissionSchema)
+@router.put("/permissions/{permission_id}", response_model=PermissionSchema, dependencies=WRITE_ACCESS)
 def update_permission(permission_id: str, permission_update: PermissionUpdate, db: Session = Depends(get_db)):
     """Update a permission"""
     db_permission = db.query(Permission).filter(Permission.permission_id == permission_id).first()
@@ -152,13 +163,14 @@ def update_permission(permission_id: str, permission_update: PermissionUpdate, d
         db_permission.status = permission_update.status
 
     db.commit()
+    permission_cache.invalidate()
     db.refresh(db_permission)
     return db_permission
 
 
 # ============ MODULES ENDPOINTS ============
 
-@router.post("/modules", response_model=ModuleSchema)
+@router.post("/modules", response_model=ModuleSchema, dependencies=WRITE_ACCESS)
 def create_module(module: ModuleCreate, db: Session = Depends(get_db)):
     """Create a new module"""
     # Check if module already exists
@@ -175,6 +187,7 @@ def create_module(module: ModuleCreate, db: Session = Depends(get_db)):
     )
     db.add(db_module)
     db.commit()
+    permission_cache.invalidate()
     db.refresh(db_module)
     return db_module
 
@@ -197,7 +210,7 @@ def get_module(module_id: str, db: Session = Depends(get_db)):
     return module
 
 
-@router.put("/modules/{module_id}", response_model=ModuleSchema)
+@router.put("/modules/{module_id}", response_model=ModuleSchema, dependencies=WRITE_ACCESS)
 def update_module(module_id: str, module_update: ModuleUpdate, db: Session = Depends(get_db)):
     """Update a module"""
     db_module = db.query(Module).filter(Module.module_id == module_id).first()
@@ -210,13 +223,14 @@ def update_module(module_id: str, module_update: ModuleUpdate, db: Session = Dep
         db_module.status = module_update.status
 
     db.commit()
+    permission_cache.invalidate()
     db.refresh(db_module)
     return db_module
 
 
 # ============ ROLE PERMISSION MAPPING ENDPOINTS ============
 
-@router.post("/role-permissions", response_model=RolePermissionMappingSchema)
+@router.post("/role-permissions", response_model=RolePermissionMappingSchema, dependencies=WRITE_ACCESS)
 def create_role_permission(mapping: RolePermissionMappingCreate, db: Session = Depends(get_db)):
     """Create a role-permission mapping for a module"""
     # Validate role, module, and permission exist
@@ -252,6 +266,7 @@ def create_role_permission(mapping: RolePermissionMappingCreate, db: Session = D
     )
     db.add(db_mapping)
     db.commit()
+    permission_cache.invalidate()
     db.refresh(db_mapping)
     return db_mapping
 
@@ -287,7 +302,7 @@ def list_role_permissions(role_id: str = None, module_id: str = None, db: Sessio
     ]
 
 
-@router.put("/role-permissions/{mapping_id}", response_model=RolePermissionMappingSchema)
+@router.put("/role-permissions/{mapping_id}", response_model=RolePermissionMappingSchema, dependencies=WRITE_ACCESS)
 def update_role_permission(mapping_id: str, mapping_update: RolePermissionMappingUpdate, db: Session = Depends(get_db)):
     """Update a role-permission mapping"""
     db_mapping = db.query(RolePermissionMapping).filter(RolePermissionMapping.mapping_id == mapping_id).first()
@@ -305,11 +320,12 @@ def update_role_permission(mapping_id: str, mapping_update: RolePermissionMappin
         db_mapping.status = mapping_update.status
 
     db.commit()
+    permission_cache.invalidate()
     db.refresh(db_mapping)
     return db_mapping
 
 
-@router.delete("/role-permissions/{mapping_id}")
+@router.delete("/role-permissions/{mapping_id}", dependencies=WRITE_ACCESS)
 def delete_role_permission(mapping_id: str, db: Session = Depends(get_db)):
     """Delete a role-permission mapping"""
     db_mapping = db.query(RolePermissionMapping).filter(RolePermissionMapping.mapping_id == mapping_id).first()
@@ -318,12 +334,13 @@ def delete_role_permission(mapping_id: str, db: Session = Depends(get_db)):
 
     db.delete(db_mapping)
     db.commit()
+    permission_cache.invalidate()
     return {"message": "Role-permission mapping deleted successfully"}
 
 
 # ============ USER ROLE ENDPOINTS ============
 
-@router.post("/user-roles", response_model=UserRoleSchema)
+@router.post("/user-roles", response_model=UserRoleSchema, dependencies=WRITE_ACCESS)
 def assign_user_role(user_role: UserRoleCreate, db: Session = Depends(get_db)):
     """Assign a role to a user"""
     # Validate user and role exist
@@ -346,6 +363,7 @@ def assign_user_role(user_role: UserRoleCreate, db: Session = Depends(get_db)):
     )
     db.add(db_user_role)
     db.commit()
+    permission_cache.invalidate()
     db.refresh(db_user_role)
     return db_user_role
 
@@ -362,58 +380,69 @@ def list_user_roles(user_id: str = None, role_id: str = None, db: Session = Depe
 
 
 @router.get("/user-roles/{user_id}", response_model=list[UserRoleDetailSchema])
-def get_user_security_context(user_id: str, db: Session = Depends(get_db)):
-    """Get user's roles and permissions"""
-    user = db.query(Trader).filter(Trader.trader_id == user_id).first()
-    if not user:
+async def get_user_security_context(
+    user_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get user's roles and permissions
+
+    Built in one joined query. The ETag is the security configuration version,
+    so a client revalidating with If-None-Match gets 304 Not Modified without
+    a database query until a security write changes it.
+    """
+    if permission_cache.is_stale():
+        await run_in_threadpool(permission_cache.ensure_current)
+    etag = permission_cache.etag()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+    rows = (await db.execute(select(
+        Trader.name,
+        UserRole.user_role_id,
+        Role.role_id,
+        Role.role_name,
+        RolePermissionMapping.mapping_id,
+        Module.module_name,
+        Permission.permission_name,
+        RolePermissionMapping.status
+    ).outerjoin(
+        UserRole, and_(UserRole.user_id == Trader.trader_id, UserRole.status == "ACTIVE")
+    ).outerjoin(Role, Role.role_id == UserRole.role_id).outerjoin(
+        RolePermissionMapping,
+        and_(RolePermissionMapping.role_id == Role.role_id, RolePermissionMapping.status == "ACTIVE")
+    ).outerjoin(Module, Module.module_id == RolePermissionMapping.module_id).outerjoin(
+        Permission, Permission.permission_id == RolePermissionMapping.permission_id
+    ).where(Trader.trader_id == user_id).order_by(
+        UserRole.assigned_at, UserRole.user_role_id, Module.module_name
+    ))).all()
+    if not rows:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Get user roles
-    user_roles = db.query(UserRole).filter(
-        and_(UserRole.user_id == user_id, UserRole.status == "ACTIVE")
-    ).all()
-
-    result = []
-    for ur in user_roles:
-        role = db.query(Role).filter(Role.role_id == ur.role_id).first()
-        if role:
-            # Get role permissions
-            perms = db.query(
-                RolePermissionMapping.mapping_id,
-                Role.role_name,
-                Module.module_name,
-                Permission.permission_name,
-                RolePermissionMapping.status
-            ).join(Role, RolePermissionMapping.role_id == Role.role_id).join(
-                Module, RolePermissionMapping.module_id == Module.module_id
-            ).join(Permission, RolePermissionMapping.permission_id == Permission.permission_id).filter(
-                and_(
-                    RolePermissionMapping.role_id == ur.role_id,
-                    RolePermissionMapping.status == "ACTIVE"
-                )
-            ).all()
-
-            result.append(UserRoleDetailSchema(
-                user_id=user_id,
-                user_name=user.name,
-                role_id=ur.role_id,
-                role_name=role.role_name,
-                permissions=[
-                    RolePermissionDetailSchema(
-                        mapping_id=p[0],
-                        role_name=p[1],
-                        module_name=p[2],
-                        permission_name=p[3],
-                        status=p[4]
-                    )
-                    for p in perms
-                ]
+    # One entry per active assignment, in assignment order
+    contexts: dict = {}
+    for user_name, user_role_id, role_id, role_name, mapping_id, module_name, permission_name, status in rows:
+        if role_id is None:
+            continue
+        context = contexts.get(user_role_id)
+        if context is None:
+            context = contexts[user_role_id] = UserRoleDetailSchema(
+                user_id=user_id, user_name=user_name, role_id=role_id, role_name=role_name, permissions=[]
+            )
+        if module_name is not None and permission_name is not None:
+            context.permissions.append(RolePermissionDetailSchema(
+                mapping_id=mapping_id,
+                role_name=role_name,
+                module_name=module_name,
+                permission_name=permission_name,
+                status=status
             ))
 
-    return result
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return list(contexts.values())
 
 
-@router.put("/user-roles/{user_role_id}", response_model=UserRoleSchema)
+@router.put("/user-roles/{user_role_id}", response_model=UserRoleSchema, dependencies=WRITE_ACCESS)
 def update_user_role(user_role_id: str, user_role_update: UserRoleUpdate, db: Session = Depends(get_db)):
     """Update user role assignment"""
     db_user_role = db.query(UserRole).filter(UserRole.user_role_id == user_role_id).first()
@@ -430,11 +459,12 @@ def update_user_role(user_role_id: str, user_role_update: UserRoleUpdate, db: Se
         db_user_role.status = user_role_update.status
 
     db.commit()
+    permission_cache.invalidate()
     db.refresh(db_user_role)
     return db_user_role
 
 
-@router.delete("/user-roles/{user_role_id}")
+@router.delete("/user-roles/{user_role_id}", dependencies=WRITE_ACCESS)
 def remove_user_role(user_role_id: str, db: Session = Depends(get_db)):
     """Remove a role from a user"""
     db_user_role = db.query(UserRole).filter(UserRole.user_role_id == user_role_id).first()
@@ -443,6 +473,7 @@ def remove_user_role(user_role_id: str, db: Session = Depends(get_db)):
 
     db.delete(db_user_role)
     db.commit()
+    permission_cache.invalidate()
     return {"message": "User role removed successfully"}
 
 
@@ -465,84 +496,13 @@ def get_security_config(db: Session = Depends(get_db)):
 
 
 @router.get("/check-permission/{user_id}/{module_name}/{permission_type}")
-def check_user_permission(user_id: str, module_name: str, permission_type: str, db: Session = Depends(get_db)):
-    """Check if a user has a specific permission for a module"""
-    # Get user's active roles
-    user_roles = db.query(UserRole.role_id).filter(
-        and_(UserRole.user_id == user_id, UserRole.status == "ACTIVE")
-    ).all()
-
-    if not user_roles:
-        return {"has_permission": False, "message": "User has no active roles"}
-
-    role_ids = [ur[0] for ur in user_roles]
-
-    # Get module ID
-    module = db.query(Module).filter(Module.module_name == module_name).first()
-    if not module:
-        return {"has_permission": False, "message": "Module not found"}
-
-    # Get permission ID
-    permission = db.query(Permission).filter(Permission.permission_name == permission_type).first()
-    if not permission:
-        return {"has_permission": False, "message": "Permission type not found"}
-
-    # Check if any of user's roles has the required permission
-    # First check for direct module permission
-    mapping = db.query(RolePermissionMapping).filter(
-        and_(
-            RolePermissionMapping.role_id.in_(role_ids),
-            RolePermissionMapping.module_id == module.module_id,
-            RolePermissionMapping.permission_id == permission.permission_id,
-            RolePermissionMapping.status == "ACTIVE"
-        )
-    ).first()
-    
-    # If no direct permission, check for "All" module permission
-    if not mapping:
-        # Get the "All" module
-        all_module = db.query(Module).filter(Module.module_name == "All").first()
-        if all_module:
-            # Check if user has permission for "All" module
-            mapping = db.query(RolePermissionMapping).filter(
-                and_(
-                    RolePermissionMapping.role_id.in_(role_ids),
-                    RolePermissionMapping.module_id == all_module.module_id,
-                    RolePermissionMapping.permission_id == permission.permission_id,
-                    RolePermissionMapping.status == "ACTIVE"
-                )
-            ).first()
-    
-    # Also check if user has READ_WRITE permission but requesting READ (READ_WRITE includes READ)
-    if not mapping and permission_type == "READ":
-        # Check for direct READ_WRITE permission
-        read_write_perm = db.query(Permission).filter(Permission.permission_name == "READ_WRITE").first()
-        if read_write_perm:
-            mapping = db.query(RolePermissionMapping).filter(
-                and_(
-                    RolePermissionMapping.role_id.in_(role_ids),
-                    RolePermissionMapping.module_id == module.module_id,
-                    RolePermissionMapping.permission_id == read_write_perm.permission_id,
-                    RolePermissionMapping.status == "ACTIVE"
-                )
-            ).first()
-            
-            # If no direct permission, check for "All" module READ_WRITE permission
-            if not mapping:
-                # Get the "All" module
-                all_module = db.query(Module).filter(Module.module_name == "All").first()
-                if all_module:
-                    # Check if user has READ_WRITE permission for "All" module
-                    mapping = db.query(RolePermissionMapping).filter(
-                        and_(
-                            RolePermissionMapping.role_id.in_(role_ids),
-                            RolePermissionMapping.module_id == all_module.module_id,
-                            RolePermissionMapping.permission_id == read_write_perm.permission_id,
-                            RolePermissionMapping.status == "ACTIVE"
-                        )
-                    ).first()
-    
-    has_permission = mapping is not None
+async def check_user_permission(user_id: str, module_name: str, permission_type: str):
+    """Check if a user has a specific permission for a module (compiled bitset lookup)"""
+    if permission_cache.is_stale():
+        await run_in_threadpool(permission_cache.ensure_current)
+    has_permission, reason = permission_cache.check(user_id, module_name, permission_type)
+    if reason:
+        return {"has_permission": False, "message": reason}
     return {
         "has_permission": has_permission,
         "user_id": user_id,
@@ -551,3 +511,7 @@ def check_user_permission(user_id: str, module_name: str, permission_type: str,
     }
 
 
+@router.get("/permission-cache")
+def get_permission_cache_stats():
+    """Compiled permission cache version and statistics"""
+    return permission_cache.get_stats()
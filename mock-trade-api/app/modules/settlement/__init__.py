@@ -3,6 +3,10 @@ Settlement Module
 Handles settlement processing and monitoring.
 """
 
+from app.modules.settlement.calendar import HolidayBitset, SettlementCalendar, settlement_calendar
+from app.modules.settlement.service import SettlementService, NettingService
+from app.modules.settlement.stream import SettlementStream, settlement_stream
 from app.modules.settlement.routes import router
 
-__all__ = ['router']
+__all__ = ['HolidayBitset', 'SettlementCalendar', 'settlement_calendar', 'SettlementService', 'NettingService',
+           'SettlementStream', 'settlement_stream', 'router']
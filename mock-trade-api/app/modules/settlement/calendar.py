@@ -0,0 +1,158 @@
+"""
+Settlement Module - Business Day Calendars
+Holiday bitsets per calendar code and T+N value date arithmetic.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, Optional, Tuple
+from datetime import date, timedelta
+import threading
+import time
+import logging
+
+from app.core import settings, SessionLocal
+from app.models import InstrumentOTC
+from app.modules.settlement.models import CalendarHoliday
+
+logger = logging.getLogger(__name__)
+
+# Bitsets cover this many days from CALENDAR_EPOCH; dates outside fall back to weekends only
+CALENDAR_EPOCH = date(2000, 1, 1)
+CALENDAR_DAYS = 366 * 100
+
+# Calendar used when an instrument has none
+DEFAULT_CALENDAR = "WEEKEND"
+
+
+class HolidayBitset:
+    """
+    Non-business days of a calendar as one bit per day since CALENDAR_EPOCH.
+
+    Weekends are set when the bitset is created, so checking a day is a
+    single byte lookup, and joint calendars are a bytewise OR.
+    """
+
+    __slots__ = ("code", "bits")
+
+    def __init__(self, code: str, bits: Optional[bytearray] = None):
+        self.code = code
+        if bits is None:
+            bits = bytearray((CALENDAR_DAYS + 7) // 8)
+            # Saturdays and Sundays
+            first_saturday = (5 - CALENDAR_EPOCH.weekday()) % 7
+            for offset in (first_saturday, first_saturday + 1):
+                for i in range(offset, CALENDAR_DAYS, 7):
+                    bits[i >> 3] |= 1 << (i & 7)
+        self.bits = bits
+
+    def add_holidays(self, days: Iterable[date]) -> None:
+        for day in days:
+            i = (day - CALENDAR_EPOCH).days
+            if 0 <= i < CALENDAR_DAYS:
+                self.bits[i >> 3] |= 1 << (i & 7)
+
+    def is_business_day(self, day: date) -> bool:
+        i = (day - CALENDAR_EPOCH).days
+        if 0 <= i < CALENDAR_DAYS:
+            return not (self.bits[i >> 3] >> (i & 7)) & 1
+        return day.weekday() < 5
+
+    def add_business_days(self, day: date, days: int) -> date:
+        """Roll forward to a business day, then move `days` business days"""
+        while not self.is_business_day(day):
+            day += timedelta(days=1)
+        while days > 0:
+            day += timedelta(days=1)
+            if self.is_business_day(day):
+                days -= 1
+        return day
+
+    def union(self, other: "HolidayBitset") -> "HolidayBitset":
+        joined = int.from_bytes(self.bits, "little") | int.from_bytes(other.bits, "little")
+        return HolidayBitset(f"{self.code}+{other.code}", bytearray(joined.to_bytes(len(self.bits), "little")))
+
+
+class SettlementCalendar:
+    """
+    Calendars and per-instrument settlement conventions, loaded in two queries.
+
+    Instruments with an OTC row settle T+settlement_day_offset on the union of
+    their primary and secondary calendars; everything else settles
+    T+default_offset on weekends only.
+    """
+
+    def __init__(self, default_offset: int, ttl_seconds: float):
+        self.default_offset = default_offset
+        self.ttl_seconds = ttl_seconds
+        self._calendars: Dict[str, HolidayBitset] = {}
+        self._joint: Dict[Tuple[str, ...], HolidayBitset] = {}
+        # instrument_id -> (offset, calendar codes)
+        self._conventions: Dict[str, Tuple[int, Tuple[str, ...]]] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, db: Optional[Session] = None) -> None:
+        owns_session = db is None
+        db = db or SessionLocal()
+        try:
+            holidays: Dict[str, list] = {}
+            for code, holiday_date in db.execute(select(CalendarHoliday.calendar_code, CalendarHoliday.holiday_date)):
+                holidays.setdefault(code, []).append(holiday_date)
+            conventions = {}
+            for instrument_id, offset, primary, secondary in db.execute(
+                select(InstrumentOTC.instrument_id, InstrumentOTC.settlement_day_offset,
+                       InstrumentOTC.primary_calendar, InstrumentOTC.secondary_calendar)
+            ):
+                codes = tuple(sorted({code for code in (primary, secondary) if code}))
+                conventions[instrument_id] = (
+                    offset if offset is not None else self.default_offset,
+                    codes or (DEFAULT_CALENDAR,)
+                )
+        finally:
+            if owns_session:
+                db.close()
+
+        calendars = {DEFAULT_CALENDAR: HolidayBitset(DEFAULT_CALENDAR)}
+        for code, days in holidays.items():
+            bitset = calendars.setdefault(code, HolidayBitset(code))
+            bitset.add_holidays(days)
+        with self._lock:
+            self._calendars = calendars
+            self._joint = {}
+            self._conventions = conventions
+            self._loaded_at = time.monotonic()
+        logger.info(f"Settlement calendars loaded: {len(calendars)} calendars, {len(conventions)} OTC instruments")
+
+    def invalidate(self) -> None:
+        self._loaded_at = 0.0
+
+    def ensure_fresh(self) -> None:
+        if time.monotonic() - self._loaded_at >= self.ttl_seconds:
+            self.refresh()
+
+    def calendar(self, codes: Tuple[str, ...]) -> HolidayBitset:
+        """Bitset for one calendar or the union of several (unknown codes count as weekends only)"""
+        joint = self._joint.get(codes)
+        if joint is None:
+            joint = self._calendars.get(codes[0]) or HolidayBitset(codes[0])
+            for code in codes[1:]:
+                joint = joint.union(self._calendars.get(code) or HolidayBitset(code))
+            self._joint[codes] = joint
+        return joint
+
+    def convention(self, instrument_id: Optional[str]) -> Tuple[int, Tuple[str, ...]]:
+        self.ensure_fresh()
+        return self._conventions.get(instrument_id, (self.default_offset, (DEFAULT_CALENDAR,)))
+
+    def value_date(self, instrument_id: Optional[str], trade_date: date) -> date:
+        """Settlement date of a trade in an instrument executed on trade_date"""
+        offset, codes = self.convention(instrument_id)
+        return self.calendar(codes).add_business_days(trade_date, offset)
+
+
+# Global settlement calendar
+settlement_calendar = SettlementCalendar(
+    default_offset=settings.settlement_default_offset,
+    ttl_seconds=settings.static_data_cache_ttl_seconds
+)
@@ -0,0 +1,62 @@
+# Settlement Module - Models
+
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, ForeignKey, Index
+from app.core import Base
+
+
+class CalendarHoliday(Base):
+    """
+    Non-business day of a settlement calendar (weekends are implicit).
+    Calendar codes match InstrumentOTC.primary_calendar / secondary_calendar.
+    """
+    __tablename__ = "calendar_holiday"
+    calendar_code = Column(String, primary_key=True)  # e.g., "US", "EUR", "GBP"
+    holiday_date = Column(Date, primary_key=True)
+    description = Column(String, nullable=True)
+
+
+class NetSettlementInstruction(Base):
+    """
+    Net settlement instruction: all settleable trades of one
+    (account, instrument, value date, clearer) netted into one movement.
+    """
+    __tablename__ = "net_settlement_instruction"
+    __table_args__ = (
+        Index("ix_net_settlement_instruction_value_date", "value_date", "status"),
+    )
+    instruction_id = Column(String, primary_key=True)  # value_date:account_id:instrument_id:clearer[#sequence]
+    account_id = Column(String, ForeignKey("account.account_id"))
+    instrument_id = Column(String, ForeignKey("instrument.instrument_id"))
+    value_date = Column(Date, nullable=False)
+    clearer = Column(String, nullable=True)
+    clearer_leid = Column(String, nullable=True)
+    net_qty = Column(Integer)  # signed: positive = receive
+    net_cash = Column(Float)  # signed: positive = receive
+    gross_qty = Column(Integer)
+    trade_count = Column(Integer)
+    status = Column(String, default="PENDING")  # PENDING, SETTLED
+    created_at = Column(DateTime)
+
+
+class NetSettlementTrade(Base):
+    """Link from a trade to the net instruction it settles through"""
+    __tablename__ = "net_settlement_trade"
+    trade_id = Column(String, ForeignKey("trade.trade_id"), primary_key=True)
+    instruction_id = Column(String, ForeignKey("net_settlement_instruction.instruction_id"), nullable=False, index=True)
+
+
+class SettlementChange(Base):
+    """
+    Journal of trade settlement state transitions. The version increases
+    with every change, so monitors fetch and stream only the changes after
+    the last version they have seen. Writers take SettlementService.lock_journal
+    so versions become visible in commit order.
+    """
+    __tablename__ = "settlement_change"
+    version = Column(Integer, primary_key=True, autoincrement=True)
+    trade_id = Column(String, nullable=False)
+    event_type = Column(String, nullable=False)  # CREATED, UPDATED, CANCELLED, SETTLED
+    created_at = Column(DateTime)
+
+
+__all__ = ['CalendarHoliday', 'NetSettlementInstruction', 'NetSettlementTrade', 'SettlementChange']
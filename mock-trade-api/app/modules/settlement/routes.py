@@ -1,22 +1,165 @@
 """
 Settlement Module - API Routes
-Handles settlement monitoring endpoints.
+Handles settlement runs, monitoring and calendar endpoints.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
-from app.core import get_db
+from typing import Optional
+from datetime import date
+import logging
+
+from app.core import get_db, bulk_upsert, SessionLocal
+from app.core.exceptions import TradeNotFoundError, InvalidOrderError
+from app.modules.settlement.models import CalendarHoliday
+from app.modules.settlement.schemas import (
+    SettlementListSchema, SettlementSchema, HolidayCreateSchema, ValueDateSchema, NetInstructionListSchema
+)
+from app.modules.settlement.service import SettlementService, NettingService
+from app.modules.settlement.calendar import settlement_calendar
+from app.modules.settlement.stream import CHANNEL
+from app.core.websocket import manager
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/settlements", tags=["Settlement"])
 
 
-@router.get("/")
-def list_settlements(db: Session = Depends(get_db)):
-    """List all settlements"""
-    return {"settlements": [], "message": "Settlement module - to be implemented"}
+@router.get("/", response_model=SettlementListSchema)
+def list_settlements(
+    settlement_date: Optional[date] = Query(None, description="Filter by settlement date"),
+    status: Optional[str] = Query(None, description="Filter by trade status (ACTIVE, SETTLED)"),
+    since_version: Optional[int] = Query(None, ge=0, description="Return only trades changed after this version"),
+    limit: int = Query(500, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """
+    List trades by settlement date, or the changes since a version.
+
+    The response version is the point to resume from: pass it back as
+    since_version (or compare it with pushes on /ws) to receive only deltas.
+    """
+    if since_version is not None:
+        settlements, version, has_more = SettlementService.list_changes(db, since_version, limit)
+        return {"settlements": settlements, "count": len(settlements), "version": version, "has_more": has_more}
+
+    # Read the version first so changes made while listing are picked up by the next delta
+    version = SettlementService.current_version(db)
+    settlements = SettlementService.list_settlements(db, settlement_date, status, limit)
+    return {"settlements": settlements, "count": len(settlements), "version": version}
+
+
+@router.websocket("/ws")
+async def websocket_settlements_endpoint(websocket: WebSocket):
+    """
+    WebSocket stream of settlement changes.
+    Sends the current version on connect, then settlement_changes deltas
+    (or settlement_resync when a change set is too large to push).
+    """
+    await manager.connect(websocket, channel=CHANNEL)
+    try:
+        db = SessionLocal()
+        try:
+            version = SettlementService.current_version(db)
+        finally:
+            db.close()
+        await websocket.send_json({"type": "settlement_version", "version": version})
+        while True:
+            data = await websocket.receive_text()
+            if data == "ping":
+                await manager.send_personal_message("pong", websocket)
+    except WebSocketDisconnect:
+        manager.disconnect(websocket, channel=CHANNEL)
+    except Exception as e:
+        logger.error(f"WebSocket error: {e}")
+        manager.disconnect(websocket, channel=CHANNEL)
+
+
+@router.post("/run")
+def run_settlement(
+    run_date: Optional[date] = Query(None, description="Settle trades due on or before this date (defaults to today)"),
+    db: Session = Depends(get_db)
+):
+    """Settle all due trades in one set-based run"""
+    try:
+        return SettlementService.run(db, run_date or date.today())
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Settlement run failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/netting/run")
+def run_netting(
+    value_date: Optional[date] = Query(None, description="Value date to net (defaults to today)"),
+    db: Session = Depends(get_db)
+):
+    """Net settleable trades into instructions per account, instrument, value date and clearer"""
+    try:
+        return NettingService.run(db, value_date or date.today())
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Netting run failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/instructions", response_model=NetInstructionListSchema)
+def list_instructions(
+    value_date: Optional[date] = Query(None, description="Filter by value date"),
+    account_id: Optional[str] = Query(None, description="Filter by account"),
+    status: Optional[str] = Query(None, description="Filter by status (PENDING, SETTLED)"),
+    db: Session = Depends(get_db)
+):
+    """List net settlement instructions"""
+    instructions = NettingService.list_instructions(db, value_date, account_id, status)
+    return {"instructions": instructions, "count": len(instructions)}
+
+
+@router.get("/instructions/{instruction_id}/trades")
+def get_instruction_trades(instruction_id: str, db: Session = Depends(get_db)):
+    """List the trades netted into an instruction"""
+    trade_ids = NettingService.get_instruction_trades(db, instruction_id)
+    return {"instruction_id": instruction_id, "trade_ids": trade_ids, "count": len(trade_ids)}
+
+
+@router.get("/value-date", response_model=ValueDateSchema)
+def get_value_date(
+    instrument_id: str = Query(..., description="Instrument"),
+    trade_date: Optional[date] = Query(None, description="Trade date (defaults to today)")
+):
+    """Compute the settlement date for a trade in an instrument"""
+    trade_date = trade_date or date.today()
+    offset, calendars = settlement_calendar.convention(instrument_id)
+    return {
+        "instrument_id": instrument_id,
+        "trade_date": trade_date,
+        "settlement_day_offset": offset,
+        "calendars": list(calendars),
+        "settlement_date": settlement_calendar.value_date(instrument_id, trade_date)
+    }
+
+
+@router.post("/calendars/{calendar_code}/holidays")
+def add_holidays(calendar_code: str, holidays: HolidayCreateSchema, db: Session = Depends(get_db)):
+    """Add holidays to a settlement calendar"""
+    rows = [
+        {"calendar_code": calendar_code, "holiday_date": day, "description": holidays.description}
+        for day in holidays.dates
+    ]
+    bulk_upsert(db, CalendarHoliday.__table__, rows, ("calendar_code", "holiday_date"))
+    db.commit()
+    settlement_calendar.invalidate()
+    return {"calendar_code": calendar_code, "holidays_added": len(rows)}
 
 
-@router.post("/{trade_id}/settle")
+@router.post("/{trade_id}/settle", response_model=SettlementSchema)
 def settle_trade(trade_id: str, db: Session = Depends(get_db)):
-    """Settle a trade"""
-    return {"message": f"Trade {trade_id} settled (placeholder)"}
+    """Settle a single trade immediately"""
+    try:
+        return SettlementService.settle_trade(db, trade_id)
+    except TradeNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidOrderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
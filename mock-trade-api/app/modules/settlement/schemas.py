@@ -0,0 +1,70 @@
+"""Settlement Module - Pydantic Schemas
+Defines request and response models for settlement and calendar endpoints.
+"""
+
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import List, Optional
+
+
+class SettlementSchema(BaseModel):
+    """Trade as seen by settlement"""
+    trade_id: str
+    instrument_id: str
+    account_id: str
+    side: str
+    qty: int
+    price: float
+    status: str
+    settlement_date: Optional[date] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SettlementListSchema(BaseModel):
+    """Settlements response"""
+    settlements: List[SettlementSchema]
+    count: int
+    version: int = 0
+    has_more: bool = False
+
+
+class HolidayCreateSchema(BaseModel):
+    """Holidays to add to a calendar"""
+    dates: List[date]
+    description: Optional[str] = None
+
+
+class ValueDateSchema(BaseModel):
+    """Computed settlement date"""
+    instrument_id: str
+    trade_date: date
+    settlement_day_offset: int
+    calendars: List[str]
+    settlement_date: date
+
+
+class NetInstructionSchema(BaseModel):
+    """Net settlement instruction"""
+    instruction_id: str
+    account_id: str
+    instrument_id: str
+    value_date: date
+    clearer: Optional[str] = None
+    clearer_leid: Optional[str] = None
+    net_qty: int
+    net_cash: float
+    gross_qty: int
+    trade_count: int
+    status: str
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class NetInstructionListSchema(BaseModel):
+    """Net instructions response"""
+    instructions: List[NetInstructionSchema]
+    count: int
@@ -0,0 +1,381 @@
+"""
+Settlement Module - Service Layer
+Value date assignment, settlement netting and the batched T+N settlement run.
+"""
+
+from sqlalchemy import select, insert, update, delete, func, literal, bindparam, or_
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple, Any
+from datetime import date, datetime, timedelta, time as dt_time
+import time
+import logging
+
+from app.core import copy_rows, publish_event, EventType
+from app.core.exceptions import TradeNotFoundError, InvalidOrderError
+from app.models import Account, ClearerEnrichmentMapping
+from app.modules.trade.models import Trade, TradeAuditTrail
+from app.modules.settlement.models import NetSettlementInstruction, NetSettlementTrade, SettlementChange
+from app.modules.settlement.calendar import settlement_calendar
+from app.modules.static_data.cache import static_data_cache
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock serializing settlement_change writers (PostgreSQL)
+JOURNAL_LOCK_KEY = 0x5E77_1E
+
+
+class SettlementService:
+    """Service class for trade settlement"""
+
+    @staticmethod
+    def assign_value_dates(db: Session) -> int:
+        """
+        Set settlement_date on active trades that have none (trades booked
+        before value dates were assigned at creation)
+
+        Value dates depend only on instrument and trade date, so they are
+        computed once per distinct pair and written with one executemany UPDATE.
+
+        Returns:
+            Number of (instrument, trade date) groups assigned
+        """
+        trade_day = func.date(Trade.exec_time)
+        pairs = db.execute(
+            select(Trade.instrument_id, trade_day)
+            .where(Trade.status == "ACTIVE", Trade.settlement_date.is_(None), Trade.exec_time.isnot(None))
+            .distinct()
+        ).all()
+        if not pairs:
+            return 0
+
+        params = []
+        for instrument_id, day in pairs:
+            day = date.fromisoformat(day) if isinstance(day, str) else day
+            start = datetime.combine(day, dt_time.min)
+            params.append({
+                "b_instrument_id": instrument_id,
+                "b_start": start,
+                "b_end": start + timedelta(days=1),
+                "b_settlement_date": settlement_calendar.value_date(instrument_id, day)
+            })
+        db.execute(
+            update(Trade.__table__)
+            .where(
+                Trade.__table__.c.instrument_id == bindparam("b_instrument_id"),
+                Trade.__table__.c.exec_time >= bindparam("b_start"),
+                Trade.__table__.c.exec_time < bindparam("b_end"),
+                Trade.__table__.c.settlement_date.is_(None)
+            )
+            .values(settlement_date=bindparam("b_settlement_date")),
+            params
+        )
+        return len(params)
+
+    @staticmethod
+    def _settle(db: Session, run_date: date, changed_by: str, trade_id: Optional[str] = None) -> int:
+        """Audit and settle due trades (or one trade) with one INSERT ... SELECT and one UPDATE"""
+        now = datetime.utcnow()
+        due = [Trade.status == "ACTIVE"]
+        due.append(Trade.trade_id == trade_id if trade_id else Trade.settlement_date <= run_date)
+
+        db.execute(insert(TradeAuditTrail).from_select(
+            ["audit_id", "trade_id", "event_type", "event_description", "old_status", "new_status",
+             "changed_by", "created_at"],
+            select(
+                Trade.trade_id + literal(f":SETTLED:{run_date.isoformat()}"),
+                Trade.trade_id,
+                literal("SETTLED"),
+                literal(f"Trade settled on {run_date.isoformat()}"),
+                literal("ACTIVE"),
+                literal("SETTLED"),
+                literal(changed_by),
+                literal(now)
+            ).where(*due)
+        ))
+        SettlementService.lock_journal(db)
+        db.execute(insert(SettlementChange).from_select(
+            ["trade_id", "event_type", "created_at"],
+            select(Trade.trade_id, literal("SETTLED"), literal(now)).where(*due)
+        ))
+        return db.execute(
+            update(Trade).where(*due).values(status="SETTLED", updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    @staticmethod
+    def run(db: Session, run_date: date, changed_by: str = "settlement") -> Dict[str, Any]:
+        """
+        Settle every active trade whose settlement date is on or before run_date
+
+        Args:
+            db: Database session
+            run_date: Settlement run date
+            changed_by: Recorded on the audit entries
+
+        Returns:
+            Run statistics
+        """
+        started = time.perf_counter()
+        settlement_calendar.ensure_fresh()
+        assigned = SettlementService.assign_value_dates(db)
+        settled = SettlementService._settle(db, run_date, changed_by)
+        instructions = db.execute(
+            update(NetSettlementInstruction)
+            .where(NetSettlementInstruction.status == "PENDING", NetSettlementInstruction.value_date <= run_date)
+            .values(status="SETTLED")
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        publish_event(EventType.SETTLEMENT_COMPLETED, {"run_date": run_date.isoformat(), "settled": settled}, "settlement")
+        elapsed = time.perf_counter() - started
+        logger.info(f"Settlement run {run_date}: {settled} trades settled in {elapsed:.2f}s")
+        return {
+            "run_date": run_date,
+            "value_date_groups_assigned": assigned,
+            "trades_settled": settled,
+            "instructions_settled": instructions,
+            "elapsed_seconds": round(elapsed, 3)
+        }
+
+    @staticmethod
+    def settle_trade(db: Session, trade_id: str, changed_by: str = "settlement") -> Trade:
+        """
+        Settle one trade now, regardless of its settlement date
+
+        Raises:
+            TradeNotFoundError: If the trade does not exist
+            InvalidOrderError: If the trade is not ACTIVE
+        """
+        trade = db.query(Trade).filter(Trade.trade_id == trade_id).first()
+        if not trade:
+            raise TradeNotFoundError(f"Trade {trade_id} not found")
+        if trade.status != "ACTIVE":
+            raise InvalidOrderError(f"Cannot settle {trade.status} trade")
+        SettlementService._settle(db, date.today(), changed_by, trade_id)
+        db.commit()
+        publish_event(EventType.SETTLEMENT_COMPLETED, {"trade_id": trade_id, "settled": 1}, "settlement")
+        db.refresh(trade)
+        return trade
+
+    @staticmethod
+    def list_settlements(
+        db: Session,
+        settlement_date: Optional[date] = None,
+        status: Optional[str] = None,
+        limit: int = 500
+    ) -> List[Trade]:
+        """Trades by settlement date and status (served by the status/settlement_date index)"""
+        query = db.query(Trade).filter(Trade.settlement_date.isnot(None))
+        if status:
+            query = query.filter(Trade.status == status)
+        if settlement_date:
+            query = query.filter(Trade.settlement_date == settlement_date)
+        return query.order_by(Trade.settlement_date, Trade.trade_id).limit(limit).all()
+
+    @staticmethod
+    def lock_journal(db: Session) -> None:
+        """
+        Hold the settlement journal until this transaction ends. Call before
+        writing settlement_change rows.
+
+        Versions come from an autoincrement, so without this a writer could
+        commit version N+1 while N is still in an open transaction, and
+        readers that resume from max(version) would skip N for good. With one
+        journal writer at a time, versions become visible in commit order.
+        SQLite already allows only one writing transaction.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(select(func.pg_advisory_xact_lock(JOURNAL_LOCK_KEY)))
+
+    @staticmethod
+    def current_version(db: Session) -> int:
+        """Latest settlement change version (0 when nothing has changed yet)"""
+        return db.execute(select(func.max(SettlementChange.version))).scalar() or 0
+
+    @staticmethod
+    def list_changes(db: Session, since_version: int, limit: int = 500) -> Tuple[List[Trade], int, bool]:
+        """
+        Current state of the trades whose settlement state changed after since_version
+
+        Args:
+            db: Database session
+            since_version: Last version the caller has applied
+            limit: Maximum trades returned
+
+        Returns:
+            (trades in change order, version to resume from, whether more changes remain)
+        """
+        # Bound the read so changes committed meanwhile are left for the next call
+        upto = SettlementService.current_version(db)
+        changed = (
+            select(SettlementChange.trade_id, func.max(SettlementChange.version).label("version"))
+            .where(SettlementChange.version > since_version, SettlementChange.version <= upto)
+            .group_by(SettlementChange.trade_id)
+            .order_by(func.max(SettlementChange.version))
+            .limit(limit + 1)
+        ).subquery()
+        rows = db.execute(
+            select(Trade, changed.c.version)
+            .join(changed, changed.c.trade_id == Trade.trade_id)
+            .order_by(changed.c.version)
+        ).all()
+        has_more = len(rows) > limit
+        if has_more:
+            rows = rows[:limit]
+            return [trade for trade, _ in rows], rows[-1][1], True
+        return [trade for trade, _ in rows], max(upto, since_version), False
+
+
+class NettingService:
+    """Service class for settlement netting"""
+
+    INSTRUCTION_COLUMNS = (
+        "instruction_id", "account_id", "instrument_id", "value_date", "clearer", "clearer_leid",
+        "net_qty", "net_cash", "gross_qty", "trade_count", "status", "created_at"
+    )
+
+    @staticmethod
+    def resolve_clearers(db: Session) -> Dict[str, Tuple[str, str]]:
+        """account_id -> (clearer, clearer_leid) from the first active clearer mapping on the account name or code"""
+        clearers: Dict[str, Tuple[str, str]] = {}
+        for account_id, clearer, leid in db.execute(
+            select(Account.account_id, ClearerEnrichmentMapping.clearer, ClearerEnrichmentMapping.clearer_leid)
+            .join(ClearerEnrichmentMapping, or_(
+                ClearerEnrichmentMapping.account_name == Account.name,
+                ClearerEnrichmentMapping.account_name == Account.code
+            ))
+            .where(ClearerEnrichmentMapping.active == "Y")
+            .order_by(ClearerEnrichmentMapping.rule_id)
+        ):
+            clearers.setdefault(account_id, (clearer, leid))
+        return clearers
+
+    @staticmethod
+    def run(db: Session, value_date: date) -> Dict[str, Any]:
+        """
+        Net the active trades settling on a value date into one instruction per
+        (account, instrument, value date, clearer)
+
+        Pending instructions for the date are rebuilt, so the run can be
+        repeated as trades are booked. A key that already has a settled
+        instruction (a trade booked late for a settled date) gets a
+        supplementary instruction with the next sequence suffix.
+
+        Args:
+            db: Database session
+            value_date: Settlement date to net
+
+        Returns:
+            Run statistics including the compression ratio (trades per instruction)
+        """
+        started = time.perf_counter()
+        settlement_calendar.ensure_fresh()
+        SettlementService.assign_value_dates(db)
+
+        pending = select(NetSettlementInstruction.instruction_id).where(
+            NetSettlementInstruction.value_date == value_date,
+            NetSettlementInstruction.status == "PENDING"
+        )
+        due = [Trade.status == "ACTIVE", Trade.settlement_date == value_date]
+        # Also unlink trades netted under a previous value date (amended since)
+        db.execute(delete(NetSettlementTrade).where(or_(
+            NetSettlementTrade.instruction_id.in_(pending),
+            NetSettlementTrade.trade_id.in_(select(Trade.trade_id).where(*due))
+        )))
+        db.execute(delete(NetSettlementInstruction).where(
+            NetSettlementInstruction.value_date == value_date,
+            NetSettlementInstruction.status == "PENDING"
+        ))
+
+        trades = db.execute(
+            select(Trade.trade_id, Trade.account_id, Trade.instrument_id, Trade.side, Trade.qty, Trade.price)
+            .where(*due)
+        ).all()
+        clearers = NettingService.resolve_clearers(db)
+        # key -> instructions already settled for it on this date
+        settled: Dict[Tuple[str, str, Optional[str]], int] = {}
+        for key in db.execute(
+            select(NetSettlementInstruction.account_id, NetSettlementInstruction.instrument_id,
+                   NetSettlementInstruction.clearer)
+            .where(NetSettlementInstruction.value_date == value_date, NetSettlementInstruction.status != "PENDING")
+        ):
+            settled[tuple(key)] = settled.get(tuple(key), 0) + 1
+        ids: Dict[Tuple[str, str, Optional[str]], str] = {}
+
+        # Hash aggregation: key -> [net_qty, net_cash, gross_qty, trade_count]
+        groups: Dict[Tuple[str, str, Optional[str]], List[float]] = {}
+        links = []
+        for trade_id, account_id, instrument_id, side, qty, price in trades:
+            clearer = clearers.get(account_id, (None, None))[0]
+            key = (account_id, instrument_id, clearer)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = [0, 0.0, 0, 0]
+                ids[key] = NettingService.instruction_id(value_date, *key, sequence=settled.get(key, 0) + 1)
+            qty = int(qty or 0)
+            signed = qty if (side or "").upper() == "BUY" else -qty
+            group[0] += signed
+            group[1] -= signed * float(price or 0.0) * static_data_cache.contract_multiplier(instrument_id)
+            group[2] += qty
+            group[3] += 1
+            links.append((trade_id, ids[key]))
+
+        now = datetime.utcnow()
+        written = copy_rows(db, NetSettlementInstruction.__table__, NettingService.INSTRUCTION_COLUMNS, (
+            (ids[(account_id, instrument_id, clearer)], account_id, instrument_id, value_date, clearer,
+             clearers.get(account_id, (None, None))[1], net_qty, net_cash, gross_qty, count, "PENDING", now)
+            for (account_id, instrument_id, clearer), (net_qty, net_cash, gross_qty, count) in groups.items()
+        ))
+        copy_rows(db, NetSettlementTrade.__table__, ("trade_id", "instruction_id"), links)
+        db.commit()
+
+        elapsed = time.perf_counter() - started
+        gross_qty = sum(group[2] for group in groups.values())
+        net_qty = sum(abs(group[0]) for group in groups.values())
+        logger.info(f"Netting {value_date}: {len(trades)} trades -> {written} instructions in {elapsed:.2f}s")
+        return {
+            "value_date": value_date,
+            "trades": len(trades),
+            "instructions": written,
+            "compression_ratio": round(len(trades) / written, 2) if written else None,
+            "gross_qty": gross_qty,
+            "net_qty": net_qty,
+            "unmapped_clearer_accounts": sorted({key[0] for key in groups if key[2] is None}),
+            "supplementary_instructions": sum(1 for key in groups if key in settled),
+            "elapsed_seconds": round(elapsed, 3)
+        }
+
+    @staticmethod
+    def instruction_id(value_date: date, account_id: str, instrument_id: str, clearer: Optional[str],
+                       sequence: int = 1) -> str:
+        """Deterministic id per key; supplementary instructions after a settled one carry a #sequence suffix"""
+        base = f"{value_date.isoformat()}:{account_id}:{instrument_id}:{clearer or '-'}"
+        return base if sequence == 1 else f"{base}#{sequence}"
+
+    @staticmethod
+    def list_instructions(
+        db: Session,
+        value_date: Optional[date] = None,
+        account_id: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> List[NetSettlementInstruction]:
+        """Net instructions with optional filters"""
+        query = db.query(NetSettlementInstruction)
+        if value_date:
+            query = query.filter(NetSettlementInstruction.value_date == value_date)
+        if account_id:
+            query = query.filter(NetSettlementInstruction.account_id == account_id)
+        if status:
+            query = query.filter(NetSettlementInstruction.status == status)
+        return query.order_by(NetSettlementInstruction.value_date, NetSettlementInstruction.instruction_id).all()
+
+    @staticmethod
+    def get_instruction_trades(db: Session, instruction_id: str) -> List[str]:
+        """Trade ids netted into an instruction"""
+        return [
+            trade_id for (trade_id,) in db.execute(
+                select(NetSettlementTrade.trade_id)
+                .where(NetSettlementTrade.instruction_id == instruction_id)
+                .order_by(NetSettlementTrade.trade_id)
+            )
+        ]
@@ -0,0 +1,171 @@
+"""
+Settlement Module - Status Stream
+Journals trade settlement state transitions and pushes them to the
+`settlements` WebSocket channel as versioned deltas.
+"""
+
+from fastapi.encoders import jsonable_encoder
+from typing import Callable, List, Optional, Tuple
+from datetime import datetime
+import threading
+import logging
+
+from app.core import settings, SessionLocal, event_bus, Event, EventType, copy_rows
+from app.core.websocket import manager
+from app.modules.settlement.models import SettlementChange
+from app.modules.settlement.schemas import SettlementSchema
+from app.modules.settlement.service import SettlementService
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "settlements"
+
+# Trade lifecycle events journaled as settlement changes
+TRADE_EVENTS = {
+    EventType.TRADE_CREATED: "CREATED",
+    EventType.TRADE_UPDATED: "UPDATED",
+    EventType.TRADE_CANCELLED: "CANCELLED",
+    EventType.TRADE_EXPIRED: "CANCELLED",
+}
+
+
+class SettlementStream:
+    """
+    Settlement change journal writer and WebSocket publisher.
+
+    Trade lifecycle events are buffered and written to settlement_change in
+    one bulk insert per interval; settlement runs journal their own changes
+    in the run transaction and wake the publisher. Each push carries the
+    current state of the changed trades plus from_version/version, so a
+    client that sees a gap (or a resync message after a large run) catches
+    up with GET /settlements?since_version=N.
+    """
+
+    def __init__(self, interval_ms: float, max_push: int, session_factory: Callable = SessionLocal):
+        self.interval = interval_ms / 1000.0
+        self.max_push = max_push
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, str, datetime]] = []
+        self._published_version = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._registered = False
+        self.stats = {"changes_journaled": 0, "flushes": 0, "publishes": 0, "resyncs": 0}
+
+    def record(self, trade_id: str, event_type: str) -> None:
+        """Buffer a settlement change for the next flush"""
+        with self._lock:
+            self._pending.append((trade_id, event_type, datetime.utcnow()))
+        self._wake.set()
+
+    def notify(self) -> None:
+        """Wake the publisher after changes were journaled elsewhere"""
+        self._wake.set()
+
+    def flush(self) -> int:
+        """Write buffered changes and push everything after the last published version"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        db = self.session_factory()
+        try:
+            if pending:
+                SettlementService.lock_journal(db)
+                copy_rows(db, SettlementChange.__table__, ("trade_id", "event_type", "created_at"), pending)
+                db.commit()
+                self.stats["changes_journaled"] += len(pending)
+                self.stats["flushes"] += 1
+
+            if not manager.has_subscribers(CHANNEL):
+                self._published_version = SettlementService.current_version(db)
+                return len(pending)
+
+            since = self._published_version
+            trades, version, has_more = SettlementService.list_changes(db, since, self.max_push)
+            if has_more:
+                version = SettlementService.current_version(db)
+                manager.publish({"type": "settlement_resync", "version": version}, CHANNEL)
+                self.stats["resyncs"] += 1
+            elif trades:
+                manager.publish({
+                    "type": "settlement_changes",
+                    "from_version": since,
+                    "version": version,
+                    "settlements": jsonable_encoder([SettlementSchema.model_validate(t) for t in trades])
+                }, CHANNEL)
+                self.stats["publishes"] += 1
+            self._published_version = version
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._pending[:0] = pending
+            raise
+        finally:
+            db.close()
+        return len(pending)
+
+    def load(self) -> None:
+        """Start publishing from the journal's current version (otherwise from 0; the first push resyncs)"""
+        db = self.session_factory()
+        try:
+            self._published_version = SettlementService.current_version(db)
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        """Start the flusher/publisher (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="settlement-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(5)
+        self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Final settlement stream flush failed: {e}", exc_info=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait()
+            # Coalesce a burst of changes into one journal write and one push
+            if self._stop.wait(self.interval):
+                break
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Settlement stream flush failed: {e}", exc_info=True)
+
+    def on_trade_event(self, event: Event) -> None:
+        trade_id = event.data.get("trade_id")
+        if trade_id:
+            self.record(trade_id, TRADE_EVENTS[event.event_type])
+
+    def on_settlement_completed(self, event: Event) -> None:
+        self.notify()
+
+    def register_event_handlers(self) -> None:
+        """Subscribe to trade lifecycle and settlement events (idempotent)"""
+        if self._registered:
+            return
+        for event_type in TRADE_EVENTS:
+            event_bus.subscribe(event_type, self.on_trade_event)
+        event_bus.subscribe(EventType.SETTLEMENT_COMPLETED, self.on_settlement_completed)
+        self._registered = True
+
+
+# Global settlement stream
+settlement_stream = SettlementStream(
+    interval_ms=settings.settlement_stream_interval_ms,
+    max_push=settings.settlement_stream_max_push
+)
@@ -0,0 +1,176 @@
+"""
+Static Data Module - In-Memory Cache
+Read-mostly snapshot of instruments, traders, accounts and strategy definitions for hot paths
+(order intake, enrichment) that must not query reference tables per request.
+"""
+
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Any
+import threading
+import time
+import logging
+
+from app.core import settings, event_bus, Event, EventType, SessionLocal
+from app.modules.static_data.models import Instrument, Trader, Account
+from app.models import StrategyLeg, InstrumentETD
+
+logger = logging.getLogger(__name__)
+
+# Minimum gap between refreshes triggered by cache misses
+MISS_REFRESH_INTERVAL_SECONDS = 1.0
+
+
+class StaticDataCache:
+    """
+    Snapshot of reference data keyed by primary id.
+
+    The whole snapshot is rebuilt and swapped atomically on refresh, so readers
+    never take a lock. Entries are refreshed when older than the configured TTL,
+    when static data events invalidate them, or (rate limited) on a lookup miss.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.instruments: Dict[str, Dict[str, Any]] = {}
+        self.traders: Dict[str, Dict[str, Any]] = {}
+        self.accounts: Dict[str, Dict[str, Any]] = {}
+        self.instrument_ids_by_symbol: Dict[str, str] = {}
+        # strategy_id -> active legs ordered by leg_sequence
+        self.strategy_legs: Dict[str, List[Dict[str, Any]]] = {}
+        self._loaded_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._registered = False
+
+    def refresh(self, db: Optional[Session] = None) -> None:
+        """Reload all reference data in four queries"""
+        owns_session = db is None
+        db = db or SessionLocal()
+        try:
+            instruments = {
+                row.instrument_id: {
+                    "symbol": row.symbol,
+                    "instrument_type": row.instrument_type,
+                    "status": row.status,
+                    "expiry_date": row.expiry_date,
+                    "contract_multiplier": float(row.contract_multiplier) if row.contract_multiplier else 1.0
+                }
+                for row in db.query(
+                    Instrument.instrument_id, Instrument.symbol, Instrument.instrument_type,
+                    Instrument.status, Instrument.expiry_date, InstrumentETD.contract_multiplier
+                ).outerjoin(InstrumentETD, InstrumentETD.instrument_id == Instrument.instrument_id)
+            }
+            traders = {
+                row.trader_id: {"user_id": row.user_id, "name": row.name}
+                for row in db.query(Trader.trader_id, Trader.user_id, Trader.name)
+            }
+            accounts = {
+                row.account_id: {"code": row.code, "name": row.name}
+                for row in db.query(Account.account_id, Account.code, Account.name)
+            }
+            strategy_legs: Dict[str, List[Dict[str, Any]]] = {}
+            for row in db.query(
+                StrategyLeg.strategy_id, StrategyLeg.leg_id, StrategyLeg.component_instrument_id,
+                StrategyLeg.leg_sequence, StrategyLeg.side, StrategyLeg.ratio, StrategyLeg.quantity_type
+            ).filter(StrategyLeg.status == "ACTIVE").order_by(StrategyLeg.strategy_id, StrategyLeg.leg_sequence):
+                strategy_legs.setdefault(row.strategy_id, []).append({
+                    "leg_id": row.leg_id,
+                    "component_instrument_id": row.component_instrument_id,
+                    "leg_sequence": row.leg_sequence,
+                    "side": (row.side or "LONG").upper(),
+                    "ratio": float(row.ratio) if row.ratio is not None else 1.0,
+                    "quantity_type": (row.quantity_type or "RATIO").upper()
+                })
+        finally:
+            if owns_session:
+                db.close()
+
+        self.instruments, self.traders, self.accounts = instruments, traders, accounts
+        self.strategy_legs = strategy_legs
+        self.instrument_ids_by_symbol = {
+            entry["symbol"]: instrument_id for instrument_id, entry in instruments.items() if entry["symbol"]
+        }
+        self._loaded_at = time.monotonic()
+        logger.info(
+            f"Static data cache loaded: {len(instruments)} instruments, "
+            f"{len(traders)} traders, {len(accounts)} accounts, {len(strategy_legs)} strategies"
+        )
+
+    def invalidate(self) -> None:
+        """Force a reload on next access"""
+        self._loaded_at = 0.0
+
+    def ensure_fresh(self) -> None:
+        """Reload the snapshot if it has expired"""
+        if time.monotonic() - self._loaded_at < self.ttl_seconds:
+            return
+        with self._refresh_lock:
+            if time.monotonic() - self._loaded_at >= self.ttl_seconds:
+                self.refresh()
+
+    def _refresh_on_miss(self) -> bool:
+        """Reload after a lookup miss (a row may have been created since the last load)"""
+        with self._refresh_lock:
+            if time.monotonic() - self._loaded_at < MISS_REFRESH_INTERVAL_SECONDS:
+                return False
+            self.refresh()
+            return True
+
+    def _lookup(self, table: str, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not key:
+            return None
+        self.ensure_fresh()
+        entry = getattr(self, table).get(key)
+        if entry is None and self._refresh_on_miss():
+            entry = getattr(self, table).get(key)
+        return entry
+
+    def get_instrument(self, instrument_id: str) -> Optional[Dict[str, Any]]:
+        return self._lookup("instruments", instrument_id)
+
+    def get_trader(self, trader_id: str) -> Optional[Dict[str, Any]]:
+        return self._lookup("traders", trader_id)
+
+    def get_account(self, account_id: str) -> Optional[Dict[str, Any]]:
+        return self._lookup("accounts", account_id)
+
+    def get_instrument_id_by_symbol(self, symbol: str) -> Optional[str]:
+        """Resolve an external symbol (e.g. FIX tag 55) to an instrument_id"""
+        return self._lookup("instrument_ids_by_symbol", symbol)
+
+    def get_strategy_legs(self, strategy_id: str) -> List[Dict[str, Any]]:
+        """Active legs of a strategy instrument ordered by leg_sequence (empty if undefined)"""
+        self.ensure_fresh()
+        return self.strategy_legs.get(strategy_id, [])
+
+    def instrument_symbol(self, instrument_id: str) -> Optional[str]:
+        entry = self.instruments.get(instrument_id)
+        return entry["symbol"] if entry else instrument_id
+
+    def contract_multiplier(self, instrument_id: str) -> float:
+        """ETD contract multiplier (1 for instruments without one)"""
+        entry = self.get_instrument(instrument_id)
+        return entry["contract_multiplier"] if entry else 1.0
+
+    def trader_user_id(self, trader_id: str) -> Optional[str]:
+        entry = self.traders.get(trader_id)
+        return entry["user_id"] if entry else trader_id
+
+    def account_code(self, account_id: str) -> Optional[str]:
+        entry = self.accounts.get(account_id)
+        return entry["code"] if entry else account_id
+
+    def on_static_data_changed(self, event: Event) -> None:
+        self.invalidate()
+
+    def register_event_handlers(self) -> None:
+        """Invalidate the snapshot whenever static data is created (idempotent)"""
+        if self._registered:
+            return
+        event_bus.subscribe(EventType.INSTRUMENT_CREATED, self.on_static_data_changed)
+        event_bus.subscribe(EventType.ACCOUNT_CREATED, self.on_static_data_changed)
+        event_bus.subscribe(EventType.STRATEGY_UPDATED, self.on_static_data_changed)
+        self._registered = True
+
+
+# Global cache instance
+static_data_cache = StaticDataCache(ttl_seconds=settings.static_data_cache_ttl_seconds)
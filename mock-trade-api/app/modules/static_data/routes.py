@@ -1,8 +1,10 @@
 # Static Data Module - Routes
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core import get_db
+from app.core import get_db, get_read_db, get_async_read_db
 from app.modules.static_data import models, schemas
 from app.core import publish_event, EventType
 import uuid
@@ -61,7 +63,7 @@ def create_trader(
         raise
 
 @router.get("/traders/{trader_id}", response_model=schemas.TraderSchema)
-def get_trader(trader_id: str, db: Session = Depends(get_db)):
+def get_trader(trader_id: str, db: Session = Depends(get_read_db)):
     """Get trader by ID"""
     logger.info(f"GET TRADER: Retrieving trader {trader_id}")
 
@@ -77,12 +79,12 @@ def get_trader(trader_id: str, db: Session = Depends(get_db)):
     return trader
 
 @router.get("/traders", response_model=list[schemas.TraderSchema])
-def list_traders(db: Session = Depends(get_db)):
+async def list_traders(db: AsyncSession = Depends(get_async_read_db)):
     """List all traders"""
     logger.info("LIST TRADERS: Listing all traders")
 
     try:
-        traders = db.query(models.Trader).all()
+        traders = (await db.execute(select(models.Trader))).scalars().all()
         logger.info(f"LIST TRADERS: Found {len(traders)} traders")
         return traders
     except Exception as e:
@@ -210,7 +212,7 @@ def create_instrument(
         raise
 
 @router.get("/instruments/{instrument_id}", response_model=schemas.InstrumentSchema)
-def get_instrument(instrument_id: str, db: Session = Depends(get_db)):
+def get_instrument(instrument_id: str, db: Session = Depends(get_read_db)):
     """Get instrument by ID"""
     instrument = db.query(models.Instrument).filter(
         models.Instrument.instrument_id == instrument_id
@@ -224,9 +226,9 @@ def get_instrument(instrument_id: str, db: Session = Depends(get_db)):
     return instrument
 
 @router.get("/instruments", response_model=list[schemas.InstrumentSchema])
-def list_instruments(db: Session = Depends(get_db)):
+async def list_instruments(db: AsyncSession = Depends(get_async_read_db)):
     """List all instruments"""
-    instruments = db.query(models.Instrument).all()
+    instruments = (await db.execute(select(models.Instrument))).scalars().all()
     # Expose metadata_json as metadata for each row
     for inst in instruments:
         inst.metadata = inst.metadata_json
@@ -317,7 +319,7 @@ def create_account(
         raise
 
 @router.get("/accounts/{account_id}", response_model=schemas.AccountSchema)
-def get_account(account_id: str, db: Session = Depends(get_db)):
+def get_account(account_id: str, db: Session = Depends(get_read_db)):
     """Get account by ID"""
     logger.info(f"GET ACCOUNT: Retrieving account {account_id}")
 
@@ -338,12 +340,12 @@ def get_account(account_id: str, db: Session = Depends(get_db)):
         raise
 
 @router.get("/accounts", response_model=list[schemas.AccountSchema])
-def list_accounts(db: Session = Depends(get_db)):
+async def list_accounts(db: AsyncSession = Depends(get_async_read_db)):
     """List all accounts"""
     logger.info("LIST ACCOUNTS: Listing all accounts")
 
     try:
-        accounts = db.query(models.Account).all()
+        accounts = (await db.execute(select(models.Account))).scalars().all()
         logger.info(f"LIST ACCOUNTS: Found {len(accounts)} accounts")
         return accounts
     except Exception as e:
@@ -446,7 +448,7 @@ def create_broker(
         raise
 
 @router.get("/brokers/{broker_id}", response_model=schemas.BrokerSchema)
-def get_broker(broker_id: str, db: Session = Depends(get_db)):
+def get_broker(broker_id: str, db: Session = Depends(get_read_db)):
     """Get broker by ID"""
     broker = db.query(models.Broker).filter(
         models.Broker.broker_id == broker_id
@@ -456,9 +458,9 @@ def get_broker(broker_id: str, db: Session = Depends(get_db)):
     return broker
 
 @router.get("/brokers", response_model=list[schemas.BrokerSchema])
-def list_brokers(db: Session = Depends(get_db)):
+async def list_brokers(db: AsyncSession = Depends(get_async_read_db)):
     """List all brokers"""
-    return db.query(models.Broker).all()
+    return (await db.execute(select(models.Broker))).scalars().all()
 
 @router.put("/brokers/{broker_id}", response_model=schemas.BrokerSchema)
 def update_broker(
@@ -511,7 +513,7 @@ def create_trader(
     return db_trader
 
 @router.get("/traders/{trader_id}", response_model=schemas.TraderSchema)
-def get_trader(trader_id: str, db: Session = Depends(get_db)):
+def get_trader(trader_id: str, db: Session = Depends(get_read_db)):
     """Get trader by ID"""
     trader = db.query(models.Trader).filter(
         models.Trader.trader_id == trader_id
@@ -521,9 +523,9 @@ def get_trader(trader_id: str, db: Session = Depends(get_db)):
     return trader
 
 @router.get("/traders", response_model=list[schemas.TraderSchema])
-def list_traders(db: Session = Depends(get_db)):
+async def list_traders(db: AsyncSession = Depends(get_async_read_db)):
     """List all traders"""
-    return db.query(models.Trader).all()
+    return (await db.execute(select(models.Trader))).scalars().all()
 
 @router.put("/traders/{trader_id}", response_model=schemas.TraderSchema)
 def update_trader(
@@ -583,7 +585,7 @@ def create_clearer(
     return db_clearer
 
 @router.get("/clearers/{clearer_id}", response_model=schemas.ClearerSchema)
-def get_clearer(clearer_id: str, db: Session = Depends(get_db)):
+def get_clearer(clearer_id: str, db: Session = Depends(get_read_db)):
     """Get clearer by ID"""
     clearer = db.query(models.Clearer).filter(
         models.Clearer.clearer_id == clearer_id
@@ -593,9 +595,9 @@ def get_clearer(clearer_id: str, db: Session = Depends(get_db)):
     return clearer
 
 @router.get("/clearers", response_model=list[schemas.ClearerSchema])
-def list_clearers(db: Session = Depends(get_db)):
+async def list_clearers(db: AsyncSession = Depends(get_async_read_db)):
     """List all clearers"""
-    return db.query(models.Clearer).all()
+    return (await db.execute(select(models.Clearer))).scalars().all()
 
 @router.put("/clearers/{clearer_id}", response_model=schemas.ClearerSchema)
 def update_clearer(
@@ -658,7 +660,7 @@ def create_otc_details(
     return db_otc
 
 @router.get("/instruments/{instrument_id}/otc", response_model=schemas.InstrumentOTCSchema)
-def get_otc_details(instrument_id: str, db: Session = Depends(get_db)):
+def get_otc_details(instrument_id: str, db: Session = Depends(get_read_db)):
     """Get OTC details for an instrument"""
     otc = db.query(models.InstrumentOTC).filter(
         models.InstrumentOTC.instrument_id == instrument_id
@@ -717,7 +719,7 @@ def create_etd_details(
     return db_etd
 
 @router.get("/instruments/{instrument_id}/etd", response_model=schemas.InstrumentETDSchema)
-def get_etd_details(instrument_id: str, db: Session = Depends(get_db)):
+def get_etd_details(instrument_id: str, db: Session = Depends(get_read_db)):
     """Get ETD details for an instrument"""
     etd = db.query(models.InstrumentETD).filter(
         models.InstrumentETD.instrument_id == instrument_id
@@ -776,7 +778,7 @@ def create_strategy_details(
     return db_strategy
 
 @router.get("/instruments/{instrument_id}/strategy", response_model=schemas.InstrumentStrategySchema)
-def get_strategy_details(instrument_id: str, db: Session = Depends(get_db)):
+def get_strategy_details(instrument_id: str, db: Session = Depends(get_read_db)):
     """Get Strategy details for an instrument"""
     strategy = db.query(models.InstrumentStrategy).filter(
         models.InstrumentStrategy.instrument_id == instrument_id
@@ -843,10 +845,12 @@ def create_strategy_leg(
     db.add(db_leg)
     db.commit()
     db.refresh(db_leg)
+
+    publish_event(EventType.STRATEGY_UPDATED, {"strategy_id": strategy_id}, "static_data")
     return db_leg
 
 @router.get("/strategies/{strategy_id}/legs", response_model=list[schemas.StrategyLegSchema])
-def list_strategy_legs(strategy_id: str, db: Session = Depends(get_db)):
+def list_strategy_legs(strategy_id: str, db: Session = Depends(get_read_db)):
     """List all legs for a strategy"""
     legs = db.query(models.StrategyLeg).filter(
         models.StrategyLeg.strategy_id == strategy_id,
@@ -855,7 +859,7 @@ def list_strategy_legs(strategy_id: str, db: Session = Depends(get_db)):
     return legs
 
 @router.get("/strategies/{strategy_id}/legs/{leg_id}", response_model=schemas.StrategyLegSchema)
-def get_strategy_leg(strategy_id: str, leg_id: str, db: Session = Depends(get_db)):
+def get_strategy_leg(strategy_id: str, leg_id: str, db: Session = Depends(get_read_db)):
     """Get a specific leg of a strategy"""
     leg = db.query(models.StrategyLeg).filter(
         models.StrategyLeg.leg_id == leg_id,
@@ -896,6 +900,8 @@ def update_strategy_leg(
 
     db.commit()
     db.refresh(leg)
+
+    publish_event(EventType.STRATEGY_UPDATED, {"strategy_id": strategy_id}, "static_data")
     return leg
 
 @router.delete("/strategies/{strategy_id}/legs/{leg_id}")
@@ -910,4 +916,6 @@ def delete_strategy_leg(strategy_id: str, leg_id: str, db: Session = Depends(get
 
     leg.status = "DELETED"
     db.commit()
+
+    publish_event(EventType.STRATEGY_UPDATED, {"strategy_id": strategy_id}, "static_data")
     return {"message": "Strategy leg deleted"}
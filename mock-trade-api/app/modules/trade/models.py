@@ -1,7 +1,7 @@
 # Trade Module - Models
 # Use existing TradeAllocation from app/models.py, define new Trade model
 
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, ForeignKey, JSON, Index, text
 from app.core import Base
 from app.models import TradeAllocation  # Existing model
 from datetime import datetime
@@ -12,6 +12,21 @@ class Trade(Base):
     Stores filled order details with trade lifecycle
     """
     __tablename__ = "trade"
+    # Delta index for point-in-time position queries
+    __table_args__ = (
+        Index("ix_trade_account_instrument_exec_time", "account_id", "instrument_id", "exec_time"),
+        # Due-trade lookup for the settlement run
+        Index("ix_trade_status_settlement_date", "status", "settlement_date"),
+        # Trade listing filters, newest first
+        Index("ix_trade_account_created_at", "account_id", "created_at"),
+        Index("ix_trade_trader_created_at", "trader_id", "created_at"),
+        Index("ix_trade_instrument_created_at", "instrument_id", "created_at"),
+        # Open trades are a small slice of the table once trades settle
+        Index(
+            "ix_trade_active_created_at", "created_at",
+            postgresql_where=text("status = 'ACTIVE'"), sqlite_where=text("status = 'ACTIVE'")
+        ),
+    )
     trade_id = Column(String, primary_key=True, index=True)
     order_id = Column(String, ForeignKey("order_hdr.order_id"), nullable=True)
     instrument_id = Column(String, ForeignKey("instrument.instrument_id"))
@@ -31,6 +46,7 @@ class Trade(Base):
     status = Column(String, default="ACTIVE")  # ACTIVE, CANCELLED, EXPIRED, SETTLED
     cancellation_reason = Column(String, nullable=True)
     expiry_date = Column(DateTime, nullable=True)
+    settlement_date = Column(Date, nullable=True)  # T+N value date on the instrument's calendars
 
     # Trade Metrics
     notional_value = Column(Float, nullable=True)  # qty * price
@@ -50,6 +66,8 @@ class TradeAuditTrail(Base):
     Stores lifecycle events for trade auditing and compliance
     """
     __tablename__ = "trade_audit_trail"
+    # Monthly range partitions on PostgreSQL (see app.core.partitions); the key is part of the primary key
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
     
     audit_id = Column(String, primary_key=True, index=True)
     trade_id = Column(String, ForeignKey("trade.trade_id"), nullable=False, index=True)
@@ -69,7 +87,7 @@ class TradeAuditTrail(Base):
     event_metadata = Column(JSON, nullable=True)  # Store additional context (reason, allocations, etc.)
     
     # Timestamp
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow, index=True)
 
 # Re-export for convenience
 __all__ = ['Trade', 'TradeAllocation', 'TradeAuditTrail']
@@ -14,6 +14,7 @@ from app.core.exceptions import TradeNotFoundError, InvalidOrderError
 from app.modules.trade.models import Trade, TradeAllocation, TradeAuditTrail
 from app.modules.trade.schemas import TradeCreateSchema
 from app.core.websocket import manager
+from app.modules.settlement.calendar import settlement_calendar
 import logging
 
 logger = logging.getLogger(__name__)
@@ -109,6 +110,20 @@ class TradeService:
         db.add(audit_entry)
         return audit_entry
     
+    @staticmethod
+    def _event_data(trade: Trade) -> dict:
+        """Common trade fields carried on lifecycle events (consumers need the economics)"""
+        return {
+            "trade_id": trade.trade_id,
+            "order_id": trade.order_id,
+            "instrument_id": trade.instrument_id,
+            "account_id": trade.account_id,
+            "side": trade.side,
+            "qty": trade.qty,
+            "price": trade.price,
+            "exec_time": trade.exec_time.isoformat() if trade.exec_time else None
+        }
+
     @staticmethod
     def create_trade(db: Session, trade_data: TradeCreateSchema) -> Trade:
         """
@@ -128,6 +143,7 @@ class TradeService:
         db_trade = Trade(
             trade_id=str(uuid.uuid4()),
             notional_value=notional_value,
+            settlement_date=settlement_calendar.value_date(trade_data.instrument_id, datetime.utcnow().date()),
             **trade_data.dict()
         )
         
@@ -155,14 +171,7 @@ class TradeService:
         db.commit()
         
         # Publish event for other modules to consume
-        publish_event(EventType.TRADE_CREATED, {
-            "trade_id": db_trade.trade_id,
-            "order_id": db_trade.order_id,
-            "instrument_id": db_trade.instrument_id,
-            "qty": db_trade.qty,
-            "price": db_trade.price,
-            "side": db_trade.side
-        }, "trade")
+        publish_event(EventType.TRADE_CREATED, TradeService._event_data(db_trade), "trade")
         
         # Broadcast via WebSocket for real-time updates
         TradeService._broadcast_trade_update(db_trade, "trade_created")
@@ -198,7 +207,7 @@ class TradeService:
         instrument_id: Optional[str] = None
     ) -> List[Trade]:
         """
-        List trades with optional filters
+        List trades with optional filters, newest first
         
         Args:
             db: Database session
@@ -221,7 +230,8 @@ class TradeService:
         if instrument_id:
             query = query.filter(Trade.instrument_id == instrument_id)
         
-        return query.all()
+        # Newest first, served by the (filter column, created_at) indexes
+        return query.order_by(Trade.created_at.desc()).all()
     
     @staticmethod
     def cancel_trade(db: Session, trade_id: str, reason: str = "User requested", changed_by: str = None) -> Trade:
@@ -267,7 +277,7 @@ class TradeService:
         
         # Publish cancellation event
         publish_event(EventType.TRADE_CANCELLED, {
-            "trade_id": trade.trade_id,
+            **TradeService._event_data(trade),
             "reason": reason,
             "cancelled_at": trade.updated_at.isoformat()
         }, "trade")
@@ -464,7 +474,7 @@ class TradeService:
         
         # Publish undo event
         publish_event(EventType.TRADE_UPDATED, {
-            "trade_id": trade.trade_id,
+            **TradeService._event_data(trade),
             "action": "undo",
             "old_status": old_status,
             "new_status": "ACTIVE"
@@ -490,14 +500,23 @@ class TradeService:
         from app.models import Trader
         
         # Query audit trail with trader join to get user_id
-        audit_entries = db.query(
+        query = db.query(
             TradeAuditTrail,
             Trader.user_id
         ).outerjoin(
             Trader, TradeAuditTrail.changed_by == Trader.trader_id
         ).filter(
             TradeAuditTrail.trade_id == trade_id
-        ).order_by(TradeAuditTrail.created_at.asc()).all()
+        )
+        
+        # A trade's events start in the month it was created; bounding the partition
+        # key lets PostgreSQL skip the audit trail partitions of every earlier month
+        trade_created_at = db.query(Trade.created_at).filter(Trade.trade_id == trade_id).scalar()
+        if trade_created_at is not None:
+            month_start = trade_created_at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            query = query.filter(TradeAuditTrail.created_at >= month_start)
+        
+        audit_entries = query.order_by(TradeAuditTrail.created_at.asc()).all()
         
         # Enrich audit trail entries with user_id
         enriched_trail = []
@@ -1,8 +1,9 @@
 # Trade Query Module - Routes
 
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
-from app.core import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import get_async_read_db
 from app.core.websocket import manager
 from app.models import OrderHdr, Instrument, Trader, Account, PortfolioEnrichmentMapping
 from app.modules.trade.models import Trade
@@ -39,13 +40,47 @@ class EnrichedTradeSchema(BaseModel):
     class Config:
         from_attributes = True
 
+
+def _enrichment_query(entity):
+    """
+    Select entity rows with their instrument, trader, account and portfolio
+    enrichment columns in one statement (outer joins, so unmatched references
+    still return the row)
+    """
+    portfolio = (
+        select(PortfolioEnrichmentMapping.portfolio)
+        .where(
+            PortfolioEnrichmentMapping.trader_id == entity.trader_id,
+            PortfolioEnrichmentMapping.account_id == entity.account_id,
+            PortfolioEnrichmentMapping.active == "Y"
+        )
+        .order_by(PortfolioEnrichmentMapping.rule_id)
+        .limit(1)
+        .correlate(entity)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            entity,
+            Instrument.symbol,
+            Instrument.expiry_date,
+            Trader.name,
+            Account.code,
+            portfolio.label("portfolio_name")
+        )
+        .outerjoin(Instrument, Instrument.instrument_id == entity.instrument_id)
+        .outerjoin(Trader, Trader.trader_id == entity.trader_id)
+        .outerjoin(Account, Account.account_id == entity.account_id)
+    )
+
+
 @router.get("/enriched-trades", response_model=List[EnrichedTradeSchema])
-def get_enriched_trades(
+async def get_enriched_trades(
     status: Optional[str] = None,
     trader_id: Optional[str] = None,
     account_id: Optional[str] = None,
     instrument_id: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get enriched trades with portfolio names and instrument expiry dates.
@@ -54,48 +89,22 @@ def get_enriched_trades(
     2. Instrument expiry date from static data
     3. Human-readable names for traders and accounts
     """
-    # Build base query
-    query = db.query(Trade)
+    query = _enrichment_query(Trade)
     
     # Apply filters
     if status:
-        query = query.filter(TradeHdr.status == status)
+        query = query.where(Trade.status == status)
     if trader_id:
-        query = query.filter(TradeHdr.trader_id == trader_id)
+        query = query.where(Trade.trader_id == trader_id)
     if account_id:
-        query = query.filter(TradeHdr.account_id == account_id)
+        query = query.where(Trade.account_id == account_id)
     if instrument_id:
-        query = query.filter(TradeHdr.instrument_id == instrument_id)
+        query = query.where(Trade.instrument_id == instrument_id)
     
-    trades = query.all()
+    rows = (await db.execute(query.order_by(Trade.created_at.desc()))).all()
     
-    # Enrich the trades
     enriched_trades = []
-    for trade in trades:
-        # Get instrument details
-        instrument = db.query(Instrument).filter(Instrument.instrument_id == trade.instrument_id).first()
-        instrument_symbol = instrument.symbol if instrument else trade.instrument_id
-        instrument_expiry_date = instrument.expiry_date if instrument else None
-        
-        # Get trader details
-        trader = db.query(Trader).filter(Trader.trader_id == trade.trader_id).first()
-        trader_name = trader.name if trader else None
-        
-        # Get account details
-        account = db.query(Account).filter(Account.account_id == trade.account_id).first()
-        account_code = account.code if account else None
-        
-        # Get portfolio name from enrichment mapping
-        portfolio_name = None
-        if trade.trader_id and trade.account_id:
-            portfolio_mapping = db.query(PortfolioEnrichmentMapping).filter(
-                PortfolioEnrichmentMapping.trader_id == trade.trader_id,
-                PortfolioEnrichmentMapping.account_id == trade.account_id,
-                PortfolioEnrichmentMapping.active == "Y"
-            ).first()
-            if portfolio_mapping:
-                portfolio_name = portfolio_mapping.portfolio
-        
+    for trade, instrument_symbol, instrument_expiry_date, trader_name, account_code, portfolio_name in rows:
         # Calculate notional value
         notional_value = float(trade.qty * trade.price) if trade.qty and trade.price else None
         
@@ -103,7 +112,7 @@ def get_enriched_trades(
             trade_id=trade.trade_id,
             order_id=trade.order_id,
             instrument_id=trade.instrument_id,
-            instrument_symbol=instrument_symbol,
+            instrument_symbol=instrument_symbol or trade.instrument_id,
             instrument_expiry_date=instrument_expiry_date,
             side=trade.side,
             qty=trade.qty,
@@ -124,12 +133,12 @@ def get_enriched_trades(
     return enriched_trades
 
 @router.get("/enriched-orders", response_model=List[dict])
-def get_enriched_orders(
+async def get_enriched_orders(
     status: Optional[str] = None,
     trader_id: Optional[str] = None,
     account_id: Optional[str] = None,
     instrument_id: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get enriched orders with portfolio names and instrument expiry dates.
@@ -138,55 +147,29 @@ def get_enriched_orders(
     2. Instrument expiry date from static data
     3. Human-readable names for traders and accounts
     """
-    # Build base query
-    query = db.query(OrderHdr)
+    query = _enrichment_query(OrderHdr)
     
     # Apply filters
     if status:
-        query = query.filter(OrderHdr.status == status)
+        query = query.where(OrderHdr.status == status)
     if trader_id:
-        query = query.filter(OrderHdr.trader_id == trader_id)
+        query = query.where(OrderHdr.trader_id == trader_id)
     if account_id:
-        query = query.filter(OrderHdr.account_id == account_id)
+        query = query.where(OrderHdr.account_id == account_id)
     if instrument_id:
-        query = query.filter(OrderHdr.instrument_id == instrument_id)
+        query = query.where(OrderHdr.instrument_id == instrument_id)
     
-    orders = query.all()
+    rows = (await db.execute(query.order_by(OrderHdr.created_at.desc()))).all()
     
-    # Enrich the orders
     enriched_orders = []
-    for order in orders:
-        # Get instrument details
-        instrument = db.query(Instrument).filter(Instrument.instrument_id == order.instrument_id).first()
-        instrument_symbol = instrument.symbol if instrument else order.instrument_id
-        instrument_expiry_date = instrument.expiry_date if instrument else None
-        
-        # Get trader details
-        trader = db.query(Trader).filter(Trader.trader_id == order.trader_id).first()
-        trader_name = trader.name if trader else None
-        
-        # Get account details
-        account = db.query(Account).filter(Account.account_id == order.account_id).first()
-        account_code = account.code if account else None
-        
-        # Get portfolio name from enrichment mapping
-        portfolio_name = None
-        if order.trader_id and order.account_id:
-            portfolio_mapping = db.query(PortfolioEnrichmentMapping).filter(
-                PortfolioEnrichmentMapping.trader_id == order.trader_id,
-                PortfolioEnrichmentMapping.account_id == order.account_id,
-                PortfolioEnrichmentMapping.active == "Y"
-            ).first()
-            if portfolio_mapping:
-                portfolio_name = portfolio_mapping.portfolio
-        
+    for order, instrument_symbol, instrument_expiry_date, trader_name, account_code, portfolio_name in rows:
         # Calculate notional value
         notional_value = float(order.qty * order.limit_price) if order.qty and order.limit_price else None
         
         enriched_orders.append({
             "order_id": order.order_id,
             "instrument_id": order.instrument_id,
-            "instrument_symbol": instrument_symbol,
+            "instrument_symbol": instrument_symbol or order.instrument_id,
             "instrument_expiry_date": instrument_expiry_date,
             "side": order.side,
             "qty": order.qty,
@@ -1,17 +1,34 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app import crud, database
+from app.core.exceptions import InvalidOrderError, OrderQueueFullError
+from app.modules.order_intake import order_intake
 from typing import Dict, Any
 
 router = APIRouter(prefix="/api/v1/orders", tags=["Order"])
 
 @router.post("/")
-def create_order(order: dict, db: Session = Depends(database.get_db)):
-    return crud.create_order(db=db, order=order)
+async def create_order(order: dict):
+    """Accept an order into the intake queue; resolves once its batch is committed"""
+    try:
+        return await order_intake.submit_async(order)
+    except InvalidOrderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OrderQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+@router.get("/intake/stats")
+def get_intake_stats():
+    """Group-commit throughput and batching statistics"""
+    return order_intake.get_stats()
 
 @router.post("/strategy")
 def create_strategy_order(strategy_order: Dict[Any, Any], db: Session = Depends(database.get_db)):
-    return crud.create_strategy_order(db=db, strategy_order=strategy_order)
+    """Book all legs of a strategy order atomically under one parent_order_id"""
+    try:
+        return crud.create_strategy_order(db=db, strategy_order=strategy_order)
+    except InvalidOrderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/")
 def get_orders(db: Session = Depends(database.get_db)):
@@ -23,4 +40,4 @@ def cancel_order(order_id: str, db: Session = Depends(database.get_db)):
 
 @router.post("/{order_id}/simulate_fill")
 def simulate_fill(order_id: str, db: Session = Depends(database.get_db)):
-    return crud.simulate_fill(db, order_id)
\ No newline at end of file
+    return crud.simulate_fill(db, order_id)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Query plan regression check for the trade and order listing filters.
+Seeds synthetic trades and orders into a local PostgreSQL database, runs
+EXPLAIN on each hot query and fails if any of them reads the trade or
+order_hdr table with a sequential scan. Everything runs in one transaction
+that is rolled back, so the database is left as it was.
+
+Needs a PostgreSQL DATABASE_URL migrated to head (alembic upgrade head) and a
+role allowed to set session_replication_role (the seed rows skip foreign key
+checks), e.g. the superuser of a local test database.
+
+Usage:
+    DATABASE_URL=postgresql://localhost/mocktrade_test python3 check_query_plans.py --rows 200000
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Add project to path
+ROOT = Path(__file__).parent
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault('DATABASE_URL', os.getenv('DATABASE_URL', 'sqlite:///./dev.db'))
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from app.core import engine
+from app.models import OrderHdr
+from app.modules.trade.models import Trade
+from app.modules.order_book.service import RESTING_STATUSES
+from app.modules.trade_query.routes import _enrichment_query
+
+# Tables that must never be read with a sequential scan by a hot query
+CHECKED_TABLES = {"trade", "order_hdr"}
+
+# Trades settle and orders fill, so open trades and resting orders are the newest few percent
+SEED_TRADES = """
+INSERT INTO trade (trade_id, instrument_id, side, qty, price, exec_time, trader_id, account_id,
+                   status, commission, created_at, updated_at)
+SELECT 'PLAN-TRD-' || g, 'PLAN-INS-' || (g % :instruments), CASE WHEN g % 2 = 0 THEN 'BUY' ELSE 'SELL' END,
+       10, 100, ts, 'PLAN-TDR-' || (g % :traders), 'PLAN-ACC-' || (g % :accounts),
+       CASE WHEN g > :rows * 0.98 THEN 'ACTIVE' WHEN g % 50 = 0 THEN 'CANCELLED' ELSE 'SETTLED' END,
+       0, ts, ts
+FROM generate_series(1, :rows) AS g, LATERAL (SELECT now() - (:rows - g) * interval '1 second' AS ts) AS t
+"""
+SEED_ORDERS = """
+INSERT INTO order_hdr (order_id, instrument_id, side, qty, limit_price, type, tif, trader_id, account_id,
+                       status, created_at)
+SELECT 'PLAN-ORD-' || g, 'PLAN-INS-' || (g % :instruments), CASE WHEN g % 2 = 0 THEN 'BUY' ELSE 'SELL' END,
+       10, 100, 'LIMIT', 'DAY', 'PLAN-TDR-' || (g % :traders), 'PLAN-ACC-' || (g % :accounts),
+       CASE WHEN g > :rows * 0.99 THEN 'NEW' WHEN g > :rows * 0.98 THEN 'PARTIALLY_FILLED'
+            WHEN g % 50 = 0 THEN 'CANCELLED' ELSE 'FILLED' END,
+       now() - (:rows - g) * interval '1 second'
+FROM generate_series(1, :rows) AS g
+"""
+
+
+def hot_queries():
+    """(name, statement) for the trade and order listing access paths"""
+    trades = lambda *where: select(Trade).where(*where).order_by(Trade.created_at.desc())
+    orders = lambda *where: select(OrderHdr).where(*where).order_by(OrderHdr.created_at.desc())
+    return [
+        ("trades by account", trades(Trade.account_id == "PLAN-ACC-7")),
+        ("trades by trader", trades(Trade.trader_id == "PLAN-TDR-7")),
+        ("trades by instrument", trades(Trade.instrument_id == "PLAN-INS-7")),
+        ("active trades", trades(Trade.status == "ACTIVE")),
+        ("active trades by account", trades(Trade.status == "ACTIVE", Trade.account_id == "PLAN-ACC-7")),
+        ("enriched trades by trader", _enrichment_query(Trade).where(Trade.trader_id == "PLAN-TDR-7")
+            .order_by(Trade.created_at.desc())),
+        ("orders by account", orders(OrderHdr.account_id == "PLAN-ACC-7")),
+        ("orders by trader", orders(OrderHdr.trader_id == "PLAN-TDR-7")),
+        ("orders by instrument", orders(OrderHdr.instrument_id == "PLAN-INS-7")),
+        ("new orders", orders(OrderHdr.status == "NEW")),
+        ("resting orders (book rebuild)", select(OrderHdr.order_id, OrderHdr.instrument_id)
+            .where(OrderHdr.status.in_(RESTING_STATUSES))),
+        ("enriched orders by account", _enrichment_query(OrderHdr).where(OrderHdr.account_id == "PLAN-ACC-7")
+            .order_by(OrderHdr.created_at.desc())),
+    ]
+
+
+def plan_nodes(plan: dict):
+    """Every node of an EXPLAIN (FORMAT JSON) plan tree, depth first"""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def seq_scans(plan: dict) -> list:
+    return [
+        node["Relation Name"] for node in plan_nodes(plan)
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in CHECKED_TABLES
+    ]
+
+
+def access_paths(plan: dict) -> str:
+    """Short description of how the checked tables are read"""
+    paths = []
+    for node in plan_nodes(plan):
+        if node.get("Relation Name") in CHECKED_TABLES:
+            index = f" using {node['Index Name']}" if node.get("Index Name") else ""
+            paths.append(f"{node['Node Type']}{index}")
+        elif node.get("Node Type") == "Bitmap Index Scan":
+            paths.append(f"Bitmap Index Scan on {node['Index Name']}")
+    return ", ".join(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query plan regression check")
+    parser.add_argument("--rows", type=int, default=200_000, help="Synthetic trades and orders to seed (each)")
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--traders", type=int, default=1000)
+    parser.add_argument("--instruments", type=int, default=2000)
+    parser.add_argument("--verbose", action="store_true", help="Print the full plan of failing queries")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print(f"DATABASE_URL must point at PostgreSQL (got {engine.dialect.name})")
+        sys.exit(2)
+
+    failures = []
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            conn.execute(text("SET LOCAL session_replication_role = replica"))
+            params = {"rows": args.rows, "accounts": args.accounts, "traders": args.traders,
+                      "instruments": args.instruments}
+            print(f"Seeding {args.rows:,} trades and {args.rows:,} orders...")
+            conn.execute(text(SEED_TRADES), params)
+            conn.execute(text(SEED_ORDERS), params)
+            conn.execute(text("ANALYZE trade"))
+            conn.execute(text("ANALYZE order_hdr"))
+
+            for name, statement in hot_queries():
+                sql = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+                plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()[0]["Plan"]
+                scanned = seq_scans(plan)
+                print(f"{'FAIL' if scanned else 'ok  '}  {name:<32} {access_paths(plan)}")
+                if scanned:
+                    failures.append(name)
+                    if args.verbose:
+                        print("\n".join(conn.exec_driver_sql(f"EXPLAIN {sql}").scalars()))
+        finally:
+            transaction.rollback()
+
+    print("PASS" if not failures else f"FAIL ({len(failures)} queries fall back to a sequential scan)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,41 @@ function formatCurrency(amount, currency) {
   }
 }
 
+// Settlement trades from the API carry settlement_date / qty / price; the table shows value_date / amount
+function toItem(row) {
+  if (!row || !row.trade_id || row.payment_ref) return row;
+  return {
+    ...row,
+    id: row.trade_id,
+    value_date: row.value_date || row.settlement_date,
+    amount: row.amount != null ? row.amount : (Number(row.qty) || 0) * (Number(row.price) || 0)
+  };
+}
+
+function rowKey(row) {
+  return row.trade_id || row.payment_ref || row.id;
+}
+
+// Apply changed rows on top of the current list (changed rows replace, new rows are appended)
+function mergeRows(prev, rows) {
+  if (!rows.length) return prev;
+  const changed = new Map(rows.map(r => [rowKey(r), r]));
+  const merged = prev.map(r => {
+    const key = rowKey(r);
+    if (!changed.has(key)) return r;
+    const next = changed.get(key);
+    changed.delete(key);
+    return next;
+  });
+  return merged.concat(Array.from(changed.values()));
+}
+
+function settlementsWsUrl() {
+  if (API_BASE) return `${API_BASE.replace(/^http/, 'ws')}/api/v1/settlements/ws`;
+  const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+  return `${protocol}//${window.location.hostname}:8000/api/v1/settlements/ws`;
+}
+
 function statusColor(status) {
   switch ((status || '').toLowerCase()) {
     case 'future':
@@ -27,6 +62,7 @@ function statusColor(status) {
       return '#f59e0b'; // amber
     case 'released':
     case 'complete':
+    case 'settled':
       return '#10b981'; // green
     default:
       return '#6b7280';
@@ -41,7 +77,10 @@ export default function SettlementMonitor() {
   const [filters, setFilters] = useState({ dateFrom: '', dateTo: '', status: 'All', currency: '', counterparty: '' });
   const [selected, setSelected] = useState(null);
   const [autoRefresh, setAutoRefresh] = useState(true);
-  const intervalRef = useRef(null);
+  const [connected, setConnected] = useState(false);
+  // Settlement change version the list reflects; deltas are requested from here
+  const versionRef = useRef(0);
+  const deltaInFlight = useRef(false);
   const [lastRefresh, setLastRefresh] = useState(null);
 
   const categories = [
@@ -70,7 +109,12 @@ export default function SettlementMonitor() {
         throw new Error(`HTTP ${res.status}`);
       }
       const data = await res.json();
-      setItems(Array.isArray(data) ? data : []);
+      if (Array.isArray(data)) {
+        setItems(data);
+      } else {
+        versionRef.current = data.version || 0;
+        setItems((data.settlements || []).map(toItem));
+      }
     } catch (err) {
       console.error('SettlementMonitor load error', err);
       // graceful fallback: mock local data so UI is usable even without backend
@@ -83,22 +127,79 @@ export default function SettlementMonitor() {
     }
   };
 
+  // Fetch only the settlements changed since the version we hold (paged until caught up)
+  const loadDelta = async () => {
+    if (deltaInFlight.current) return;
+    deltaInFlight.current = true;
+    try {
+      let hasMore = true;
+      while (hasMore) {
+        const res = await fetch(`${API_BASE}/api/v1/settlements/?since_version=${versionRef.current}&limit=1000`, {
+          headers: getAuthHeaders()
+        });
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const data = await res.json();
+        versionRef.current = data.version;
+        setItems(prev => mergeRows(prev, (data.settlements || []).map(toItem)));
+        hasMore = data.has_more;
+      }
+      setLastRefresh(new Date());
+    } catch (err) {
+      console.error('SettlementMonitor delta error', err);
+    } finally {
+      deltaInFlight.current = false;
+    }
+  };
+
   useEffect(() => {
     loadData();
-    return () => {
-      if (intervalRef.current) clearInterval(intervalRef.current);
-    };
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
+  // Live updates: the server pushes settlement changes; gaps and resyncs are filled from since_version
   useEffect(() => {
-    if (autoRefresh) {
-      // refresh every 2 minutes
-      intervalRef.current = setInterval(() => loadData(), 120000);
-    } else {
-      if (intervalRef.current) clearInterval(intervalRef.current);
-    }
-    return () => { if (intervalRef.current) clearInterval(intervalRef.current); };
+    if (!autoRefresh) return undefined;
+    let ws = null;
+    let pingInterval = null;
+    let reconnectTimeout = null;
+    let closed = false;
+
+    const connect = () => {
+      ws = new WebSocket(settlementsWsUrl());
+      ws.onopen = () => {
+        setConnected(true);
+        pingInterval = setInterval(() => { if (ws.readyState === WebSocket.OPEN) ws.send('ping'); }, 30000);
+      };
+      ws.onmessage = (event) => {
+        if (event.data === 'pong') return;
+        try {
+          const msg = JSON.parse(event.data);
+          if (msg.type === 'settlement_changes' && msg.from_version === versionRef.current) {
+            versionRef.current = msg.version;
+            setItems(prev => mergeRows(prev, msg.settlements.map(toItem)));
+            setLastRefresh(new Date());
+          } else if (msg.version !== versionRef.current) {
+            // settlement_version on (re)connect, settlement_resync, or a missed push
+            loadDelta();
+          }
+        } catch (err) {
+          console.error('SettlementMonitor stream error', err);
+        }
+      };
+      ws.onclose = () => {
+        setConnected(false);
+        if (pingInterval) clearInterval(pingInterval);
+        if (!closed) reconnectTimeout = setTimeout(connect, 3000);
+      };
+    };
+    connect();
+
+    return () => {
+      closed = true;
+      if (reconnectTimeout) clearTimeout(reconnectTimeout);
+      if (pingInterval) clearInterval(pingInterval);
+      if (ws) ws.close();
+    };
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [autoRefresh]);
 
@@ -113,7 +214,7 @@ export default function SettlementMonitor() {
     const r = String(raw).toLowerCase();
     if (r.includes('error')) return 'errors';
     if (r.includes('due') || r.includes('release')) return 'due';
-    if (r.includes('released') || r.includes('complete')) return 'released';
+    if (r.includes('released') || r.includes('complete') || r.includes('settled')) return 'released';
     if (r.includes('future')) return 'future';
     return 'future';
   }
@@ -133,8 +234,8 @@ export default function SettlementMonitor() {
         if (!res.ok) {
           throw new Error(`HTTP ${res.status}`);
         }
-        // refresh
-        await loadData();
+        // pick up the resulting changes
+        await loadDelta();
         setMessage(`${action} successful for ${id}`);
         setTimeout(() => setMessage(''), 3000);
       } catch (err) {
@@ -204,8 +305,11 @@ export default function SettlementMonitor() {
 
           <button onClick={loadData} style={buttonPrimaryStyle()}>Refresh</button>
           <label style={{ display: 'flex', alignItems: 'center', gap: 6 }}>
-            <input type="checkbox" checked={autoRefresh} onChange={e => setAutoRefresh(e.target.checked)} /> Auto-refresh
+            <input type="checkbox" checked={autoRefresh} onChange={e => setAutoRefresh(e.target.checked)} /> Live
           </label>
+          {autoRefresh && (
+            <span style={{ fontSize: 11, fontWeight: 700, color: connected ? '#10b981' : '#9ca3af' }}>{connected ? '● Connected' : '○ Connecting...'}</span>
+          )}
         </div>
       </div>
 
@@ -369,6 +369,7 @@ function OrderEntry({ onSelectOrder }) {
         underlying: instrument,
         expiry: strategyExpiry,
         account: account,
+        trader: trader,
         side: side,
         quantity: parseInt(qty),
         timeInForce: tif,